@@ -1,8 +1,22 @@
 from flask import Flask
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from optimizers.findings import Finding, FindingsStore
+
+class FindingsJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes findings straight from their compact records"""
+    
+    @staticmethod
+    def default(o):
+        if isinstance(o, Finding):
+            return o.to_dict()
+        if isinstance(o, FindingsStore):
+            return o.to_list()
+        return DefaultJSONProvider.default(o)
 
 def create_app():
     app = Flask(__name__)
+    app.json = FindingsJSONProvider(app)
     CORS(app)
     
     # Register blueprints
@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from optimizers.client_pool import client_pool
+from optimizers.rate_limiter import rate_limiters
+
+DEFAULT_ROLE_NAME = 'OrganizationAccountAccessRole'
+
+def role_arn_for(account, role_name=DEFAULT_ROLE_NAME):
+    """Build the role ARN for an account ID (role ARNs are passed through)"""
+    account = str(account)
+    if account.startswith('arn:'):
+        return account
+    return f'arn:aws:iam::{account}:role/{role_name}'
+
+def account_id_from_arn(role_arn):
+    """Extract the account ID from a role ARN"""
+    return role_arn.split(':')[4]
+
+class AssumeRoleCredentialCache:
+    """Caches STS AssumeRole session credentials and refreshes them before they expire"""
+
+    def __init__(self, refresh_margin=300, duration_seconds=3600, session_name='aws-cost-optimizer',
+                 sts_endpoint_url=None, sts_region='us-east-1', failure_ttl=60):
+        self.refresh_margin = refresh_margin
+        self.duration_seconds = duration_seconds
+        self.session_name = session_name
+        self.sts_endpoint_url = sts_endpoint_url
+        self.sts_region = sts_region
+        self.failure_ttl = failure_ttl
+        self._lock = threading.Lock()
+        self._role_locks = {}
+        self._credentials = {}  # (source access key, role ARN, external ID) -> credentials
+        self._failures = {}     # same key -> (error message, retry after)
+
+    def _role_lock(self, key):
+        with self._lock:
+            return self._role_locks.setdefault(key, threading.Lock())
+
+    def _is_fresh(self, creds):
+        remaining = (creds['expiration'] - datetime.now(timezone.utc)).total_seconds()
+        return remaining > self.refresh_margin
+
+    def get(self, role_arn, access_key, secret_key, external_id=None):
+        """Return session credentials for a role, assuming it only when the cache is stale"""
+        key = (access_key, role_arn, external_id)
+        creds = self._credentials.get(key)
+        if creds and self._is_fresh(creds):
+            return creds
+
+        # One AssumeRole per role at a time; concurrent callers wait and reuse the result
+        with self._role_lock(key):
+            creds = self._credentials.get(key)
+            if creds and self._is_fresh(creds):
+                return creds
+
+            failure = self._failures.get(key)
+            if failure and failure[1] > time.monotonic():
+                raise PermissionError(failure[0])
+
+            sts = client_pool.get_client(
+                'sts', self.sts_region, access_key, secret_key, endpoint_url=self.sts_endpoint_url
+            )
+            params = {
+                'RoleArn': role_arn,
+                'RoleSessionName': self.session_name,
+                'DurationSeconds': self.duration_seconds
+            }
+            if external_id:
+                params['ExternalId'] = external_id
+
+            try:
+                response = sts.assume_role(**params)
+            except Exception as e:
+                message = f'Could not assume {role_arn}: {e}'
+                self._failures[key] = (message, time.monotonic() + self.failure_ttl)
+                raise PermissionError(message)
+
+            issued = response['Credentials']
+            creds = {
+                'access_key': issued['AccessKeyId'],
+                'secret_key': issued['SecretAccessKey'],
+                'session_token': issued['SessionToken'],
+                'expiration': issued['Expiration']
+            }
+            self._credentials[key] = creds
+            self._failures.pop(key, None)
+            # Refreshed credentials keep throttling against the account's existing buckets
+            rate_limiters.register_account(creds['access_key'], account_id_from_arn(role_arn), creds['expiration'])
+            return creds
+
+    def invalidate(self, access_key=None):
+        """Forget cached credentials, optionally only those assumed from one source key"""
+        with self._lock:
+            for cache in (self._credentials, self._failures):
+                for key in [k for k in cache if access_key is None or k[0] == access_key]:
+                    del cache[key]
+
+
+def list_member_accounts(access_key, secret_key):
+    """Return the IDs of all active accounts in the organization"""
+    org = client_pool.get_client('organizations', 'us-east-1', access_key, secret_key)
+    account_ids = []
+    for page in org.get_paginator('list_accounts').paginate():
+        for account in page.get('Accounts', []):
+            if account.get('Status') == 'ACTIVE':
+                account_ids.append(account['Id'])
+    return account_ids
+
+
+# Shared cache; point AWS_OPTIMIZER_STS_ENDPOINT_URL at a local STS stand-in for testing
+assume_role_cache = AssumeRoleCredentialCache(
+    sts_endpoint_url=os.environ.get('AWS_OPTIMIZER_STS_ENDPOINT_URL') or None
+)
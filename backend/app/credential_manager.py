@@ -1,18 +1,28 @@
 import os
 import json
+import threading
+import time
 from cryptography.fernet import Fernet
-import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
 from pathlib import Path
+from app.accounts import assume_role_cache
+from optimizers.client_pool import client_pool
 
 class CredentialManager:
     """Manages secure storage and validation of AWS credentials"""
     
-    def __init__(self):
+    def __init__(self, identity_ttl=300, recheck_interval=5):
         self.creds_dir = Path.home() / ".aws_optimizer"
         self.creds_dir.mkdir(exist_ok=True)
         self.key_file = self.creds_dir / ".key"
         self.creds_file = self.creds_dir / "credentials.enc"
+        self.identity_ttl = identity_ttl  # Seconds a successful STS identity is reused
+        self.recheck_interval = recheck_interval  # Seconds between checks for outside edits to the file
+        self._lock = threading.Lock()
+        self._creds = None
+        self._creds_mtime = None  # mtime_ns of the file the cached credentials came from
+        self._checked_at = None  # monotonic time of the last mtime check
+        self._identities = {}  # (access key, secret key) -> (identity, expires at)
         self._ensure_key()
     
     def _ensure_key(self):
@@ -30,47 +40,71 @@ class CredentialManager:
             "region": region
         }
         encrypted = self.key.encrypt(json.dumps(creds).encode())
-        self.creds_file.write_bytes(encrypted)
+        with self._lock:
+            self.creds_file.write_bytes(encrypted)
+            self._remember(creds, self.creds_file.stat().st_mtime_ns)
         return True
     
-    def load_credentials(self):
-        """Load encrypted credentials"""
-        if not self.creds_file.exists():
-            return None
+    def _remember(self, creds, mtime):
+        self._creds = creds
+        self._creds_mtime = mtime
+        self._checked_at = time.monotonic()
+    
+    def _file_mtime(self):
         try:
-            encrypted = self.creds_file.read_bytes()
-            decrypted = self.key.decrypt(encrypted).decode()
-            return json.loads(decrypted)
-        except Exception:
+            return self.creds_file.stat().st_mtime_ns
+        except FileNotFoundError:
             return None
     
+    def load_credentials(self):
+        """Load encrypted credentials (decrypted once, then served from memory until the file changes)"""
+        with self._lock:
+            if self._checked_at is not None and time.monotonic() - self._checked_at < self.recheck_interval:
+                return dict(self._creds) if self._creds else None
+            
+            mtime = self._file_mtime()
+            if self._checked_at is None or mtime != self._creds_mtime:
+                creds = None
+                if mtime is not None:
+                    try:
+                        encrypted = self.creds_file.read_bytes()
+                        decrypted = self.key.decrypt(encrypted).decode()
+                        creds = json.loads(decrypted)
+                    except Exception:
+                        creds = None
+                self._remember(creds, mtime)
+            else:
+                self._checked_at = time.monotonic()
+            return dict(self._creds) if self._creds else None
+    
     def validate_credentials(self, access_key=None, secret_key=None):
-        """Validate AWS credentials"""
+        """Validate AWS credentials (successful identities are reused for identity_ttl seconds)"""
         try:
-            if access_key and secret_key:
-                sts = boto3.client(
-                    'sts',
-                    aws_access_key_id=access_key,
-                    aws_secret_access_key=secret_key
-                )
-            else:
+            region = None
+            if not (access_key and secret_key):
                 creds = self.load_credentials()
                 if not creds:
                     return {"valid": False, "error": "No credentials found"}
-                sts = boto3.client(
-                    'sts',
-                    aws_access_key_id=creds['access_key'],
-                    aws_secret_access_key=creds['secret_key'],
-                    region_name=creds.get('region', 'us-east-1')
-                )
+                access_key, secret_key = creds['access_key'], creds['secret_key']
+                region = creds.get('region', 'us-east-1')
+            
+            key = (access_key, secret_key)
+            with self._lock:
+                cached = self._identities.get(key)
+            if cached and cached[1] > time.monotonic():
+                return dict(cached[0])
             
+            sts = client_pool.get_client('sts', region, access_key, secret_key)
             identity = sts.get_caller_identity()
-            return {
+            result = {
                 "valid": True,
                 "account_id": identity['Account'],
                 "arn": identity['Arn'],
                 "user": identity['Arn'].split('/')[-1]
             }
+            with self._lock:
+                self._identities[key] = (result, time.monotonic() + self.identity_ttl)
+            return dict(result)
         except ClientError as e:
             error_code = e.response['Error']['Code']
             error_map = {
@@ -84,6 +118,13 @@ class CredentialManager:
     
     def clear_credentials(self):
         """Clear stored credentials"""
-        if self.creds_file.exists():
-            self.creds_file.unlink()
+        creds = self.load_credentials()
+        if creds:
+            client_pool.evict_credentials(creds['access_key'], creds['secret_key'])
+            assume_role_cache.invalidate(creds['access_key'])
+        with self._lock:
+            if self.creds_file.exists():
+                self.creds_file.unlink()
+            self._remember(None, None)
+            self._identities.clear()
         return True
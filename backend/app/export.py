@@ -0,0 +1,82 @@
+import csv
+import io
+import json
+import zlib
+from optimizers.findings import json_default
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+CSV_COLUMNS = [
+    'resource_id', 'resource_type', 'estimated_savings', 'timestamp',
+    'region', 'technique', 'account_id', 'details'
+]
+CHUNK_SIZE = 64 * 1024  # Bytes collected before a chunk is handed to the response
+
+def ndjson_lines(findings):
+    """One JSON document per finding"""
+    for finding in findings:
+        yield json.dumps(finding, default=json_default) + '\n'
+
+def csv_lines(findings, columns=CSV_COLUMNS):
+    """A header row, then one row per finding with its details as a JSON column"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def row(values):
+        writer.writerow(values)
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    yield row(columns)
+    for finding in findings:
+        yield row([
+            json.dumps(finding.get(column), default=json_default) if column == 'details' else finding.get(column, '')
+            for column in columns
+        ])
+
+def chunked(lines, chunk_size=CHUNK_SIZE):
+    """Join text lines into encoded chunks of roughly chunk_size bytes"""
+    parts = []
+    size = 0
+    for line in lines:
+        data = line.encode('utf-8')
+        parts.append(data)
+        size += len(data)
+        if size >= chunk_size:
+            yield b''.join(parts)
+            parts = []
+            size = 0
+    if parts:
+        yield b''.join(parts)
+
+def gzipped(chunks, level=6):
+    """Compress a stream of byte chunks into one gzip stream, incrementally"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 writes a gzip header
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def export_findings(findings, fmt='ndjson', compress=False):
+    """Stream findings (any iterable of findings, e.g. a FindingsStore or a generator) as bytes"""
+    if fmt not in FORMATS:
+        raise ValueError(f'Unknown export format: {fmt}')
+    lines = ndjson_lines(findings) if fmt == 'ndjson' else csv_lines(findings)
+    chunks = chunked(lines)
+    return gzipped(chunks) if compress else chunks
+
+def scan_findings(events):
+    """Findings from a scanner.stream_findings() event stream
+
+    A failed scan ends with a record whose resource_type is "error" so exports never end silently short.
+    """
+    for event, payload in events:
+        if event == 'finding':
+            yield payload
+        elif event == 'done' and payload['error']:
+            yield {'resource_type': 'error', 'technique': payload['technique'], 'details': {'error': payload['error']}}
@@ -0,0 +1,95 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from optimizers.findings import json_default
+
+SIZE_SAMPLE = 64  # Findings serialized per put to estimate a result's size
+
+class FindingsCache:
+    """TTL + LRU cache of analysis results keyed by (account, region, technique)"""
+
+    def __init__(self, ttl=300, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _estimate_size(self, value):
+        """Approximate serialized size: findings count times the average size of an evenly spaced sample"""
+        findings = value.get('findings') if isinstance(value, dict) else None
+        if not findings:
+            return len(json.dumps(value, default=json_default))
+        sample = findings[::max(1, len(findings) // SIZE_SAMPLE)][:SIZE_SAMPLE]
+        rest = {key: item for key, item in value.items() if key != 'findings'}
+        sample_size = len(json.dumps(list(sample), default=json_default))
+        return len(json.dumps(rest, default=json_default)) + sample_size * len(findings) // len(sample)
+
+    def get(self, account, region, technique):
+        """Return the cached result, or None if missing or expired"""
+        key = (account, region, technique)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, account, region, technique, value):
+        """Cache a result, evicting least recently used entries to stay within budget"""
+        key = (account, region, technique)
+        size = self._estimate_size(value)
+        if size > self.max_bytes:
+            return False
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+        return True
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def invalidate(self, account=None, region=None, technique=None):
+        """Drop entries matching every given field; returns how many were dropped"""
+        with self._lock:
+            keys = [
+                key for key in self._entries
+                if (account is None or key[0] == account)
+                and (region is None or key[1] == region)
+                and (technique is None or key[2] == technique)
+            ]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def stats(self):
+        """Return cache occupancy and hit counters"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+findings_cache = FindingsCache(
+    ttl=int(os.environ.get('AWS_OPTIMIZER_CACHE_TTL', 300)),
+    max_entries=int(os.environ.get('AWS_OPTIMIZER_CACHE_MAX_ENTRIES', 256)),
+    max_bytes=int(os.environ.get('AWS_OPTIMIZER_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+)
@@ -0,0 +1,510 @@
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from datetime import datetime, timezone
+from app.scan_diff import ADDED, REMOVED, DiffSummary, merge_diff
+from optimizers.findings import AGE_KEYS, json_default
+from optimizers.incremental import ScanState
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    account TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL NOT NULL,
+    count INTEGER NOT NULL,
+    total_monthly_savings REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scans_account ON scans (account, id);
+
+CREATE TABLE IF NOT EXISTS scan_reports (
+    id INTEGER PRIMARY KEY,
+    scan_id INTEGER NOT NULL,
+    account TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    region TEXT NOT NULL,
+    technique TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    total_monthly_savings REAL NOT NULL,
+    duration_seconds REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_scan_reports_scan ON scan_reports (scan_id);
+-- Finding the previous scan that covered the same scopes, for diffs
+CREATE INDEX IF NOT EXISTS idx_scan_reports_scope ON scan_reports (account, technique, region, account_id, scan_id);
+
+-- Latest successful report per (account, member account, region, technique)
+CREATE TABLE IF NOT EXISTS latest_reports (
+    account TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    region TEXT NOT NULL,
+    technique TEXT NOT NULL,
+    report_id INTEGER NOT NULL,
+    PRIMARY KEY (account, account_id, region, technique)
+);
+
+CREATE TABLE IF NOT EXISTS findings (
+    id INTEGER PRIMARY KEY,
+    scan_id INTEGER NOT NULL,
+    report_id INTEGER NOT NULL,
+    account TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    region TEXT NOT NULL,
+    technique TEXT NOT NULL,
+    resource_id TEXT NOT NULL,
+    resource_type TEXT NOT NULL,
+    estimated_savings REAL NOT NULL,
+    age_days INTEGER NOT NULL,
+    found_at TEXT NOT NULL,
+    current INTEGER NOT NULL,
+    details TEXT NOT NULL
+);
+-- Browsing scans, and walking them in diff order
+CREATE INDEX IF NOT EXISTS idx_findings_scan ON findings (scan_id, technique, region, account_id, resource_id);
+CREATE INDEX IF NOT EXISTS idx_findings_report ON findings (report_id, resource_id);
+-- Keyset pagination over the current findings, one index per sort order
+CREATE INDEX IF NOT EXISTS idx_current_savings ON findings (account, estimated_savings, id) WHERE current = 1;
+CREATE INDEX IF NOT EXISTS idx_current_age ON findings (account, age_days, id) WHERE current = 1;
+CREATE INDEX IF NOT EXISTS idx_current_resource ON findings (account, resource_id, id) WHERE current = 1;
+CREATE INDEX IF NOT EXISTS idx_current_scope ON findings (account, technique, region, resource_type) WHERE current = 1;
+
+-- Fingerprints and verdicts from each scope's last successful scan, for incremental scans
+CREATE TABLE IF NOT EXISTS resource_state (
+    account TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    region TEXT NOT NULL,
+    technique TEXT NOT NULL,
+    resource_id TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    resource_type TEXT,
+    details TEXT,
+    PRIMARY KEY (account, account_id, region, technique, resource_id)
+) WITHOUT ROWID;
+
+-- Per-day totals for trend charts: the current view after the day's last scan, plus
+-- findings that appeared or went away (reclaimed) as scans replaced earlier ones
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    account TEXT NOT NULL,
+    day TEXT NOT NULL,
+    technique TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    total_monthly_savings REAL NOT NULL,
+    added INTEGER NOT NULL DEFAULT 0,
+    added_monthly_savings REAL NOT NULL DEFAULT 0,
+    removed INTEGER NOT NULL DEFAULT 0,
+    removed_monthly_savings REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (account, day, technique)
+) WITHOUT ROWID;
+"""
+
+SORT_COLUMNS = ('estimated_savings', 'age_days', 'resource_id')
+DIFF_COLUMNS = 'technique, region, account_id, resource_id, resource_type, estimated_savings, details'
+DIFF_ORDER = 'technique, region, account_id, resource_id'
+INSERT_BATCH_SIZE = 5000
+MAX_PAGE_SIZE = 1000
+
+def _age_days(details):
+    for key in AGE_KEYS:
+        value = details.get(key)
+        if isinstance(value, int):
+            return value
+    return -1  # Unknown
+
+def _diff_key(row):
+    return row['technique'], row['region'], row['account_id'], row['resource_id']
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+def decode_cursor(cursor):
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+class FindingsDatabase:
+    """SQLite store of scan results (WAL mode) with server-side filtering and keyset pagination"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()  # One writer at a time; WAL lets readers carry on
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        with self._init_lock:
+            if not self._initialized:
+                connection.executescript(SCHEMA)
+                self._initialized = True
+        return connection
+
+    def save_scan(self, account, reports, findings=None, kind='analyze', started_at=None):
+        """Persist one scan in a single transaction and return its ID
+
+        Each report (technique, region, optional account_id) becomes a scan report. Findings
+        are taken from each report, or from findings when a scan merged them (tagged with
+        their technique, region and account_id). Successful reports become the current view.
+        """
+        now = time.time()
+        connection = self._connect()
+        with self._write_lock, connection:
+            scan_id = connection.execute(
+                'INSERT INTO scans (account, kind, started_at, finished_at, count, total_monthly_savings) '
+                'VALUES (?, ?, ?, ?, 0, 0)',
+                (account, kind, started_at or now, now)
+            ).lastrowid
+
+            report_ids = {}
+            current_reports = set()
+            replaced = {}  # report ID -> ID of the report it replaced in the current view
+            for report in reports:
+                key = (report['technique'], report['region'], report.get('account_id') or '')
+                report_ids[key] = connection.execute(
+                    'INSERT INTO scan_reports (scan_id, account, account_id, region, technique, count, '
+                    'total_monthly_savings, duration_seconds, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (scan_id, account, key[2], key[1], key[0], report.get('count', 0),
+                     report.get('total_monthly_savings', 0), report.get('duration_seconds'), report.get('error'))
+                ).lastrowid
+
+            # Reports that succeeded replace the current findings for their scope
+            for report in reports:
+                if report.get('error'):
+                    continue
+                technique, region, account_id = key = (report['technique'], report['region'], report.get('account_id') or '')
+                previous = connection.execute(
+                    'SELECT report_id FROM latest_reports WHERE account = ? AND account_id = ? AND region = ? AND technique = ?',
+                    (account, account_id, region, technique)
+                ).fetchone()
+                if previous is not None:
+                    connection.execute('UPDATE findings SET current = 0 WHERE report_id = ?', (previous[0],))
+                    replaced[report_ids[key]] = previous[0]
+                connection.execute(
+                    'INSERT OR REPLACE INTO latest_reports (account, account_id, region, technique, report_id) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (account, account_id, region, technique, report_ids[key])
+                )
+                current_reports.add(report_ids[key])
+
+            def rows():
+                if findings is None:
+                    sources = ((report, report.get('findings') or ()) for report in reports)
+                else:
+                    sources = [(None, findings)]
+                for report, items in sources:
+                    for finding in items:
+                        technique = finding.get('technique') or report['technique']
+                        region = finding.get('region') or report['region']
+                        account_id = finding.get('account_id') or (report.get('account_id') if report else '') or ''
+                        details = finding.get('details') or {}
+                        report_id = report_ids[(technique, region, account_id)]
+                        yield (
+                            scan_id, report_id, account, account_id, region, technique,
+                            str(finding.get('resource_id')), finding.get('resource_type'),
+                            finding.get('estimated_savings') or 0, _age_days(details), finding.get('timestamp') or '',
+                            int(report_id in current_reports), json.dumps(details, default=json_default)
+                        )
+
+            # Rows are built lazily and written in batches, all inside the one transaction
+            batch = []
+            for row in rows():
+                batch.append(row)
+                if len(batch) >= INSERT_BATCH_SIZE:
+                    self._insert(connection, batch)
+                    batch = []
+            if batch:
+                self._insert(connection, batch)
+
+            count, savings = connection.execute(
+                'SELECT COUNT(*), COALESCE(SUM(estimated_savings), 0) FROM findings WHERE scan_id = ?', (scan_id,)
+            ).fetchone()
+            connection.execute(
+                'UPDATE scans SET count = ?, total_monthly_savings = ? WHERE id = ?', (count, savings, scan_id)
+            )
+            self._roll_up(connection, account, replaced, {report['technique'] for report in reports if not report.get('error')})
+        return scan_id
+
+    def _roll_up(self, connection, account, replaced, techniques):
+        """Fold a scan into today's rollups
+
+        Each replaced report is diffed against its successor for the findings that appeared
+        or went away, and each technique's current totals are snapshotted.
+        """
+        changes = DiffSummary()
+        for report_id, previous_id in replaced.items():
+            before, after = (
+                connection.execute(
+                    f'SELECT {DIFF_COLUMNS} FROM findings WHERE report_id = ? ORDER BY resource_id', (rid,)
+                ) for rid in (previous_id, report_id)
+            )
+            for change in merge_diff(before, after, _diff_key):
+                changes.add(*change)
+
+        day = datetime.now(timezone.utc).date().isoformat()
+        for technique in techniques:
+            count, savings = connection.execute(
+                'SELECT COUNT(*), COALESCE(SUM(estimated_savings), 0) FROM findings '
+                'WHERE account = ? AND technique = ? AND current = 1', (account, technique)
+            ).fetchone()
+            delta = changes.techniques.get(technique) or DiffSummary.empty()
+            connection.execute(
+                'INSERT INTO daily_rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (account, day, technique) DO UPDATE SET '
+                'count = excluded.count, total_monthly_savings = excluded.total_monthly_savings, '
+                'added = added + excluded.added, added_monthly_savings = added_monthly_savings + excluded.added_monthly_savings, '
+                'removed = removed + excluded.removed, '
+                'removed_monthly_savings = removed_monthly_savings + excluded.removed_monthly_savings',
+                (account, day, technique, count, savings,
+                 delta[ADDED]['count'], delta[ADDED]['monthly_savings'],
+                 delta[REMOVED]['count'], delta[REMOVED]['monthly_savings'])
+            )
+
+    def _insert(self, connection, rows):
+        connection.executemany(
+            'INSERT INTO findings (scan_id, report_id, account, account_id, region, technique, resource_id, '
+            'resource_type, estimated_savings, age_days, found_at, current, details) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            rows
+        )
+
+    def query(self, account, scan_id=None, technique=None, region=None, resource_type=None, account_id=None,
+              min_savings=None, max_savings=None, min_age=None, max_age=None,
+              sort='estimated_savings', order='desc', limit=100, cursor=None):
+        """One page of findings plus the cursor for the next page (None on the last page)
+
+        Without scan_id this browses the current findings (latest successful report per scope).
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f'Cannot sort by {sort} (expected one of {", ".join(SORT_COLUMNS)})')
+        if order not in ('asc', 'desc'):
+            raise ValueError('order must be asc or desc')
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+        where = ['account = ?']
+        params = [account]
+        if scan_id is not None:
+            where.append('scan_id = ?')
+            params.append(int(scan_id))
+        else:
+            where.append('current = 1')
+        for column, value in (('technique', technique), ('region', region),
+                              ('resource_type', resource_type), ('account_id', account_id)):
+            if value is not None:
+                where.append(f'{column} = ?')
+                params.append(value)
+        for clause, value in (('estimated_savings >= ?', min_savings), ('estimated_savings <= ?', max_savings),
+                              ('age_days >= ?', min_age), ('age_days <= ?', max_age)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+
+        # Keyset: continue strictly after the last (sort value, id) seen
+        comparison = '<' if order == 'desc' else '>'
+        if cursor:
+            last_value, last_id = decode_cursor(cursor)
+            where.append(f'({sort} {comparison} ? OR ({sort} = ? AND id {comparison} ?))')
+            params.extend([last_value, last_value, last_id])
+
+        direction = order.upper()
+        rows = self._connect().execute(
+            f'SELECT * FROM findings WHERE {" AND ".join(where)} '
+            f'ORDER BY {sort} {direction}, id {direction} LIMIT ?',
+            params + [limit + 1]
+        ).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1][sort], rows[-1]['id']])
+        return {'findings': [self._row_to_finding(row) for row in rows], 'next_cursor': next_cursor}
+
+    def _row_to_finding(self, row):
+        return {
+            'id': row['id'],
+            'scan_id': row['scan_id'],
+            'resource_id': row['resource_id'],
+            'resource_type': row['resource_type'],
+            'details': json.loads(row['details']),
+            'estimated_savings': row['estimated_savings'],
+            'timestamp': row['found_at'],
+            'region': row['region'],
+            'technique': row['technique'],
+            'account_id': row['account_id'] or None,
+            'age_days': row['age_days'] if row['age_days'] >= 0 else None
+        }
+
+    def load_state(self, account, region, technique, account_id=''):
+        """The ScanState left by the last successful scan of a scope (empty if there was none)"""
+        rows = self._connect().execute(
+            'SELECT resource_id, fingerprint, resource_type, details FROM resource_state '
+            'WHERE account = ? AND account_id = ? AND region = ? AND technique = ?',
+            (account, account_id, region, technique)
+        )
+        return ScanState({
+            resource_id: (value, (resource_type, json.loads(details)) if details is not None else None)
+            for resource_id, value, resource_type, details in rows
+        })
+
+    def save_state(self, account, region, technique, state, account_id=''):
+        """Replace a scope's stored state with the one a scan just built"""
+        rows = (
+            (account, account_id, region, technique, resource_id, value,
+             verdict[0] if verdict else None, json.dumps(verdict[1], default=json_default) if verdict else None)
+            for resource_id, (value, verdict) in state.current.items()
+        )
+        connection = self._connect()
+        with self._write_lock, connection:
+            connection.execute(
+                'DELETE FROM resource_state WHERE account = ? AND account_id = ? AND region = ? AND technique = ?',
+                (account, account_id, region, technique)
+            )
+            connection.executemany('INSERT INTO resource_state VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def summary(self, account):
+        """Current finding counts and savings per technique"""
+        rows = self._connect().execute(
+            'SELECT technique, COUNT(*) AS count, SUM(estimated_savings) AS total_monthly_savings '
+            'FROM findings WHERE account = ? AND current = 1 GROUP BY technique ORDER BY technique',
+            (account,)
+        ).fetchall()
+        return {
+            row['technique']: {'count': row['count'], 'total_monthly_savings': round(row['total_monthly_savings'], 2)}
+            for row in rows
+        }
+
+    def diff(self, account, from_scan=None, to_scan=None, limit=1000):
+        """Added, removed and changed findings between two scans, by one sorted merge
+
+        Defaults to the account's latest scan against the newest earlier scan that covered
+        all of its scopes (technique, region, member account); raises ValueError when there
+        is none. Only scopes both scans covered successfully are compared, so a partial
+        scan does not read as everything else being reclaimed. Each list holds at most
+        limit entries; the summary always counts everything.
+        """
+        connection = self._connect()
+        if to_scan is None:
+            row = connection.execute('SELECT MAX(id) FROM scans WHERE account = ?', (account,)).fetchone()
+            to_scan = row[0]
+            if to_scan is None:
+                raise ValueError('Two scans are needed for a diff')
+        if from_scan is None:
+            if not connection.execute('SELECT 1 FROM scans WHERE id = ? AND account = ?', (to_scan, account)).fetchone():
+                raise LookupError(f'Unknown scan: {to_scan}')
+            row = connection.execute(
+                'SELECT previous.scan_id FROM scan_reports AS report '
+                'JOIN scan_reports AS previous ON previous.account = report.account '
+                'AND previous.technique = report.technique AND previous.region = report.region '
+                'AND previous.account_id = report.account_id AND previous.scan_id < report.scan_id '
+                'WHERE report.scan_id = ? AND report.account = ? '
+                'GROUP BY previous.scan_id '
+                'HAVING COUNT(DISTINCT report.id) = (SELECT COUNT(*) FROM scan_reports WHERE scan_id = ?) '
+                'ORDER BY previous.scan_id DESC LIMIT 1',
+                (to_scan, account, to_scan)
+            ).fetchone()
+            if row is None:
+                raise ValueError(f'No earlier scan covers the same scopes as scan {to_scan}')
+            from_scan = row[0]
+
+        scopes = []
+        for scan_id in (from_scan, to_scan):
+            rows = connection.execute(
+                'SELECT technique, region, account_id, error FROM scan_reports WHERE scan_id = ? AND account = ?',
+                (scan_id, account)
+            ).fetchall()
+            if not rows and not connection.execute(
+                'SELECT 1 FROM scans WHERE id = ? AND account = ?', (scan_id, account)
+            ).fetchone():
+                raise LookupError(f'Unknown scan: {scan_id}')
+            scopes.append({(r['technique'], r['region'], r['account_id']) for r in rows if not r['error']})
+        common = scopes[0] & scopes[1]
+
+        def rows(scan_id):
+            for row in connection.execute(
+                f'SELECT {DIFF_COLUMNS} FROM findings WHERE scan_id = ? ORDER BY {DIFF_ORDER}', (scan_id,)
+            ):
+                if (row['technique'], row['region'], row['account_id']) in common:
+                    yield row
+
+        summary = DiffSummary()
+        changes = {'added': [], 'removed': [], 'changed': []}
+        for kind, before, after in merge_diff(rows(from_scan), rows(to_scan), _diff_key):
+            summary.add(kind, before, after)
+            if len(changes[kind]) < limit:
+                changes[kind].append(self._diff_entry(before, after))
+
+        return {
+            'from_scan': from_scan,
+            'to_scan': to_scan,
+            'summary': summary.to_dict(),
+            'truncated': any(summary.totals[kind]['count'] > limit for kind in changes),
+            'scopes_compared': len(common),
+            'scopes_skipped': len(scopes[0] ^ scopes[1]),
+            **changes
+        }
+
+    def _diff_entry(self, before, after):
+        row = after if after is not None else before
+        entry = {
+            'technique': row['technique'],
+            'region': row['region'],
+            'account_id': row['account_id'] or None,
+            'resource_id': row['resource_id']
+        }
+        for name, side in (('before', before), ('after', after)):
+            if side is not None:
+                entry[name] = {
+                    'resource_type': side['resource_type'],
+                    'estimated_savings': side['estimated_savings'],
+                    'details': json.loads(side['details'])
+                }
+        if before is not None and after is not None:
+            entry['savings_delta'] = round(after['estimated_savings'] - before['estimated_savings'], 2)
+        return entry
+
+    def trends(self, account, days=30, technique=None):
+        """Daily rollups for the last days days, oldest first, with per-technique breakdowns"""
+        since = datetime.fromtimestamp(time.time() - days * 86400, timezone.utc).date().isoformat()
+        query = 'SELECT * FROM daily_rollups WHERE account = ? AND day >= ?'
+        params = [account, since]
+        if technique is not None:
+            query += ' AND technique = ?'
+            params.append(technique)
+
+        series = {}
+        totals = ('count', 'total_monthly_savings', 'added', 'added_monthly_savings', 'removed', 'removed_monthly_savings')
+        for row in self._connect().execute(query + ' ORDER BY day, technique', params):
+            point = series.setdefault(row['day'], dict({'day': row['day'], 'techniques': {}}, **dict.fromkeys(totals, 0)))
+            point['techniques'][row['technique']] = {
+                name: round(row[name], 2) if name.endswith('savings') else row[name] for name in totals
+            }
+            for name in totals:
+                point[name] += row[name]
+        for point in series.values():
+            for name in ('total_monthly_savings', 'added_monthly_savings', 'removed_monthly_savings'):
+                point[name] = round(point[name], 2)
+        return list(series.values())
+
+    def scans(self, account, limit=50):
+        """Most recent scans, newest first"""
+        rows = self._connect().execute(
+            'SELECT * FROM scans WHERE account = ? ORDER BY id DESC LIMIT ?', (account, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+
+findings_db = FindingsDatabase(
+    os.environ.get('AWS_OPTIMIZER_DB_PATH') or Path.home() / '.aws_optimizer' / 'findings.db'
+)
@@ -0,0 +1,220 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from app.findings_cache import findings_cache
+from app.findings_db import findings_db
+from app.scanner import DEFAULT_MAX_WORKERS, run_optimizer
+from optimizers.findings import FindingsStore
+from optimizers.inventory import ResourceInventory
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+class AnalysisJob:
+    """A background analysis of one or more techniques in one region"""
+
+    def __init__(self, optimizers, techniques, access_key, secret_key, region):
+        self.id = uuid.uuid4().hex
+        self.optimizers = optimizers
+        self.techniques = techniques
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.techniques_done = 0
+        self.findings = FindingsStore()  # Partial findings, appended as optimizers report them
+        self.result = None
+        self.error = None
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def _add_finding(self, technique, finding):
+        with self._lock:
+            finding.technique = technique
+            self.findings.append(finding)
+
+    def snapshot(self):
+        """Copy of the findings reported so far, safe to read while the job runs"""
+        with self._lock:
+            return self.findings.copy()
+
+    def to_dict(self, include_findings=True):
+        """Serialize status, progress and (optionally) partial findings"""
+        with self._lock:
+            job = {
+                'job_id': self.id,
+                'status': self.status,
+                'region': self.region,
+                'techniques': self.techniques,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+                'progress': {
+                    'techniques_total': len(self.techniques),
+                    'techniques_done': self.techniques_done,
+                    'findings': len(self.findings),
+                    'total_monthly_savings': round(self.findings.total_savings(), 2)
+                },
+                'error': self.error
+            }
+            if include_findings:
+                job['findings'] = self.findings.copy()
+            if self.result is not None:
+                job['result'] = self.result
+            return job
+
+
+class JobManager:
+    """Runs analysis jobs from a bounded queue on a fixed set of worker threads"""
+
+    def __init__(self, workers=2, queue_size=32, retention_seconds=3600, max_finished_jobs=100,
+                 max_workers_per_job=DEFAULT_MAX_WORKERS):
+        self.workers = workers
+        self.retention_seconds = retention_seconds
+        self.max_finished_jobs = max_finished_jobs
+        self.max_workers_per_job = max_workers_per_job
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def _ensure_workers(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'analysis-job-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, optimizers, techniques, access_key, secret_key, region='us-east-1'):
+        """Queue a job and return it; raises queue.Full when the backlog is at capacity"""
+        self._prune()
+        job = AnalysisJob(optimizers, techniques, access_key, secret_key, region)
+        self._queue.put_nowait(job)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._ensure_workers()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id):
+        """Request cancellation; queued jobs never start, running ones stop at the next page"""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        with job._lock:
+            if job.status not in FINISHED_STATES:
+                job.cancel_event.set()
+                if job.status == QUEUED:
+                    job.status = CANCELLED
+                    job.finished_at = time.time()
+        return job
+
+    def _prune(self):
+        """Drop finished jobs past retention, then the oldest beyond max_finished_jobs"""
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            finished = sorted(
+                (job for job in self._jobs.values() if job.status in FINISHED_STATES),
+                key=lambda job: job.finished_at
+            )
+            expired = [job for job in finished if job.finished_at < cutoff]
+            overflow = finished[len(expired):][:max(0, len(finished) - len(expired) - self.max_finished_jobs)]
+            for job in expired + overflow:
+                del self._jobs[job.id]
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if not job.cancel_event.is_set():
+                    self._run(job)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job):
+        with job._lock:
+            job.status = RUNNING
+            job.started_at = time.time()
+
+        inventory = ResourceInventory(
+            job.access_key, job.secret_key, job.region, cancel_event=job.cancel_event
+        )
+
+        def run(technique):
+            report = run_optimizer(
+                technique, job.optimizers[technique], job.access_key, job.secret_key, job.region,
+                inventory=inventory,
+                on_finding=lambda finding: job._add_finding(technique, finding),
+                cancel_event=job.cancel_event
+            )
+            with job._lock:
+                job.techniques_done += 1
+            return report
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers_per_job, len(job.techniques)))) as pool:
+                reports = list(pool.map(run, job.techniques))
+        except Exception as e:
+            with job._lock:
+                job.status = FAILED
+                job.error = str(e)
+                job.finished_at = time.time()
+            return
+
+        # A cancelled job's partial findings must not become the latest scan or cached results
+        cancelled = job.cancel_event.is_set()
+        scan_id = None
+        if not cancelled:
+            try:
+                scan_id = findings_db.save_scan(job.access_key, reports, kind='job')
+            except sqlite3.Error:
+                pass
+
+        for report in reports:
+            if not report['error'] and not cancelled:
+                findings_cache.put(job.access_key, job.region, report['technique'], {
+                    'technique': report['technique'],
+                    'findings': report['findings'],
+                    'count': report['count'],
+                    'total_monthly_savings': report['total_monthly_savings']
+                })
+            # Findings are already listed once on the job itself
+            report.pop('findings')
+
+        with job._lock:
+            job.result = {
+                'scan_id': scan_id,
+                'techniques': reports,
+                'count': sum(r['count'] for r in reports),
+                'total_monthly_savings': round(sum(r['total_monthly_savings'] for r in reports), 2),
+                'errors': {r['technique']: r['error'] for r in reports if r['error']}
+            }
+            job.status = CANCELLED if cancelled else SUCCEEDED
+            job.finished_at = time.time()
+
+
+job_manager = JobManager(
+    workers=int(os.environ.get('AWS_OPTIMIZER_JOB_WORKERS', 2)),
+    queue_size=int(os.environ.get('AWS_OPTIMIZER_JOB_QUEUE_SIZE', 32)),
+    retention_seconds=int(os.environ.get('AWS_OPTIMIZER_JOB_RETENTION', 3600))
+)
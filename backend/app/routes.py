@@ -1,5 +1,25 @@
-from flask import Blueprint, request, jsonify
+import json
+import os
+import queue
+import sqlite3
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from app.credential_manager import CredentialManager
+from app.export import FORMATS, export_findings, scan_findings
+from app.findings_cache import findings_cache
+from app.findings_db import findings_db
+from app.jobs import job_manager
+from optimizers.findings import FindingsStore, json_default
+from optimizers.pricing import price_list
+from optimizers.rate_limiter import rate_limiters
+from app.accounts import DEFAULT_ROLE_NAME
+from app.scanner import (
+    analyze_all as run_analyze_all,
+    analyze_accounts as run_analyze_accounts,
+    analyze_regions,
+    stream_findings,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_SCAN_TIMEOUT
+)
 from optimizers.ebs_optimizer import EBSOptimizer
 from optimizers.ec2_snapshot_optimizer import EC2SnapshotOptimizer
 from optimizers.ec2_instance_optimizer import EC2InstanceOptimizer
@@ -17,7 +37,9 @@ from optimizers.vpc_endpoint_optimizer import VPCEndpointOptimizer
 from optimizers.ecs_task_definition_optimizer import ECSTaskDefinitionOptimizer
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
-cred_manager = CredentialManager()
+cred_manager = CredentialManager(
+    identity_ttl=int(os.environ.get('AWS_OPTIMIZER_IDENTITY_TTL', 300))
+)
 
 # Map of optimizer names to classes
 OPTIMIZERS = {
@@ -38,6 +60,40 @@ OPTIMIZERS = {
     'ecs-task-definitions': ECSTaskDefinitionOptimizer,
 }
 
+def _save_scan(account, reports, findings=None, kind='analyze'):
+    """Record a scan in the findings database; returns its ID, or None if it could not be written"""
+    try:
+        return findings_db.save_scan(account, reports, findings, kind)
+    except sqlite3.Error:
+        return None
+
+def _load_states(account, region, techniques):
+    """Previous scan states for an incremental scan; techniques without one are scanned in full"""
+    states = {}
+    for technique in techniques:
+        try:
+            states[technique] = findings_db.load_state(account, region, technique)
+        except sqlite3.Error:
+            pass
+    return states
+
+def _save_states(account, region, states, reports):
+    """Keep the state of each successful incremental scan for the next one"""
+    for report in reports:
+        if not report.get('error') and report['technique'] in states:
+            try:
+                findings_db.save_state(account, region, report['technique'], states[report['technique']])
+            except sqlite3.Error:
+                pass
+
+def _parse_regions(value):
+    """A request's regions: None, "all" or a list of region names (ValueError for anything else)"""
+    if value is None or value == 'all':
+        return value
+    if not isinstance(value, list) or not all(isinstance(region, str) and region for region in value):
+        raise ValueError('regions must be "all" or a list of region names')
+    return value or None
+
 @api_bp.route('/credentials/validate', methods=['POST'])
 def validate_credentials():
     """Validate AWS credentials"""
@@ -86,7 +142,14 @@ def analyze(technique):
         if not creds:
             return jsonify({'error': 'No credentials saved'}), 401
         
-        region = request.get_json().get('region', 'us-east-1') if request.get_json() else 'us-east-1'
+        data = request.get_json(silent=True) or {}
+        region = data.get('region', 'us-east-1')
+        
+        # Repeat views are served from the cache unless a refresh is requested
+        if not data.get('refresh'):
+            cached = findings_cache.get(creds['access_key'], region, technique)
+            if cached is not None:
+                return jsonify(dict(cached, cached=True)), 200
         
         optimizer = OPTIMIZERS[technique](
             creds['access_key'],
@@ -94,19 +157,327 @@ def analyze(technique):
             region
         )
         
-        findings = optimizer.analyze()
+        # Incremental scans re-evaluate only resources changed since the last scan
+        states = _load_states(creds['access_key'], region, [technique]) if data.get('incremental') else {}
+        optimizer.scan_state = states.get(technique)
         
-        total_savings = sum(f.get('estimated_savings', 0) for f in findings if isinstance(findings, list))
+        findings = optimizer.analyze()
+        succeeded = isinstance(findings, FindingsStore)
         
-        return jsonify({
+        result = {
             'technique': technique,
             'findings': findings,
-            'count': len(findings) if isinstance(findings, list) else 0,
-            'total_monthly_savings': round(total_savings, 2)
-        }), 200
+            'count': len(findings) if succeeded else 0,
+            'total_monthly_savings': round(findings.total_savings(), 2) if succeeded else 0,
+            'resource_errors': optimizer.errors
+        }
+        if optimizer.scan_state is not None:
+            result['incremental'] = optimizer.scan_state.stats()
+        if succeeded:
+            _save_states(creds['access_key'], region, states, [{'technique': technique}])
+            result['scan_id'] = _save_scan(creds['access_key'], [dict(result, region=region)])
+            findings_cache.put(creds['access_key'], region, technique, result)
+        
+        return jsonify(dict(result, cached=False)), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/analyze/<technique>/stream', methods=['GET'])
+def analyze_stream(technique):
+    """Stream findings and progress as Server-Sent Events while the analysis runs"""
+    if technique not in OPTIMIZERS:
+        return jsonify({'error': f'Unknown technique: {technique}'}), 400
+    
+    creds = cred_manager.load_credentials()
+    if not creds:
+        return jsonify({'error': 'No credentials saved'}), 401
+    
+    region = request.args.get('region', 'us-east-1')
+    
+    def events():
+        findings = FindingsStore()
+        for event, payload in stream_findings(
+            technique, OPTIMIZERS[technique], creds['access_key'], creds['secret_key'], region
+        ):
+            if event == 'finding':
+                findings.append(payload)
+            elif event == 'done':
+                if not payload['error']:
+                    findings_cache.put(creds['access_key'], region, technique, {
+                        'technique': technique,
+                        'findings': findings,
+                        'count': payload['count'],
+                        'total_monthly_savings': payload['total_monthly_savings']
+                    })
+                payload['scan_id'] = _save_scan(creds['access_key'], [dict(payload, findings=findings)], kind='stream')
+            yield f'event: {event}\ndata: {json.dumps(payload, default=json_default)}\n\n'
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def _export_response(findings, name, source):
+    """Chunked download of findings in the format and compression asked for in the query string"""
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in FORMATS:
+        return jsonify({'error': f'Unknown format: {fmt} (expected one of {", ".join(FORMATS)})'}), 400
+    compress = request.args.get('gzip', '0').lower() in ('1', 'true')
+    
+    filename = f'{name}.{fmt}' + ('.gz' if compress else '')
+    return Response(
+        stream_with_context(export_findings(findings, fmt, compress)),
+        mimetype='application/gzip' if compress else FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"', 'X-Export-Source': source}
+    )
+
+@api_bp.route('/export/<technique>', methods=['GET'])
+def export_technique(technique):
+    """Stream one technique's findings as NDJSON or CSV, from the cache or a live scan"""
+    if technique not in OPTIMIZERS:
+        return jsonify({'error': f'Unknown technique: {technique}'}), 400
+    
+    creds = cred_manager.load_credentials()
+    if not creds:
+        return jsonify({'error': 'No credentials saved'}), 401
+    
+    region = request.args.get('region', 'us-east-1')
+    refresh = request.args.get('refresh', '0').lower() in ('1', 'true')
+    
+    cached = None if refresh else findings_cache.get(creds['access_key'], region, technique)
+    if cached is not None:
+        return _export_response(cached['findings'], f'{technique}-{region}', 'cache')
+    
+    # Findings are written out as the optimizer reports them and never accumulated
+    findings = scan_findings(stream_findings(
+        technique, OPTIMIZERS[technique], creds['access_key'], creds['secret_key'], region,
+        keep_findings=False
+    ))
+    return _export_response(findings, f'{technique}-{region}', 'scan')
+
+@api_bp.route('/analyze-all', methods=['POST'])
+def analyze_all():
+    """Analyze resources using every technique concurrently, optionally across regions"""
+    try:
+        creds = cred_manager.load_credentials()
+        if not creds:
+            return jsonify({'error': 'No credentials saved'}), 401
+        
+        data = request.get_json(silent=True) or {}
+        region = data.get('region', 'us-east-1')
+        regions = _parse_regions(data.get('regions'))
+        max_workers = data.get('max_workers')
+        max_workers = int(max_workers) if max_workers is not None else None
+        
+        if regions:
+            # "all" fans out over every enabled region
+            report = analyze_regions(
+                OPTIMIZERS,
+                creds['access_key'],
+                creds['secret_key'],
+                regions=None if regions == 'all' else regions,
+                techniques=data.get('techniques'),
+                max_workers=min(max_workers or DEFAULT_MAX_WORKERS, 64),
+                timeout=float(data.get('timeout', DEFAULT_SCAN_TIMEOUT))
+            )
+            report['scan_id'] = _save_scan(creds['access_key'], report['reports'], report['findings'], 'regions')
+            return jsonify(report), 200
+        
+        states = {}
+        if data.get('incremental'):
+            states = _load_states(creds['access_key'], region, data.get('techniques') or OPTIMIZERS)
+        
+        report = run_analyze_all(
+            OPTIMIZERS,
+            creds['access_key'],
+            creds['secret_key'],
+            region,
+            techniques=data.get('techniques'),
+            max_workers=max_workers,
+            scan_states=states
+        )
+        _save_states(creds['access_key'], region, states, report['techniques'])
+        
+        # Seed the cache so opening any technique afterwards is instant
+        for technique_report in report['techniques']:
+            if not technique_report['error']:
+                findings_cache.put(creds['access_key'], region, technique_report['technique'], {
+                    'technique': technique_report['technique'],
+                    'findings': technique_report['findings'],
+                    'count': technique_report['count'],
+                    'total_monthly_savings': technique_report['total_monthly_savings']
+                })
+        report['scan_id'] = _save_scan(creds['access_key'], report['techniques'], kind='analyze-all')
+        return jsonify(report), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/analyze-accounts', methods=['POST'])
+def analyze_accounts():
+    """Analyze member accounts via AssumeRole across accounts x regions"""
+    try:
+        creds = cred_manager.load_credentials()
+        if not creds:
+            return jsonify({'error': 'No credentials saved'}), 401
+        
+        data = request.get_json(silent=True) or {}
+        regions = _parse_regions(data.get('regions')) or [data.get('region', creds.get('region', 'us-east-1'))]
+        
+        report = run_analyze_accounts(
+            OPTIMIZERS,
+            creds['access_key'],
+            creds['secret_key'],
+            accounts=data.get('accounts'),
+            role_name=data.get('role_name', DEFAULT_ROLE_NAME),
+            regions=None if regions == 'all' else regions,
+            techniques=data.get('techniques'),
+            external_id=data.get('external_id'),
+            max_workers=min(int(data.get('max_workers', DEFAULT_MAX_WORKERS)), 64),
+            timeout=float(data.get('timeout', DEFAULT_SCAN_TIMEOUT))
+        )
+        report['scan_id'] = _save_scan(creds['access_key'], report['reports'], report['findings'], 'accounts')
+        return jsonify(report), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@api_bp.route('/jobs', methods=['POST'])
+def create_job():
+    """Queue a background analysis and return its job id immediately"""
+    data = request.get_json(silent=True) or {}
+    techniques = data.get('techniques') or ([data['technique']] if data.get('technique') else list(OPTIMIZERS))
+    unknown = [t for t in techniques if t not in OPTIMIZERS]
+    if unknown:
+        return jsonify({'error': f'Unknown technique(s): {", ".join(unknown)}'}), 400
+    
+    creds = cred_manager.load_credentials()
+    if not creds:
+        return jsonify({'error': 'No credentials saved'}), 401
+    
+    try:
+        job = job_manager.submit(
+            OPTIMIZERS,
+            techniques,
+            creds['access_key'],
+            creds['secret_key'],
+            data.get('region', 'us-east-1')
+        )
+    except queue.Full:
+        return jsonify({'error': 'Too many queued jobs, try again later'}), 503
+    
+    return jsonify({'job_id': job.id, 'status': job.status}), 202
+
+@api_bp.route('/jobs', methods=['GET'])
+def list_jobs():
+    """List retained jobs without their findings"""
+    return jsonify([job.to_dict(include_findings=False) for job in job_manager.list()]), 200
+
+@api_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get job status, progress, partial findings and the final result"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown job: {job_id}'}), 404
+    include_findings = request.args.get('findings', '1') != '0'
+    return jsonify(job.to_dict(include_findings=include_findings)), 200
+
+@api_bp.route('/jobs/<job_id>/export', methods=['GET'])
+def export_job(job_id):
+    """Stream a job's findings (partial while it runs) as NDJSON or CSV"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown job: {job_id}'}), 404
+    return _export_response(job.snapshot(), f'job-{job_id}', 'job')
+
+@api_bp.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a queued or running job"""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown job: {job_id}'}), 404
+    return jsonify(job.to_dict(include_findings=False)), 200
+
+@api_bp.route('/findings', methods=['GET'])
+def query_findings():
+    """Page through stored findings with filters, sorting and keyset pagination"""
+    creds = cred_manager.load_credentials()
+    if not creds:
+        return jsonify({'error': 'No credentials saved'}), 401
+    
+    args = request.args
+    try:
+        page = findings_db.query(
+            creds['access_key'],
+            scan_id=args.get('scan_id', type=int),
+            technique=args.get('technique'),
+            region=args.get('region'),
+            resource_type=args.get('resource_type'),
+            account_id=args.get('account_id'),
+            min_savings=args.get('min_savings', type=float),
+            max_savings=args.get('max_savings', type=float),
+            min_age=args.get('min_age', type=int),
+            max_age=args.get('max_age', type=int),
+            sort=args.get('sort', 'estimated_savings'),
+            order=args.get('order', 'desc'),
+            limit=args.get('limit', 100, type=int),
+            cursor=args.get('cursor')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(page), 200
+
+@api_bp.route('/findings/summary', methods=['GET'])
+def findings_summary():
+    """Current stored finding counts and savings per technique"""
+    creds = cred_manager.load_credentials()
+    if not creds:
+        return jsonify({'error': 'No credentials saved'}), 401
+    return jsonify(findings_db.summary(creds['access_key'])), 200
+
+@api_bp.route('/scans', methods=['GET'])
+def list_scans():
+    """Most recent stored scans"""
+    creds = cred_manager.load_credentials()
+    if not creds:
+        return jsonify({'error': 'No credentials saved'}), 401
+    return jsonify(findings_db.scans(creds['access_key'], request.args.get('limit', 50, type=int))), 200
+
+@api_bp.route('/scans/diff', methods=['GET'])
+def diff_scans():
+    """Findings added, removed and changed between two stored scans (default: the latest two of the same scope)"""
+    creds = cred_manager.load_credentials()
+    if not creds:
+        return jsonify({'error': 'No credentials saved'}), 401
+    
+    try:
+        diff = findings_db.diff(
+            creds['access_key'],
+            from_scan=request.args.get('from', type=int),
+            to_scan=request.args.get('to', type=int),
+            limit=min(request.args.get('limit', 1000, type=int), 10000)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    return jsonify(diff), 200
+
+@api_bp.route('/trends', methods=['GET'])
+def get_trends():
+    """Daily finding counts, savings, and new and reclaimed waste for trend charts"""
+    creds = cred_manager.load_credentials()
+    if not creds:
+        return jsonify({'error': 'No credentials saved'}), 401
+    return jsonify(findings_db.trends(
+        creds['access_key'],
+        days=request.args.get('days', 30, type=int),
+        technique=request.args.get('technique')
+    )), 200
+
 @api_bp.route('/optimize/<technique>', methods=['POST'])
 def optimize(technique):
     """Execute optimization"""
@@ -131,11 +502,20 @@ def optimize(technique):
         )
         optimizer.dry_run = dry_run
         
+        # Identifiers recorded by a recent analysis spare optimize() its lookup calls
+        cached = findings_cache.get(creds['access_key'], region, technique)
+        if cached:
+            optimizer.remember_findings(cached['findings'])
+        
         results = optimizer.optimize(resource_ids)
         
         success_count = sum(1 for r in results if r.get('status') == 'success')
         failed_count = sum(1 for r in results if r.get('status') == 'failed')
         
+        # Cached findings for this technique are stale once anything was changed
+        if success_count and not dry_run:
+            findings_cache.invalidate(account=creds['access_key'], technique=technique)
+        
         return jsonify({
             'technique': technique,
             'dry_run': dry_run,
@@ -149,6 +529,66 @@ def optimize(technique):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@api_bp.route('/cache/invalidate', methods=['POST'])
+def invalidate_cache():
+    """Drop cached findings, optionally only for one technique and/or region"""
+    data = request.get_json(silent=True) or {}
+    creds = cred_manager.load_credentials()
+    removed = findings_cache.invalidate(
+        account=creds['access_key'] if creds else None,
+        region=data.get('region'),
+        technique=data.get('technique')
+    )
+    return jsonify({'status': 'success', 'removed': removed, 'cache': findings_cache.stats()}), 200
+
+@api_bp.route('/rate-limits', methods=['GET'])
+def get_rate_limits():
+    """Current per-service request rates, throttles and retries"""
+    return jsonify(rate_limiters.metrics()), 200
+
+@api_bp.route('/pricing', methods=['GET'])
+def get_pricing():
+    """Describe the loaded price list"""
+    return jsonify(price_list.stats()), 200
+
+@api_bp.route('/pricing/reload', methods=['POST'])
+def reload_pricing():
+    """Reload the price list file; cached savings are dropped since they used the old prices"""
+    try:
+        price_list.load()
+    except Exception as e:
+        return jsonify({'error': f'Could not load price list: {e}'}), 500
+    findings_cache.invalidate()
+    return jsonify(price_list.stats()), 200
+
+@api_bp.route('/pricing/reprice', methods=['POST'])
+def reprice_findings():
+    """Recompute estimated savings for a batch of findings with the current price list"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    findings = data.get('findings')
+    region = data.get('region')
+    if not isinstance(findings, list):
+        return jsonify({'error': 'findings must be a list'}), 400
+    if region is not None and not isinstance(region, str):
+        return jsonify({'error': 'region must be a string'}), 400
+    for index, finding in enumerate(findings):
+        if not isinstance(finding, dict) or not isinstance(finding.get('resource_type'), str):
+            return jsonify({'error': f'findings[{index}] must be an object with a resource_type'}), 400
+        if not isinstance(finding.get('details') or {}, dict) or not isinstance(finding.get('region') or '', str):
+            return jsonify({'error': f'findings[{index}] has malformed details or region'}), 400
+    
+    try:
+        total_savings = price_list.reprice(findings, region)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({
+        'findings': findings,
+        'count': len(findings),
+        'total_monthly_savings': round(total_savings, 2)
+    }), 200
+
 @api_bp.route('/techniques', methods=['GET'])
 def get_techniques():
     """Get list of available optimization techniques"""
@@ -180,7 +620,7 @@ def get_techniques():
         {
             'id': 'load-balancers',
             'name': 'Remove Unused Load Balancers',
-            'description': 'Deletes load balancers with no active targets',
+            'description': 'Deletes load balancers (ALB, NLB and Classic) with no active targets',
             'icon': '⚖️'
         },
         {
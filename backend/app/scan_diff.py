@@ -0,0 +1,74 @@
+import json
+from optimizers.findings import AGE_KEYS
+
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+
+def same_finding(before, after):
+    """Whether two stored findings of one resource agree, ignoring ages (they grow every day)"""
+    if before['resource_type'] != after['resource_type'] or before['estimated_savings'] != after['estimated_savings']:
+        return False
+    if before['details'] == after['details']:
+        return True
+    before_details, after_details = json.loads(before['details']), json.loads(after['details'])
+    for key in AGE_KEYS:
+        before_details.pop(key, None)
+        after_details.pop(key, None)
+    return before_details == after_details
+
+def merge_diff(before, after, key):
+    """Walk two row streams sorted by key once, yielding (ADDED | REMOVED | CHANGED, before, after)
+
+    Runs in O(len(before) + len(after)) without holding either side in memory.
+    """
+    before, after = iter(before), iter(after)
+    old, new = next(before, None), next(after, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and key(old) < key(new)):
+            yield REMOVED, old, None
+            old = next(before, None)
+        elif old is None or key(new) < key(old):
+            yield ADDED, None, new
+            new = next(after, None)
+        else:
+            if not same_finding(old, new):
+                yield CHANGED, old, new
+            old, new = next(before, None), next(after, None)
+
+class DiffSummary:
+    """Counts and savings deltas of a diff, overall and per technique"""
+
+    def __init__(self):
+        self.totals = self.empty()
+        self.techniques = {}
+
+    @staticmethod
+    def empty():
+        return {
+            ADDED: {'count': 0, 'monthly_savings': 0.0},
+            REMOVED: {'count': 0, 'monthly_savings': 0.0},
+            CHANGED: {'count': 0, 'monthly_savings_delta': 0.0}
+        }
+
+    def add(self, kind, before, after):
+        row = after if after is not None else before
+        for bucket in (self.totals, self.techniques.setdefault(row['technique'], self.empty())):
+            bucket[kind]['count'] += 1
+            if kind == CHANGED:
+                bucket[kind]['monthly_savings_delta'] += after['estimated_savings'] - before['estimated_savings']
+            else:
+                bucket[kind]['monthly_savings'] += row['estimated_savings']
+
+    @staticmethod
+    def _rounded(bucket):
+        net = (bucket[ADDED]['monthly_savings'] - bucket[REMOVED]['monthly_savings']
+               + bucket[CHANGED]['monthly_savings_delta'])
+        rounded = {kind: {name: round(value, 2) for name, value in values.items()} for kind, values in bucket.items()}
+        rounded['net_monthly_savings_delta'] = round(net, 2)
+        return rounded
+
+    def to_dict(self):
+        summary = self._rounded(self.totals)
+        summary['techniques'] = {technique: self._rounded(bucket) for technique, bucket in sorted(self.techniques.items())}
+        return summary
@@ -0,0 +1,344 @@
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from app.accounts import (
+    DEFAULT_ROLE_NAME,
+    account_id_from_arn,
+    assume_role_cache,
+    list_member_accounts,
+    role_arn_for
+)
+from optimizers.client_pool import client_pool
+from optimizers.findings import FindingsStore
+from optimizers.inventory import ResourceInventory, ScanCancelled
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_SCAN_TIMEOUT = 300
+STREAM_PROGRESS_INTERVAL = 1.0
+STREAM_BUFFER_SIZE = 1000
+
+def run_optimizer(technique, optimizer_cls, access_key, secret_key, region='us-east-1', session_token=None,
+                  inventory=None, on_finding=None, cancel_event=None, keep_findings=True, scan_state=None):
+    """Run one optimizer's analysis and return its report with timing and error
+
+    With keep_findings=False findings only reach on_finding and the report lists none. With a
+    scan_state from the previous scan, unchanged resources are carried forward (incremental scan).
+    """
+    started = time.perf_counter()
+    findings = FindingsStore()
+    resource_errors = []
+    error = None
+
+    try:
+        optimizer = optimizer_cls(access_key, secret_key, region, session_token, inventory)
+        optimizer.on_finding = on_finding
+        optimizer.cancel_event = cancel_event
+        optimizer.keep_findings = keep_findings
+        optimizer.scan_state = scan_state
+        result = optimizer.analyze()
+        if isinstance(result, dict):
+            error = result.get('error', 'Unknown error')
+        else:
+            findings = result
+        resource_errors = optimizer.errors
+    except Exception as e:
+        error = str(e)
+
+    report = {
+        'technique': technique,
+        'region': region,
+        'findings': findings,
+        'count': len(findings),
+        'total_monthly_savings': round(findings.total_savings(), 2),
+        'duration_seconds': round(time.perf_counter() - started, 3),
+        'error': error,
+        'resource_errors': resource_errors
+    }
+    if scan_state is not None:
+        report['incremental'] = scan_state.stats()
+    return report
+
+def stream_findings(technique, optimizer_cls, access_key, secret_key, region='us-east-1',
+                    progress_interval=STREAM_PROGRESS_INTERVAL, keep_findings=True):
+    """Yield ('finding' | 'progress' | 'done', payload) events while one optimizer runs
+
+    Closing the generator (e.g. the client disconnects) cancels the scan. Pass
+    keep_findings=False when the consumer does not hold on to findings, so memory
+    stays flat no matter how many are streamed.
+    """
+    events = queue.Queue(maxsize=STREAM_BUFFER_SIZE)
+    cancel_event = threading.Event()
+    outcome = {}
+
+    def on_finding(finding):
+        # Bounded buffer gives backpressure; give up once the consumer is gone
+        while True:
+            try:
+                events.put(finding, timeout=0.5)
+                return
+            except queue.Full:
+                if cancel_event.is_set():
+                    raise ScanCancelled()
+
+    def run():
+        outcome['report'] = run_optimizer(
+            technique, optimizer_cls, access_key, secret_key, region,
+            on_finding=on_finding, cancel_event=cancel_event, keep_findings=keep_findings
+        )
+
+    worker = threading.Thread(target=run, name=f'stream-{technique}', daemon=True)
+    worker.start()
+
+    count = 0
+    savings = 0
+    next_progress = time.monotonic() + progress_interval
+    try:
+        while worker.is_alive() or not events.empty():
+            try:
+                finding = events.get(timeout=min(progress_interval, 0.25))
+            except queue.Empty:
+                finding = None
+            if finding is not None:
+                count += 1
+                savings += finding.estimated_savings
+                yield 'finding', finding
+            if time.monotonic() >= next_progress:
+                next_progress = time.monotonic() + progress_interval
+                yield 'progress', {'count': count, 'total_monthly_savings': round(savings, 2)}
+
+        worker.join()
+        report = outcome['report']
+        done = {key: value for key, value in report.items() if key != 'findings'}
+        done.update(count=count, total_monthly_savings=round(savings, 2))
+        yield 'done', done
+    finally:
+        cancel_event.set()
+
+def _select_techniques(optimizers, techniques):
+    selected = list(techniques) if techniques else list(optimizers)
+    unknown = [t for t in selected if t not in optimizers]
+    if unknown:
+        raise ValueError(f'Unknown technique(s): {", ".join(unknown)}')
+    return selected
+
+def analyze_all(optimizers, access_key, secret_key, region='us-east-1', techniques=None, max_workers=None,
+                scan_states=None):
+    """Run every optimizer concurrently and combine the reports
+
+    Each technique gets its own worker, so the scan takes as long as the slowest one;
+    max_workers optionally caps the pool. scan_states optionally maps techniques to the
+    ScanState of their previous scan.
+    """
+    scan_states = scan_states or {}
+    selected = _select_techniques(optimizers, techniques)
+    # Every optimizer queries the same inventory, so each resource type is fetched once
+    inventory = ResourceInventory(access_key, secret_key, region)
+
+    started = time.perf_counter()
+    workers = len(selected) if max_workers is None else min(max_workers, len(selected))
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [
+            pool.submit(run_optimizer, technique, optimizers[technique], access_key, secret_key, region, None, inventory,
+                        scan_state=scan_states.get(technique))
+            for technique in selected
+        ]
+        reports = [future.result() for future in futures]
+
+    return {
+        'region': region,
+        'techniques': reports,
+        'count': sum(r['count'] for r in reports),
+        'total_monthly_savings': round(sum(r['total_monthly_savings'] for r in reports), 2),
+        'errors': {r['technique']: r['error'] for r in reports if r['error']},
+        'duration_seconds': round(time.perf_counter() - started, 3)
+    }
+
+def discover_regions(access_key, secret_key, region='us-east-1'):
+    """Return the regions enabled for the account"""
+    ec2 = client_pool.get_client('ec2', region, access_key, secret_key)
+    response = ec2.describe_regions(
+        Filters=[{'Name': 'opt-in-status', 'Values': ['opt-in-not-required', 'opted-in']}]
+    )
+    return sorted(r['RegionName'] for r in response.get('Regions', []))
+
+def _error_report(technique, region, error, duration=0):
+    return {
+        'technique': technique,
+        'region': region,
+        'findings': FindingsStore(),
+        'count': 0,
+        'total_monthly_savings': 0,
+        'duration_seconds': duration,
+        'error': error,
+        'resource_errors': []
+    }
+
+def _next_scope(pending, in_flight):
+    """(account, region) whose next task runs first: the least busy one, so a slow scope never holds every worker"""
+    return min(pending, key=lambda scope: in_flight[scope])
+
+def _task_outcome(future):
+    return str(future.exception()) if future.exception() else future.result()
+
+def _fan_out(tasks, max_workers, timeout, cancel_event=None):
+    """Run (technique, account_id, region, callable) tasks on one bounded pool and merge the reports
+
+    Each callable is called with cancel_event=<threading.Event>. A free worker always takes
+    the next task of the (account, region) with the fewest running tasks, so a region whose
+    calls hang cannot starve the others. When the timeout expires, every unfinished task's
+    event is set (optimizers stop at their next page, resource or finding), tasks that never
+    started are dropped, and both are reported as errors. cancel_event, if given, is set on
+    return to stop work shared between tasks (such as inventory fetches).
+    """
+    started = time.perf_counter()
+    deadline = time.monotonic() + timeout
+    workers = max(1, min(max_workers, len(tasks)))
+    pending = {}  # (account_id, region) -> queue of task indexes
+    for index, (_, account_id, region, _) in enumerate(tasks):
+        pending.setdefault((account_id, region), deque()).append(index)
+    task_events = [threading.Event() for _ in tasks]
+    in_flight = Counter()  # (account_id, region) -> running tasks, hung ones included
+    running = {}  # future -> task index
+    outcomes = {}  # task index -> report, or error message
+
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        while pending or running:
+            while pending and len(running) < workers:
+                scope = _next_scope(pending, in_flight)
+                index = pending[scope].popleft()
+                if not pending[scope]:
+                    del pending[scope]
+                running[pool.submit(tasks[index][3], cancel_event=task_events[index])] = index
+                in_flight[scope] += 1
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, _ = wait(running, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = running.pop(future)
+                in_flight[tasks[index][1:3]] -= 1
+                outcomes[index] = _task_outcome(future)
+        for future, index in running.items():
+            if future.done():
+                outcomes[index] = _task_outcome(future)
+    finally:
+        for event in task_events:
+            event.set()
+        if cancel_event is not None:
+            cancel_event.set()
+        # Running tasks wind down in the background once they see their event
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    reports = []
+    findings = FindingsStore()
+    for index, (technique, account_id, region, _) in enumerate(tasks):
+        outcome = outcomes.get(index)
+        if outcome is None:
+            was_running = index in running.values()
+            message = f'Timed out after {timeout}s' if was_running else f'Not started within {timeout}s'
+            report = _error_report(technique, region, message, timeout)
+        elif isinstance(outcome, str):
+            report = _error_report(technique, region, outcome)
+        else:
+            report = outcome
+
+        for finding in report.pop('findings'):
+            finding.region = region
+            finding.technique = technique
+            if account_id:
+                finding.account_id = account_id
+            findings.append(finding)
+        if account_id:
+            report['account_id'] = account_id
+        reports.append(report)
+
+    return {
+        'reports': reports,
+        'findings': findings,
+        'count': len(findings),
+        'total_monthly_savings': round(sum(r['total_monthly_savings'] for r in reports), 2),
+        'errors': {
+            '@'.join(filter(None, (r['technique'], r.get('account_id'), r['region']))): r['error']
+            for r in reports if r['error']
+        },
+        'duration_seconds': round(time.perf_counter() - started, 3)
+    }
+
+def analyze_regions(optimizers, access_key, secret_key, regions=None, techniques=None,
+                    max_workers=DEFAULT_MAX_WORKERS, timeout=DEFAULT_SCAN_TIMEOUT):
+    """Run the chosen optimizers in every region concurrently and merge region-tagged findings"""
+    selected = _select_techniques(optimizers, techniques)
+    if not regions:
+        regions = discover_regions(access_key, secret_key)
+    # Inventories are shared by a region's tasks, so they stop with the whole scan
+    scan_cancelled = threading.Event()
+    inventories = {
+        region: ResourceInventory(access_key, secret_key, region, cancel_event=scan_cancelled) for region in regions
+    }
+
+    tasks = [
+        (technique, None, region,
+         partial(run_optimizer, technique, optimizers[technique], access_key, secret_key, region,
+                 None, inventories[region]))
+        for technique in selected for region in regions
+    ]
+    report = _fan_out(tasks, max_workers, timeout, scan_cancelled)
+    report['regions'] = list(regions)
+    return report
+
+class _ScanInventories:
+    """One ResourceInventory per (account, region) for the lifetime of a scan"""
+
+    def __init__(self, cancel_event=None):
+        self._lock = threading.Lock()
+        self._inventories = {}
+        self.cancel_event = cancel_event
+
+    def get(self, account_id, region, creds):
+        with self._lock:
+            key = (account_id, region)
+            if key not in self._inventories:
+                self._inventories[key] = ResourceInventory(
+                    creds['access_key'], creds['secret_key'], region, creds['session_token'], self.cancel_event
+                )
+            return self._inventories[key]
+
+def _run_as_account(technique, optimizer_cls, access_key, secret_key, role_arn, region,
+                    credential_cache, external_id, inventories, cancel_event=None):
+    """Assume the account's role (cached) and run one optimizer with the session credentials"""
+    creds = credential_cache.get(role_arn, access_key, secret_key, external_id)
+    inventory = inventories.get(account_id_from_arn(role_arn), region, creds)
+    return run_optimizer(
+        technique, optimizer_cls, creds['access_key'], creds['secret_key'], region,
+        creds['session_token'], inventory, cancel_event=cancel_event
+    )
+
+def analyze_accounts(optimizers, access_key, secret_key, accounts=None, role_name=DEFAULT_ROLE_NAME,
+                     regions=None, techniques=None, external_id=None, credential_cache=None,
+                     max_workers=DEFAULT_MAX_WORKERS, timeout=DEFAULT_SCAN_TIMEOUT):
+    """Assume a role in each member account and fan out across accounts x regions on one pool"""
+    selected = _select_techniques(optimizers, techniques)
+    credential_cache = credential_cache or assume_role_cache
+    if not accounts:
+        accounts = list_member_accounts(access_key, secret_key)
+    if not regions:
+        regions = discover_regions(access_key, secret_key)
+
+    role_arns = [role_arn_for(account, role_name) for account in accounts]
+    scan_cancelled = threading.Event()
+    inventories = _ScanInventories(scan_cancelled)
+    tasks = [
+        (technique, account_id_from_arn(role_arn), region,
+         partial(_run_as_account, technique, optimizers[technique], access_key, secret_key,
+                 role_arn, region, credential_cache, external_id, inventories))
+        for technique in selected for region in regions for role_arn in role_arns
+    ]
+    report = _fan_out(tasks, max_workers, timeout, scan_cancelled)
+    report['accounts'] = [account_id_from_arn(role_arn) for role_arn in role_arns]
+    report['regions'] = list(regions)
+    return report
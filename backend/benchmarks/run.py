@@ -0,0 +1,252 @@
+"""Offline benchmark of every optimizer against synthetic AWS accounts
+
+Run from backend/:
+
+    python -m benchmarks.run --sizes 1k,100k,1m --latency-ms 20 --output results.json
+    python -m benchmarks.run --sizes 100k --baseline results.json
+    python -m benchmarks.run --cassette scan.ndjson.gz --region eu-west-1
+
+--cassette replays a recorded scan (see optimizers/cassette.py) instead of a synthetic
+account. Each (size, optimizer) pair runs analyze() in its own process, so peak RSS is that
+optimizer's alone. Results are written as JSON; --baseline compares against an
+earlier results file and exits non-zero on regressions.
+"""
+import argparse
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+ACCESS_KEY = 'AKIABENCHMARK0000000'
+SECRET_KEY = 'benchmark-secret-key'
+UNLIMITED_RATE = 1e9  # Requests/second that never throttle
+COMPARED_METRICS = ('wall_seconds', 'api_calls', 'peak_rss_mb')
+
+def discover_optimizers():
+    """optimizer name -> class for every BaseOptimizer subclass in the optimizers package"""
+    import optimizers
+    from optimizers.base_optimizer import BaseOptimizer
+    found = {}
+    for module_info in pkgutil.iter_modules(optimizers.__path__):
+        if not module_info.name.endswith('_optimizer') or module_info.name == 'base_optimizer':
+            continue
+        module = importlib.import_module(f'optimizers.{module_info.name}')
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if issubclass(cls, BaseOptimizer) and cls is not BaseOptimizer and cls.__module__ == module.__name__:
+                found[module_info.name[:-len('_optimizer')]] = cls
+    return dict(sorted(found.items()))
+
+def _rss_mb(usage):
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return usage / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+def run_one(name, size, latency=0.0, jitter=0.0, seed=0, region='us-east-1', rate_limited=False, cassette=None):
+    """Benchmark one optimizer in this process and return its measurements"""
+    from optimizers import rate_limiter
+    from optimizers.cassette import REPLAY, install
+    from optimizers.client_pool import client_pool
+    from benchmarks.stand_in import AWSStandIn
+    from benchmarks.synthetic import SyntheticAccount
+
+    if not rate_limited:
+        # Measure the optimizer, not the per-service request quotas
+        for service in rate_limiter.SERVICE_RATES:
+            rate_limiter.SERVICE_RATES[service] = UNLIMITED_RATE
+        rate_limiter.DEFAULT_RATE = UNLIMITED_RATE
+
+    if cassette:
+        source = install(cassette, REPLAY, client_pool)
+    else:
+        source = AWSStandIn(SyntheticAccount(size, region, seed=seed), latency, jitter)
+        source.install(client_pool)
+    optimizer_cls = discover_optimizers()[name]
+
+    # Load service models up front so they are not timed
+    for service in rate_limiter.SERVICE_RATES:
+        client_pool.get_client(service, region, ACCESS_KEY, SECRET_KEY)
+    source.calls.clear()
+    baseline_rss = _rss_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+    optimizer = optimizer_cls(ACCESS_KEY, SECRET_KEY, region)
+    started = time.perf_counter()
+    result = optimizer.analyze()
+    wall = time.perf_counter() - started
+
+    error = result.get('error') if isinstance(result, dict) else None
+    findings = 0 if error else len(result)
+    return {
+        'optimizer': name,
+        'size': size,
+        'latency_ms': latency * 1000,
+        'jitter_ms': jitter * 1000,
+        'wall_seconds': round(wall, 4),
+        'api_calls': sum(source.calls.values()),
+        'api_calls_by_operation': dict(sorted(source.calls.items())),
+        'findings': findings,
+        'findings_per_second': round(findings / wall, 1) if wall else None,
+        'resource_errors': len(optimizer.errors),
+        'baseline_rss_mb': round(baseline_rss, 1),
+        'peak_rss_mb': round(_rss_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss), 1),
+        'error': error
+    }
+
+def run_isolated(name, size, args):
+    """Run one benchmark in a fresh interpreter and return its measurements"""
+    command = [
+        sys.executable, '-m', 'benchmarks.run', '--worker', name,
+        '--sizes', str(size), '--latency-ms', str(args.latency_ms), '--jitter-ms', str(args.jitter_ms),
+        '--seed', str(args.seed), '--region', args.region
+    ]
+    if args.cassette:
+        command += ['--cassette', os.path.abspath(args.cassette)]
+    if args.rate_limited:
+        command.append('--rate-limited')
+    env = dict(os.environ)
+    env.pop('AWS_OPTIMIZER_CASSETTE', None)  # The worker installs its own source of responses
+    if args.ecs_describe:
+        env['AWS_OPTIMIZER_ECS_DESCRIBE'] = '1'
+    if args.efs_idle_days:
+        env['AWS_OPTIMIZER_EFS_IDLE_DAYS'] = str(args.efs_idle_days)
+
+    try:
+        completed = subprocess.run(
+            command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=args.timeout
+        )
+    except subprocess.TimeoutExpired:
+        return {'optimizer': name, 'size': size, 'error': f'Timed out after {args.timeout}s'}
+    if completed.returncode != 0:
+        lines = completed.stderr.strip().splitlines()
+        return {'optimizer': name, 'size': size, 'error': lines[-1] if lines else 'Worker failed'}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def compare(baseline, results, tolerance):
+    """Rows whose metrics grew by more than tolerance (a fraction) over the baseline run"""
+    previous = {(r['optimizer'], r['size']): r for r in baseline['results'] if not r.get('error')}
+    regressions = []
+    for row in results:
+        before = previous.get((row['optimizer'], row['size']))
+        if before is None or row.get('error'):
+            continue
+        for metric in COMPARED_METRICS:
+            if before.get(metric) and row[metric] > before[metric] * (1 + tolerance):
+                regressions.append({
+                    'optimizer': row['optimizer'],
+                    'size': row['size'],
+                    'metric': metric,
+                    'baseline': before[metric],
+                    'current': row[metric],
+                    'change': round(row[metric] / before[metric] - 1, 3)
+                })
+    return regressions
+
+def print_header(stream=sys.stderr):
+    print(f'{"optimizer":<28}{"size":>9}{"wall s":>10}{"calls":>9}{"findings":>10}{"findings/s":>12}{"peak MB":>9}', file=stream)
+
+def print_rows(results, stream=sys.stderr):
+    for row in results:
+        if row.get('error'):
+            print(f'{row["optimizer"]:<28}{row["size"]:>9}  error: {row["error"]}', file=stream)
+            continue
+        print(
+            f'{row["optimizer"]:<28}{row["size"]:>9}{row["wall_seconds"]:>10.3f}{row["api_calls"]:>9}'
+            f'{row["findings"]:>10}{row["findings_per_second"] or 0:>12.0f}{row["peak_rss_mb"]:>9.1f}',
+            file=stream
+        )
+
+def main(argv=None):
+    from benchmarks.synthetic import parse_size
+
+    parser = argparse.ArgumentParser(description='Benchmark optimizers against synthetic AWS accounts')
+    parser.add_argument('--sizes', default='1k,100k,1m', help='Comma-separated account sizes in resources (k/m suffixes)')
+    parser.add_argument('--optimizers', help='Comma-separated optimizer names (default: all)')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Latency added to every AWS call')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Random extra latency of up to this much per call')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--region', default='us-east-1')
+    parser.add_argument('--cassette', help='Replay this recorded cassette instead of synthetic accounts')
+    parser.add_argument('--rate-limited', action='store_true', help='Keep the default per-service request rates')
+    parser.add_argument('--ecs-describe', action='store_true', help='Run the ECS optimizer in detail mode')
+    parser.add_argument('--efs-idle-days', type=int, default=0, help='Enable the EFS idle check')
+    parser.add_argument('--timeout', type=float, default=3600, help='Seconds allowed per optimizer run')
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--baseline', help='Earlier results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed growth over the baseline (0.2 = 20%%)')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    # A cassette is one recorded account, labelled by its file name in place of a size
+    sizes = [os.path.basename(args.cassette)] if args.cassette else [parse_size(size) for size in args.sizes.split(',')]
+    if args.worker:
+        print(json.dumps(run_one(
+            args.worker, sizes[0], args.latency_ms / 1000, args.jitter_ms / 1000, args.seed, args.region,
+            args.rate_limited, args.cassette
+        )))
+        return 0
+
+    available = discover_optimizers()
+    names = args.optimizers.split(',') if args.optimizers else list(available)
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        parser.error(f'Unknown optimizer(s): {", ".join(unknown)} (available: {", ".join(available)})')
+
+    results = []
+    print_header()
+    for size in sizes:
+        for name in names:
+            row = run_isolated(name, size, args)
+            results.append(row)
+            print_rows([row])
+    report = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {
+            'latency_ms': args.latency_ms,
+            'jitter_ms': args.jitter_ms,
+            'seed': args.seed,
+            'rate_limited': args.rate_limited,
+            'ecs_describe': args.ecs_describe,
+            'efs_idle_days': args.efs_idle_days,
+            'cassette': args.cassette
+        },
+        'results': results
+    }
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['regressions'] = compare(json.load(f), results, args.tolerance)
+        for regression in report['regressions']:
+            print(
+                f'REGRESSION {regression["optimizer"]} @ {regression["size"]}: {regression["metric"]} '
+                f'{regression["baseline"]} -> {regression["current"]} ({regression["change"]:+.0%})',
+                file=sys.stderr
+            )
+        status = 1 if report['regressions'] else 0
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Wrote {len(results)} results to {args.output}', file=sys.stderr)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,194 @@
+import random
+import threading
+import time
+from collections import Counter
+import botocore.session
+from botocore import xform_name
+from botocore.awsrequest import AWSResponse
+from optimizers.inventory import RESOURCE_KINDS
+
+# Page sizes AWS uses when a list call does not ask for one (1000 otherwise)
+DEFAULT_PAGE_SIZES = {
+    ('logs', 'describe_log_groups'): 50,
+    ('rds', 'describe_db_snapshots'): 100,
+    ('ecs', 'list_task_definitions'): 100,
+    ('efs', 'describe_file_systems'): 100,
+    ('elbv2', 'describe_load_balancers'): 400,
+    ('elbv2', 'describe_target_groups'): 400,
+    ('elb', 'describe_load_balancers'): 400,
+}
+DEFAULT_PAGE_SIZE = 1000
+
+# Parameters that narrow a list call to given resources: (service, operation) ->
+# ({parameter: resource field}, error code for IDs that do not exist, or None to skip them)
+ID_FILTERS = {
+    ('ec2', 'describe_volumes'): ({'VolumeIds': 'VolumeId'}, 'InvalidVolume.NotFound'),
+    ('ec2', 'describe_snapshots'): ({'SnapshotIds': 'SnapshotId'}, 'InvalidSnapshot.NotFound'),
+    ('ec2', 'describe_images'): ({'ImageIds': 'ImageId'}, 'InvalidAMIID.NotFound'),
+    ('ec2', 'describe_addresses'): (
+        {'PublicIps': 'PublicIp', 'AllocationIds': 'AllocationId'}, 'InvalidAddress.NotFound'
+    ),
+    ('ec2', 'describe_network_interfaces'): (
+        {'NetworkInterfaceIds': 'NetworkInterfaceId'}, 'InvalidNetworkInterfaceID.NotFound'
+    ),
+    ('ec2', 'describe_security_groups'): (
+        {'GroupIds': 'GroupId', 'GroupNames': 'GroupName'}, 'InvalidGroup.NotFound'
+    ),
+    ('ec2', 'describe_nat_gateways'): ({'NatGatewayIds': 'NatGatewayId'}, 'NatGatewayNotFound'),
+    ('ec2', 'describe_vpc_endpoints'): ({'VpcEndpointIds': 'VpcEndpointId'}, 'InvalidVpcEndpointId.NotFound'),
+    ('elbv2', 'describe_load_balancers'): (
+        {'Names': 'LoadBalancerName', 'LoadBalancerArns': 'LoadBalancerArn'}, 'LoadBalancerNotFound'
+    ),
+    ('elbv2', 'describe_target_groups'): (
+        {'Names': 'TargetGroupName', 'TargetGroupArns': 'TargetGroupArn'}, 'TargetGroupNotFound'
+    ),
+    ('elb', 'describe_load_balancers'): ({'LoadBalancerNames': 'LoadBalancerName'}, 'LoadBalancerNotFound'),
+    ('rds', 'describe_db_snapshots'): ({'DBSnapshotIdentifier': 'DBSnapshotIdentifier'}, 'DBSnapshotNotFound'),
+    ('efs', 'describe_file_systems'): ({'FileSystemId': 'FileSystemId'}, 'FileSystemNotFound'),
+    ('elasticbeanstalk', 'describe_environments'): (
+        {'EnvironmentIds': 'EnvironmentId', 'EnvironmentNames': 'EnvironmentName'}, None
+    ),
+}
+
+_paginator_models = botocore.session.get_session()
+_paginators = {}
+
+def _pagination(service, operation_name):
+    """Token and limit parameter names of a paginated operation, or None"""
+    key = (service, operation_name)
+    if key not in _paginators:
+        try:
+            _paginators[key] = _paginator_models.get_paginator_model(service).get_paginator(operation_name)
+        except Exception:
+            _paginators[key] = None
+    return _paginators[key]
+
+class AWSStandIn:
+    """Answers AWS calls from a SyntheticAccount inside botocore, before anything is sent
+
+    Installed as a client pool hook, so every pooled client (and with it every optimizer)
+    is served locally: list calls page through the account (or return the resources
+    named by their ID filters), follow-up calls are answered per resource. Each call
+    sleeps latency seconds plus up to jitter seconds.
+    """
+
+    def __init__(self, account, latency=0.0, jitter=0.0):
+        self.account = account
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self._kinds = {
+            (service, operation): (kind, result_key)
+            for kind, (service, operation, result_key, _) in RESOURCE_KINDS.items()
+        }
+        self._handlers = {
+            ('elbv2', 'describe_target_health'): self._describe_target_health,
+            ('efs', 'describe_mount_targets'): self._describe_mount_targets,
+            ('s3', 'get_bucket_location'): lambda params: {'LocationConstraint': self.account.region},
+            ('s3', 'list_objects_v2'): self._list_objects_v2,
+            ('s3', 'list_object_versions'): lambda params: {'Versions': [], 'DeleteMarkers': [], 'IsTruncated': False},
+            ('s3', 'list_multipart_uploads'): lambda params: {'Uploads': [], 'IsTruncated': False},
+            ('ecs', 'describe_task_definition'): self._describe_task_definition,
+            ('cloudwatch', 'get_metric_data'): self._get_metric_data,
+            ('sts', 'get_caller_identity'): lambda params: {
+                'Account': self.account.account_id,
+                'Arn': f'arn:aws:iam::{self.account.account_id}:user/benchmark'
+            },
+        }
+
+    def install(self, client_pool):
+        client_pool.register_client_hook(self.instrument_client)
+
+    def instrument_client(self, client, access_key, region, service):
+        client.meta.events.register('before-parameter-build', self._capture_params)
+        client.meta.events.register('before-call', self._respond)
+
+    def _capture_params(self, params, context, **kwargs):
+        # before-call only sees the serialized request, so keep the call's own arguments
+        context['stand_in_params'] = dict(params)
+
+    def _respond(self, model, context, **kwargs):
+        service = model.service_model.service_name
+        operation = xform_name(model.name)
+        with self._lock:
+            self.calls[f'{service}.{operation}'] += 1
+
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        params = context.get('stand_in_params', {})
+        if (service, operation) in self._kinds:
+            parsed = self._list(service, model.name, operation, params)
+        elif (service, operation) in self._handlers:
+            parsed = self._handlers[(service, operation)](params)
+        else:
+            parsed = {}
+        status = 400 if 'Error' in parsed else 200
+        parsed.setdefault('ResponseMetadata', {'HTTPStatusCode': status, 'RetryAttempts': 0})
+        return AWSResponse(f'https://{service}.{self.account.region}.amazonaws.com/', status, {}, None), parsed
+
+    def _list(self, service, operation_name, operation, params):
+        kind, result_key = self._kinds[(service, operation)]
+        fields, not_found = ID_FILTERS.get((service, operation), ({}, None))
+        wanted = {
+            fields[name]: {value} if isinstance(value, str) else set(value)
+            for name, value in params.items() if name in fields
+        }
+        if wanted:
+            return self._filtered(kind, result_key, wanted, not_found)
+
+        total = self.account.counts[kind]
+        pagination = _pagination(service, operation_name)
+        if pagination is None:
+            return {result_key: self.account.resources(kind)}
+
+        start = int(params.get(pagination['input_token']) or 0)
+        page_size = params.get(pagination.get('limit_key')) or DEFAULT_PAGE_SIZES.get((service, operation), DEFAULT_PAGE_SIZE)
+        stop = min(start + page_size, total)
+        response = {result_key: self.account.resources(kind, start, stop)}
+        if stop < total:
+            response[pagination['output_token']] = str(stop)
+        return response
+
+    def _filtered(self, kind, result_key, wanted, not_found):
+        """Resources matching every ID filter; like AWS, unknown IDs fail the call unless not_found is None"""
+        matches = [
+            resource for resource in self.account.resources(kind)
+            if all(resource.get(field) in values for field, values in wanted.items())
+        ]
+        if not_found:
+            for field, values in wanted.items():
+                missing = values - {resource[field] for resource in matches}
+                if missing:
+                    return {'Error': {'Code': not_found, 'Message': f'{", ".join(sorted(missing))} not found'}}
+        return {result_key: matches}
+
+    @staticmethod
+    def _index(identifier):
+        """Resource index encoded as the trailing hex number of a synthetic identifier"""
+        return int(identifier.rsplit('/', 1)[-1].rsplit('-', 1)[-1], 16)
+
+    def _describe_target_health(self, params):
+        return {'TargetHealthDescriptions': self.account.target_health(self._index(params['TargetGroupArn']))}
+
+    def _describe_mount_targets(self, params):
+        count = self.account.resource('file_systems', self._index(params['FileSystemId']))['NumberOfMountTargets']
+        return {'MountTargets': [{'MountTargetId': f'fsmt-{n}'} for n in range(count)]}
+
+    def _list_objects_v2(self, params):
+        return {'KeyCount': self.account.bucket_key_count(int(params['Bucket'].rsplit('-', 1)[-1]))}
+
+    def _describe_task_definition(self, params):
+        family, revision = params['taskDefinition'].rsplit('/', 1)[-1].rsplit(':', 1)
+        return {'taskDefinition': self.account.task_definition(int(family.rsplit('-', 1)[-1]) * 10 + int(revision) - 1)}
+
+    def _get_metric_data(self, params):
+        # One in four file systems had no metered I/O
+        return {
+            'MetricDataResults': [
+                {'Id': query['Id'], 'Values': [0.0] if int(query['Id'][2:]) % 4 == 0 else [2.0 ** 20]}
+                for query in params['MetricDataQueries']
+            ]
+        }
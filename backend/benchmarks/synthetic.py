@@ -0,0 +1,276 @@
+from datetime import datetime, timedelta, timezone
+
+# Share of an account's resources per inventory kind (sums to 1)
+RESOURCE_MIX = {
+    'snapshots': 0.25,
+    'log_groups': 0.13,
+    'volumes': 0.10,
+    'instances': 0.10,
+    'db_snapshots': 0.08,
+    'network_interfaces': 0.08,
+    'inactive_task_definitions': 0.08,
+    'images': 0.05,
+    'security_groups': 0.05,
+    'addresses': 0.02,
+    'target_groups': 0.02,
+    'load_balancers': 0.01,
+    'buckets': 0.01,
+    'classic_load_balancers': 0.005,
+    'file_systems': 0.005,
+    'vpc_endpoints': 0.005,
+    'nat_gateways': 0.003,
+    'environments': 0.002,
+}
+INSTANCE_TYPES = ('t3.micro', 't3.large', 'm5.large', 'm5.xlarge', 'c5.2xlarge', 'r5.large')
+VOLUME_TYPES = ('gp2', 'gp3', 'io1', 'st1', 'sc1')
+
+def parse_size(text):
+    """'1k' -> 1000, '100k' -> 100000, '1m' -> 1000000"""
+    text = str(text).strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+class SyntheticAccount:
+    """Deterministic fake AWS account whose resources are generated on demand, never held in memory
+
+    The i-th resource of a kind is always the same for a given seed, so relationships
+    (AMIs backing snapshots, instances launched from AMIs, ENIs using security groups,
+    target groups attached to load balancers) line up across services.
+    """
+
+    def __init__(self, size, region='us-east-1', account_id='123456789012', seed=0):
+        self.size = size
+        self.region = region
+        self.account_id = account_id
+        self.seed = seed
+        self.now = datetime.now(timezone.utc)
+        self.counts = {kind: max(1, int(size * share)) for kind, share in RESOURCE_MIX.items()}
+
+    def _hash(self, i):
+        return (i * 2654435761 + self.seed * 40503) & 0xffffffff
+
+    def _age(self, i, max_days=720):
+        return timedelta(days=self._hash(i) % max_days, seconds=self._hash(i) % 86400)
+
+    def _arn(self, service, resource):
+        return f'arn:aws:{service}:{self.region}:{self.account_id}:{resource}'
+
+    def resource(self, kind, i):
+        return getattr(self, f'_{kind}')(i)
+
+    def resources(self, kind, start=0, stop=None):
+        stop = self.counts[kind] if stop is None else min(stop, self.counts[kind])
+        return [self.resource(kind, i) for i in range(start, stop)]
+
+    # Identifiers shared between kinds
+
+    def snapshot_id(self, i):
+        return f'snap-{i:017x}'
+
+    def image_id(self, i):
+        return f'ami-{i:017x}'
+
+    def security_group_id(self, i):
+        return f'sg-{i:017x}'
+
+    def load_balancer_arn(self, i):
+        return self._arn('elasticloadbalancing', f'loadbalancer/app/bench-lb-{i}/{i:016x}')
+
+    def target_group_arn(self, i):
+        return self._arn('elasticloadbalancing', f'targetgroup/bench-tg-{i}/{i:016x}')
+
+    # Resource generators, one per inventory kind
+
+    def _snapshots(self, i):
+        return {
+            'SnapshotId': self.snapshot_id(i),
+            'VolumeId': f'vol-{i:017x}',
+            'StartTime': self.now - self._age(i),
+            'VolumeSize': 8 + self._hash(i) % 500,
+            'State': 'completed',
+            'Description': f'Created by CreateImage for {self.image_id(i)}' if i < self.counts['images'] else 'Nightly backup',
+            'StorageTier': 'archive' if i % 10 == 0 else 'standard',
+            'OwnerId': self.account_id
+        }
+
+    def _images(self, i):
+        return {
+            'ImageId': self.image_id(i),
+            'Name': f'bench-image-{i}',
+            'CreationDate': (self.now - self._age(i)).strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            'State': 'available',
+            'Architecture': 'x86_64',
+            'RootDeviceType': 'ebs',
+            'BlockDeviceMappings': [
+                {'DeviceName': '/dev/xvda', 'Ebs': {'SnapshotId': self.snapshot_id(i), 'VolumeSize': 8 + i % 64}}
+            ]
+        }
+
+    def _instances(self, i):
+        stopped = i % 4 == 0
+        instance = {
+            'InstanceId': f'i-{i:017x}',
+            'InstanceType': INSTANCE_TYPES[i % len(INSTANCE_TYPES)],
+            'State': {'Name': 'stopped' if stopped else 'running'},
+            'ImageId': self.image_id(i % max(1, self.counts['images'] // 2)),  # Half the AMIs stay in use
+            'LaunchTime': self.now - self._age(i),
+            'Tags': [{'Key': 'Name', 'Value': f'bench-instance-{i}'}]
+        }
+        if stopped:
+            instance['StateTransitionReason'] = 'User initiated'
+            instance['StateTransitionTime'] = self.now - self._age(i, 60)
+        return {'ReservationId': f'r-{i:017x}', 'Instances': [instance]}
+
+    def _volumes(self, i):
+        return {
+            'VolumeId': f'vol-{i:017x}',
+            'Size': 1 + self._hash(i) % 1000,
+            'VolumeType': VOLUME_TYPES[i % len(VOLUME_TYPES)],
+            'State': 'available' if i % 5 == 0 else 'in-use',
+            'CreateTime': self.now - self._age(i),
+            'AvailabilityZone': f'{self.region}a'
+        }
+
+    def _addresses(self, i):
+        address = {
+            'PublicIp': f'52.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}',
+            'AllocationId': f'eipalloc-{i:017x}',
+            'Domain': 'vpc'
+        }
+        if i % 3:
+            address['InstanceId'] = f'i-{i:017x}'
+        return address
+
+    def _network_interfaces(self, i):
+        return {
+            'NetworkInterfaceId': f'eni-{i:017x}',
+            'Groups': [{'GroupId': self.security_group_id(i % max(1, self.counts['security_groups'] // 2))}]
+        }
+
+    def _security_groups(self, i):
+        return {
+            'GroupId': self.security_group_id(i),
+            'GroupName': 'default' if i == 0 else f'bench-sg-{i}',
+            'Description': 'Benchmark security group',
+            'VpcId': 'vpc-0bench',
+            'IpPermissions': [{'IpProtocol': 'tcp', 'FromPort': 443, 'ToPort': 443}],
+            'IpPermissionsEgress': [{'IpProtocol': '-1'}]
+        }
+
+    def _nat_gateways(self, i):
+        return {
+            'NatGatewayId': f'nat-{i:017x}',
+            'State': 'available' if i % 2 else 'deleted',
+            'SubnetId': 'subnet-0bench',
+            'VpcId': 'vpc-0bench',
+            'NatGatewayAddresses': [{'PublicIp': f'54.{(i >> 8) & 255}.{i & 255}.1'}],
+            'CreateTime': self.now - self._age(i)
+        }
+
+    def _vpc_endpoints(self, i):
+        return {
+            'VpcEndpointId': f'vpce-{i:017x}',
+            'State': ('available', 'Failed', 'Expired', 'available')[i % 4],
+            'ServiceName': f'com.amazonaws.{self.region}.s3',
+            'VpcId': 'vpc-0bench',
+            'VpcEndpointType': 'Interface',
+            'SubnetIds': [f'subnet-{n}' for n in range(1 + i % 3)],
+            'CreationTimestamp': self.now - self._age(i)
+        }
+
+    def _load_balancers(self, i):
+        return {
+            'LoadBalancerArn': self.load_balancer_arn(i),
+            'LoadBalancerName': f'bench-lb-{i}',
+            'Type': 'network' if i % 3 == 0 else 'application',
+            'Scheme': 'internet-facing',
+            'VpcId': 'vpc-0bench',
+            'CreatedTime': self.now - self._age(i)
+        }
+
+    def _target_groups(self, i):
+        attached = i % 2 == 0
+        return {
+            'TargetGroupArn': self.target_group_arn(i),
+            'TargetGroupName': f'bench-tg-{i}',
+            'LoadBalancerArns': [self.load_balancer_arn(i % self.counts['load_balancers'])] if attached else []
+        }
+
+    def target_health(self, i):
+        if i % 3 == 0:
+            return []
+        return [{'Target': {'Id': f'i-{i:017x}', 'Port': 80}, 'TargetHealth': {'State': 'healthy'}}]
+
+    def _classic_load_balancers(self, i):
+        return {
+            'LoadBalancerName': f'bench-clb-{i}',
+            'DNSName': f'bench-clb-{i}.{self.region}.elb.amazonaws.com',
+            'Scheme': 'internet-facing',
+            'VPCId': 'vpc-0bench',
+            'Instances': [] if i % 2 else [{'InstanceId': f'i-{i:017x}'}],
+            'CreatedTime': self.now - self._age(i)
+        }
+
+    def _db_snapshots(self, i):
+        return {
+            'DBSnapshotIdentifier': f'bench-db-snapshot-{i}',
+            'DBInstanceIdentifier': f'bench-db-{i % 50}',
+            'SnapshotCreateTime': self.now - self._age(i),
+            'AllocatedStorage': 20 + self._hash(i) % 2000,
+            'Status': 'available',
+            'Engine': 'postgres'
+        }
+
+    def _file_systems(self, i):
+        size = (1 + self._hash(i) % 500) * 2 ** 30
+        return {
+            'FileSystemId': f'fs-{i:017x}',
+            'Name': f'bench-fs-{i}',
+            'SizeInBytes': {'Value': size, 'ValueInIA': size // 4, 'ValueInStandard': size - size // 4},
+            'NumberOfMountTargets': i % 3,
+            'PerformanceMode': 'generalPurpose',
+            'ThroughputMode': 'bursting'
+        }
+
+    def _log_groups(self, i):
+        created = self.now - self._age(i)
+        group = {
+            'logGroupName': f'/aws/lambda/bench-function-{i}',
+            'creationTime': int(created.timestamp() * 1000),
+            'storedBytes': self._hash(i) % (50 * 2 ** 30)
+        }
+        if i % 4:
+            last_event = created + (self.now - created) * ((self._hash(i) % 100) / 100)
+            group['lastEventTimestamp'] = int(last_event.timestamp() * 1000)
+        if i % 5 == 0:
+            group['retentionInDays'] = 30
+        return group
+
+    def _buckets(self, i):
+        return {'Name': f'bench-bucket-{i}', 'CreationDate': self.now - self._age(i), 'BucketRegion': self.region}
+
+    def bucket_key_count(self, i):
+        return 0 if i % 3 == 0 else 1
+
+    def _environments(self, i):
+        return {
+            'EnvironmentId': f'e-{i:010x}',
+            'EnvironmentName': f'bench-env-{i}',
+            'Status': ('Ready', 'Terminated', 'Terminating')[i % 3],
+            'PlatformArn': self._arn('elasticbeanstalk', 'platform/Python 3.11'),
+            'DateCreated': self.now - self._age(i),
+            'DateUpdated': self.now - self._age(i, 30)
+        }
+
+    def _inactive_task_definitions(self, i):
+        return self._arn('ecs', f'task-definition/bench-family-{i // 10}:{i % 10 + 1}')
+
+    def task_definition(self, i):
+        return {
+            'taskDefinitionArn': self._inactive_task_definitions(i),
+            'cpu': '256',
+            'memory': '512',
+            'status': 'INACTIVE',
+            'registeredAt': self.now - self._age(i),
+            'containerDefinitions': [{'name': 'app'}]
+        }
@@ -7,31 +7,30 @@ class AMIOptimizer(BaseOptimizer):
     def analyze(self):
         """Find old AMIs not being used"""
         try:
-            ec2 = self._get_client('ec2')
-            
-            # Get all AMIs owned by account
-            response = ec2.describe_images(Owners=['self'])
+            # AMIs launched by non-terminated instances are in use
+            used_ami_ids = self.inventory.instances_by_ami()
             
-            # Get all instances to see which AMIs are in use
-            instances_response = ec2.describe_instances()
-            used_ami_ids = set()
-            for reservation in instances_response.get('Reservations', []):
-                for instance in reservation.get('Instances', []):
-                    if instance['State']['Name'] != 'terminated':
-                        used_ami_ids.add(instance.get('ImageId'))
-            
-            for ami in response.get('Images', []):
+            for ami in self.inventory.resources('images'):
                 ami_id = ami['ImageId']
+                creation_time = datetime.fromisoformat(ami['CreationDate'].replace('Z', '+00:00'))
+                days_old = (datetime.now(creation_time.tzinfo) - creation_time).days
+                
+                in_use = ami_id in used_ami_ids
+                if self._carry_forward(ami_id, (
+                    ami.get('State'), ami.get('Name'), ami['CreationDate'], ami.get('BlockDeviceMappings'),
+                    in_use, days_old > 30
+                ), age_since=creation_time):
+                    continue
                 
                 # Only flag old AMIs not used by instances
-                if ami_id not in used_ami_ids:
-                    creation_time = datetime.fromisoformat(ami['CreationDate'].replace('Z', '+00:00'))
-                    days_old = (datetime.now(creation_time.tzinfo) - creation_time).days
-                    
+                if not in_use:
                     # Only flag if older than 30 days
                     if days_old > 30:
-                        # Estimate $1 per snapshot + storage
-                        monthly_cost = 1.0
+                        # Deregistering lets the AMI's backing snapshots go
+                        size = sum(
+                            mapping['Ebs'].get('VolumeSize', 0)
+                            for mapping in ami.get('BlockDeviceMappings', []) if 'Ebs' in mapping
+                        )
                         
                         self.add_finding(
                             resource_id=ami_id,
@@ -43,9 +42,9 @@ class AMIOptimizer(BaseOptimizer):
                                 'days_old': days_old,
                                 'architecture': ami.get('Architecture', ''),
                                 'root_device_type': ami.get('RootDeviceType', ''),
-                                'state': ami.get('State', '')
-                            },
-                            estimated_savings=monthly_cost
+                                'state': ami.get('State', ''),
+                                'size_gb': size
+                            }
                         )
             
             return self.findings
@@ -56,25 +55,10 @@ class AMIOptimizer(BaseOptimizer):
         """Delete AMIs"""
         try:
             ec2 = self._get_client('ec2')
-            results = []
-            
-            for ami_id in resource_ids:
-                try:
-                    # Deregister AMI
-                    ec2.deregister_image(ImageId=ami_id, DryRun=self.dry_run)
-                    
-                    results.append({
-                        'resource_id': ami_id,
-                        'status': 'success',
-                        'message': f'Deleted AMI {ami_id}'
-                    })
-                except Exception as e:
-                    results.append({
-                        'resource_id': ami_id,
-                        'status': 'failed',
-                        'error': str(e)
-                    })
-            
-            return results
+            return self._execute_concurrent(
+                resource_ids,
+                lambda ami_id: ec2.deregister_image(ImageId=ami_id, DryRun=self.dry_run),
+                'Deleted AMI {}'
+            )
         except Exception as e:
             return {'error': str(e)}
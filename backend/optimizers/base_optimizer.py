@@ -1,35 +1,150 @@
-import boto3
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from botocore.exceptions import ClientError
+from .client_pool import client_pool
+from .findings import AGE_KEYS, Finding, FindingsStore
+from .incremental import fingerprint
+from .inventory import ResourceInventory, ScanCancelled, paginate
+from .pricing import price_list
+from . import rate_limiter  # Installs throttling-aware limits on every pooled client
+from . import cassette  # Records or replays AWS calls when AWS_OPTIMIZER_CASSETTE is set
+
+# Errors that would repeat identically for every resource in a batch
+BATCH_WIDE_ERRORS = ('DryRunOperation', 'UnauthorizedOperation', 'AccessDenied', 'AccessDeniedException')
 
 class BaseOptimizer(ABC):
     """Base class for all optimization techniques"""
     
-    def __init__(self, access_key, secret_key, region='us-east-1'):
+    max_workers = 10  # Concurrent single-resource calls in optimize()
+    
+    def __init__(self, access_key, secret_key, region='us-east-1', session_token=None, inventory=None):
         self.region = region
         self.access_key = access_key
         self.secret_key = secret_key
+        self.session_token = session_token  # Set for assumed-role credentials
         self.dry_run = True  # Safe by default
-        self.findings = []
-    
-    def _get_client(self, service):
-        """Get AWS service client"""
-        return boto3.client(
-            service,
-            region_name=self.region,
-            aws_access_key_id=self.access_key,
-            aws_secret_access_key=self.secret_key
+        self.findings = FindingsStore()
+        self.errors = []  # Resources that could not be evaluated
+        self.known_details = {}  # resource_id -> finding details seen by analyze()
+        self._inventory = inventory  # Shared across optimizers within one scan
+        self.on_finding = None  # Optional callback invoked with each new finding
+        self.keep_findings = True  # False when findings are only consumed through on_finding
+        self.cancel_event = None  # Optional threading.Event that aborts the scan
+        self.scan_state = None  # Optional ScanState from the previous scan, for incremental scans
+    
+    @property
+    def inventory(self):
+        """Resource inventory for this account and region (private one if none was shared)"""
+        if self._inventory is None:
+            self._inventory = ResourceInventory(
+                self.access_key, self.secret_key, self.region, self.session_token, self.cancel_event
+            )
+        return self._inventory
+    
+    def _get_client(self, service, region=None):
+        """Get pooled AWS service client (for the scan region unless another is given)"""
+        return client_pool.get_client(
+            service, region or self.region, self.access_key, self.secret_key, self.session_token
         )
     
     def _get_resource(self, service):
         """Get AWS service resource"""
-        return boto3.resource(
-            service,
-            region_name=self.region,
-            aws_access_key_id=self.access_key,
-            aws_secret_access_key=self.secret_key
+        return client_pool.get_resource(
+            service, self.region, self.access_key, self.secret_key, self.session_token
         )
     
+    def _paginate(self, client, operation, result_key, **kwargs):
+        """Yield resources page by page from a list/describe call"""
+        return paginate(client, operation, result_key, self.cancel_event, **kwargs)
+    
+    def _cancelled(self):
+        return self.cancel_event is not None and self.cancel_event.is_set()
+    
+    def _check_cancelled(self):
+        """Stop the scan once its cancel event is set"""
+        if self._cancelled():
+            raise ScanCancelled()
+    
+    def _execute_concurrent(self, resource_ids, call, message):
+        """Run a single-resource call for each ID on a bounded worker pool, one result per resource
+        
+        Once the cancel event is set, the remaining IDs are reported as failed without a call.
+        """
+        def run(resource_id):
+            if self._cancelled():
+                return {'resource_id': resource_id, 'status': 'failed', 'error': str(ScanCancelled())}
+            try:
+                call(resource_id)
+                return {
+                    'resource_id': resource_id,
+                    'status': 'success',
+                    'message': message.format(resource_id)
+                }
+            except Exception as e:
+                return {
+                    'resource_id': resource_id,
+                    'status': 'failed',
+                    'error': str(e)
+                }
+        
+        if not resource_ids:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(resource_ids))) as pool:
+            return list(pool.map(run, resource_ids))
+    
+    def _dry_run_results(self, resource_ids, message):
+        """Results of a dry run for calls without a DryRun parameter; nothing is sent to AWS"""
+        return [
+            {'resource_id': resource_id, 'status': 'success', 'message': message.format(resource_id)}
+            for resource_id in resource_ids
+        ]
+    
+    def _execute_batched(self, resource_ids, call, batch_size, message, fallback=None):
+        """Run a multi-resource call in batches of at most batch_size, one result per resource
+        
+        call(batch) may return a {resource_id: error} dict for partial failures. When a
+        whole batch fails, its IDs are retried one at a time through fallback(resource_id)
+        so a single bad ID does not fail the rest.
+        """
+        results = []
+        resource_ids = list(resource_ids)
+        for start in range(0, len(resource_ids), batch_size):
+            batch = resource_ids[start:start + batch_size]
+            if self._cancelled():
+                results.extend(
+                    {'resource_id': resource_id, 'status': 'failed', 'error': str(ScanCancelled())}
+                    for resource_id in batch
+                )
+                continue
+            try:
+                failures = call(batch) or {}
+            except Exception as e:
+                code = e.response['Error']['Code'] if isinstance(e, ClientError) else None
+                if fallback is not None and len(batch) > 1 and code not in BATCH_WIDE_ERRORS:
+                    results.extend(self._execute_concurrent(batch, fallback, message))
+                else:
+                    results.extend(
+                        {'resource_id': resource_id, 'status': 'failed', 'error': str(e)}
+                        for resource_id in batch
+                    )
+                continue
+            
+            for resource_id in batch:
+                if resource_id in failures:
+                    results.append({
+                        'resource_id': resource_id,
+                        'status': 'failed',
+                        'error': failures[resource_id]
+                    })
+                else:
+                    results.append({
+                        'resource_id': resource_id,
+                        'status': 'success',
+                        'message': message.format(resource_id)
+                    })
+        return results
+    
     @abstractmethod
     def analyze(self):
         """Analyze resources for optimization"""
@@ -40,15 +155,96 @@ class BaseOptimizer(ABC):
         """Perform optimization"""
         pass
     
-    def add_finding(self, resource_id, resource_type, details, estimated_savings=0):
-        """Add a finding"""
-        self.findings.append({
-            'resource_id': resource_id,
-            'resource_type': resource_type,
-            'details': details,
-            'estimated_savings': estimated_savings,
-            'timestamp': datetime.now().isoformat()
-        })
+    def remember_findings(self, findings):
+        """Reuse finding details from an earlier analyze() so optimize() can skip lookups"""
+        for finding in findings:
+            self.known_details[finding['resource_id']] = finding.get('details', {})
+    
+    def _resolve(self, resource_ids, from_details, lookup, batch_size=None):
+        """Resolve many resource IDs to the identifiers an optimize call needs
+        
+        from_details(details) reads the identifier from a known finding, returning None if
+        it is not there. Remaining IDs go to lookup(ids) -> {resource_id: identifier} in
+        chunks of batch_size; a chunk that fails is retried one ID at a time. Returns
+        (resolved, errors) where errors maps IDs whose lookup failed to the error message.
+        """
+        resolved = {}
+        errors = {}
+        missing = []
+        for resource_id in resource_ids:
+            details = self.known_details.get(resource_id)
+            value = from_details(details) if details else None
+            if value:
+                resolved[resource_id] = value
+            else:
+                missing.append(resource_id)
+        
+        batch_size = batch_size or len(missing) or 1
+        for start in range(0, len(missing), batch_size):
+            chunk = missing[start:start + batch_size]
+            try:
+                resolved.update(lookup(chunk))
+            except ClientError as e:
+                if len(chunk) == 1 or e.response['Error']['Code'] in BATCH_WIDE_ERRORS:
+                    errors.update((resource_id, str(e)) for resource_id in chunk)
+                    continue
+                # Bulk lookups fail as a whole when any one ID is unknown
+                for resource_id in chunk:
+                    try:
+                        resolved.update(lookup([resource_id]))
+                    except ClientError as e:
+                        errors[resource_id] = str(e)
+        return resolved, errors
+    
+    def _carry_forward(self, resource_id, fingerprint_values, age_since=None):
+        """In incremental scans, reuse the previous verdict for a resource whose fingerprint is unchanged
+        
+        fingerprint_values are the listing fields (and derived flags, e.g. "past the age
+        threshold") the verdict depends on. Returns True when the resource needs no
+        evaluation; its earlier finding, if any, is added again with its age in days since
+        age_since brought up to date. Otherwise the caller's verdict is recorded.
+        """
+        if self.scan_state is None:
+            return False
+        
+        value = fingerprint(fingerprint_values)
+        previous = self.scan_state.previous.get(resource_id)
+        self.scan_state.record(resource_id, value)
+        if previous is None or previous[0] != value:
+            return False
+        
+        self.scan_state.reused += 1
+        if previous[1] is not None:
+            resource_type, details = previous[1]
+            details = dict(details)
+            if age_since is not None:
+                for key in AGE_KEYS:
+                    if key in details:
+                        details[key] = (datetime.now(age_since.tzinfo) - age_since).days
+                        break
+            self.add_finding(resource_id, resource_type, details)
+        return True
+    
+    def add_finding(self, resource_id, resource_type, details, estimated_savings=None):
+        """Add a finding, priced from the price list unless estimated_savings is given"""
+        self._check_cancelled()
+        
+        if estimated_savings is None:
+            estimated_savings = price_list.estimate(resource_type, details, self.region)
+        
+        if self.keep_findings:
+            finding = self.findings.add(resource_id, resource_type, details, estimated_savings)
+        else:
+            finding = Finding(resource_id, resource_type, details, estimated_savings, self.findings.timestamp)
+        self.known_details[resource_id] = details
+        if self.scan_state is not None:
+            self.scan_state.record_finding(resource_id, resource_type, details)
+        if self.on_finding is not None:
+            self.on_finding(finding)
+    
+    def add_error(self, resource_id, error):
+        """Record a resource that could not be evaluated"""
+        self.errors.append({'resource_id': resource_id, 'error': error})
     
     def get_findings(self):
         """Get all findings"""
@@ -0,0 +1,220 @@
+import atexit
+import base64
+import gzip
+import json
+import os
+import threading
+from collections import Counter, deque
+from datetime import datetime
+from functools import partial
+from botocore import xform_name
+from botocore.awsrequest import AWSResponse
+from .client_pool import client_pool
+
+RECORD = 'record'
+REPLAY = 'replay'
+FORMAT_VERSION = 1
+FLUSH_EVERY = 500  # Recorded calls between flushes, so an interrupted recording stays readable
+# Fields never written to a cassette (STS session credentials, passwords); replay serves REDACTED
+SECRET_FIELDS = frozenset({
+    'SecretAccessKey', 'SessionToken', 'Password', 'MasterUserPassword', 'NewPassword', 'OldPassword'
+})
+REDACTED = 'REDACTED'
+
+class CassetteMiss(LookupError):
+    """A replayed scan made a call the cassette has no response for"""
+
+def encode(value):
+    """JSON-ready copy of request parameters or a parsed response, tagging datetimes and bytes
+
+    Secrets (SECRET_FIELDS) are replaced by REDACTED, so they never reach the file.
+    """
+    if isinstance(value, dict):
+        return {key: REDACTED if key in SECRET_FIELDS else encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode(item) for item in value]
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, (bytes, bytearray)):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    raise TypeError(f'Cannot record {type(value).__name__} values')
+
+def decode(value):
+    """Fresh copy of an encoded value with datetimes and bytes restored"""
+    if isinstance(value, dict):
+        if len(value) == 1:
+            if '__datetime__' in value:
+                return datetime.fromisoformat(value['__datetime__'])
+            if '__bytes__' in value:
+                return base64.b64decode(value['__bytes__'])
+        return {key: decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+    return value
+
+def _without_datetimes(value):
+    if isinstance(value, dict):
+        if len(value) == 1 and '__datetime__' in value:
+            return '__datetime__'
+        return {key: _without_datetimes(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_without_datetimes(item) for item in value]
+    return value
+
+def request_key(service, region, operation, params):
+    """Replay lookup key of a call from its encoded parameters
+
+    Timestamps are left out: requests such as metric windows are built from the current
+    time and would never match their recording otherwise.
+    """
+    return json.dumps([service, region, operation, _without_datetimes(params)], sort_keys=True)
+
+class Cassette:
+    """Records every AWS response of pooled clients to a gzipped NDJSON file, or serves them back
+
+    Each line holds one call: service, region, operation, request parameters, HTTP status
+    and the parsed response, errors included so replay raises the same ClientError.
+    Replay answers calls inside botocore, ahead of rate limiting and the network, so any
+    credentials work. Identical calls are served in recorded order, the last response
+    repeating once they run out.
+    """
+
+    def __init__(self, path, mode=REPLAY):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f'Unknown cassette mode: {mode}')
+        self.path = path
+        self.mode = mode
+        self.calls = Counter()  # "service.operation" -> calls recorded or replayed
+        self.misses = 0
+        self.skipped = 0  # Responses that could not be recorded (streaming bodies)
+        self._lock = threading.Lock()
+        self._responses = {}  # request key -> deque of (status, encoded response)
+        self._file = None
+        self._closed = False
+        self._unflushed = 0
+        if mode == REPLAY:
+            self._load()
+
+    def _open(self):
+        """Start the recording on its first call; caller holds the lock
+
+        Opening lazily leaves the file alone in processes that never call AWS, such as
+        the reloader parent of the development server.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = gzip.open(self.path, 'wt', encoding='utf-8')
+        self._file.write(json.dumps({'cassette': FORMAT_VERSION}) + '\n')
+
+    def _load(self):
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            header = json.loads(f.readline() or '{}')
+            if header.get('cassette') != FORMAT_VERSION:
+                raise ValueError(f'{self.path} is not a version {FORMAT_VERSION} cassette')
+            try:
+                for line in f:
+                    call = json.loads(line)
+                    key = request_key(call['service'], call['region'], call['operation'], call['params'])
+                    self._responses.setdefault(key, deque()).append((call['status'], call['response']))
+            except (EOFError, json.JSONDecodeError):
+                pass  # Recording was interrupted; replay what was flushed
+
+    def instrument_client(self, client, access_key, region, service):
+        # First, so the parameters are the caller's own before botocore fills in defaults
+        client.meta.events.register_first('before-parameter-build', self._capture_params)
+        if self.mode == RECORD:
+            client.meta.events.register('after-call', partial(self._record, region))
+        else:
+            client.meta.events.register_first('before-call', partial(self._replay, region))
+
+    def _capture_params(self, params, context, **kwargs):
+        try:
+            context['cassette_params'] = encode(params)
+        except TypeError:
+            context['cassette_params'] = None
+
+    def _record(self, region, http_response, parsed, model, context, **kwargs):
+        service = model.service_model.service_name
+        operation = xform_name(model.name)
+        params = context.get('cassette_params')
+        response = {key: value for key, value in parsed.items() if key != 'ResponseMetadata'}
+        try:
+            if params is None:
+                raise TypeError('Request parameters could not be recorded')
+            line = json.dumps({
+                'service': service,
+                'region': region,
+                'operation': operation,
+                'params': params,
+                'status': http_response.status_code,
+                'response': encode(response)
+            })
+        except TypeError:
+            with self._lock:
+                self.skipped += 1
+            return
+
+        with self._lock:
+            if self._closed:
+                return
+            if self._file is None:
+                self._open()
+            self._file.write(line + '\n')
+            self.calls[f'{service}.{operation}'] += 1
+            self._unflushed += 1
+            if self._unflushed >= FLUSH_EVERY:
+                self._file.flush()
+                self._unflushed = 0
+
+    def _replay(self, region, model, context, **kwargs):
+        service = model.service_model.service_name
+        operation = xform_name(model.name)
+        key = request_key(service, region, operation, context.get('cassette_params'))
+        with self._lock:
+            responses = self._responses.get(key)
+            if not responses:
+                self.misses += 1
+                raise CassetteMiss(f'No recorded response for {service}.{operation} in {region}')
+            status, response = responses[0] if len(responses) == 1 else responses.popleft()
+            self.calls[f'{service}.{operation}'] += 1
+
+        parsed = decode(response)
+        parsed['ResponseMetadata'] = {'HTTPStatusCode': status, 'RetryAttempts': 0}
+        return AWSResponse(f'https://{service}.{region}.amazonaws.com/', status, {}, None), parsed
+
+    def close(self):
+        """Finish the recording; replaying cassettes hold no open file"""
+        with self._lock:
+            self._closed = True
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'path': self.path,
+                'mode': self.mode,
+                'calls': sum(self.calls.values()),
+                'misses': self.misses,
+                'skipped': self.skipped
+            }
+
+def install(path, mode=REPLAY, pool=client_pool):
+    """Record or replay every client the pool builds from now on"""
+    cassette = Cassette(path, mode)
+    pool.clear()  # Clients built earlier would bypass the cassette
+    pool.register_client_hook(cassette.instrument_client)
+    if mode == RECORD:
+        atexit.register(cassette.close)
+    return cassette
+
+
+# Set AWS_OPTIMIZER_CASSETTE to record (AWS_OPTIMIZER_CASSETTE_MODE=record) or replay every AWS call
+active_cassette = None
+if os.environ.get('AWS_OPTIMIZER_CASSETTE'):
+    active_cassette = install(
+        os.path.expanduser(os.environ['AWS_OPTIMIZER_CASSETTE']),
+        os.environ.get('AWS_OPTIMIZER_CASSETTE_MODE', REPLAY)
+    )
@@ -0,0 +1,142 @@
+import hashlib
+import os
+import threading
+import time
+import boto3
+from botocore.config import Config
+
+class ClientPool:
+    """Thread-safe pool of boto3 sessions and clients shared by all optimizers"""
+
+    def __init__(self, max_pool_connections=50, tcp_keepalive=True, idle_timeout=900, sweep_interval=60):
+        self.max_pool_connections = max_pool_connections
+        self.tcp_keepalive = tcp_keepalive
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self._lock = threading.Lock()
+        self._sessions = {}  # credentials key -> [session, last_used]
+        self._clients = {}   # (credentials key, region, service, endpoint) -> [client, last_used]
+        self._last_sweep = time.monotonic()
+        self._client_hooks = []  # Called with (client, access_key, region, service) on creation
+
+    def configure(self, **options):
+        """Update pool tunables; cached clients are rebuilt with the new config"""
+        with self._lock:
+            for name, value in options.items():
+                if not hasattr(self, name) or name.startswith('_'):
+                    raise ValueError(f'Unknown client pool option: {name}')
+                setattr(self, name, value)
+            self._close_clients(list(self._clients))
+
+    def register_client_hook(self, hook):
+        """Register a callable that instruments every newly created client"""
+        self._client_hooks.append(hook)
+
+    def _credentials_key(self, access_key, secret_key, session_token=None):
+        """Key sessions by access key plus a digest of the secrets, never the secrets themselves"""
+        digest = hashlib.sha256(f'{secret_key or ""}:{session_token or ""}'.encode()).hexdigest()
+        return (access_key, digest)
+
+    def _config(self):
+        return Config(
+            max_pool_connections=self.max_pool_connections,
+            tcp_keepalive=self.tcp_keepalive
+        )
+
+    def _get_session(self, creds_key, access_key, secret_key, session_token, now):
+        """Get or create the session for a credential set; caller holds the lock"""
+        entry = self._sessions.get(creds_key)
+        if entry is None:
+            entry = [
+                boto3.session.Session(
+                    aws_access_key_id=access_key,
+                    aws_secret_access_key=secret_key,
+                    aws_session_token=session_token
+                ),
+                now
+            ]
+            self._sessions[creds_key] = entry
+        entry[1] = now
+        return entry[0]
+
+    def get_client(self, service, region, access_key, secret_key, session_token=None, endpoint_url=None):
+        """Get a pooled client for (credentials, region, service)"""
+        now = time.monotonic()
+        creds_key = self._credentials_key(access_key, secret_key, session_token)
+        key = (creds_key, region, service, endpoint_url)
+
+        with self._lock:
+            self._maybe_sweep(now)
+            entry = self._clients.get(key)
+            if entry is None:
+                # Sessions are not thread-safe, so clients are built under the lock
+                session = self._get_session(creds_key, access_key, secret_key, session_token, now)
+                client = session.client(
+                    service,
+                    region_name=region,
+                    endpoint_url=endpoint_url,
+                    config=self._config()
+                )
+                for hook in self._client_hooks:
+                    hook(client, access_key, region, service)
+                entry = [client, now]
+                self._clients[key] = entry
+            else:
+                self._sessions[creds_key][1] = now
+            entry[1] = now
+            return entry[0]
+
+    def get_resource(self, service, region, access_key, secret_key, session_token=None):
+        """Get a resource from the pooled session (resources are not shared across threads)"""
+        now = time.monotonic()
+        creds_key = self._credentials_key(access_key, secret_key, session_token)
+        with self._lock:
+            session = self._get_session(creds_key, access_key, secret_key, session_token, now)
+            return session.resource(service, region_name=region, config=self._config())
+
+    def _maybe_sweep(self, now):
+        """Evict clients and sessions idle for longer than idle_timeout; caller holds the lock"""
+        if now - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = now
+
+        cutoff = now - self.idle_timeout
+        self._close_clients([key for key, entry in self._clients.items() if entry[1] < cutoff])
+
+        live_creds = {key[0] for key in self._clients}
+        for creds_key in [k for k, entry in self._sessions.items() if entry[1] < cutoff and k not in live_creds]:
+            del self._sessions[creds_key]
+
+    def _close_clients(self, keys):
+        for key in keys:
+            client, _ = self._clients.pop(key)
+            try:
+                client.close()
+            except Exception:
+                pass
+
+    def evict_credentials(self, access_key, secret_key, session_token=None):
+        """Drop every session and client built from a credential set"""
+        creds_key = self._credentials_key(access_key, secret_key, session_token)
+        with self._lock:
+            self._close_clients([key for key in self._clients if key[0] == creds_key])
+            self._sessions.pop(creds_key, None)
+
+    def clear(self):
+        """Drop all pooled sessions and clients"""
+        with self._lock:
+            self._close_clients(list(self._clients))
+            self._sessions.clear()
+
+    def stats(self):
+        """Return pool sizes"""
+        with self._lock:
+            return {'sessions': len(self._sessions), 'clients': len(self._clients)}
+
+
+# Shared pool used by every optimizer and the credential manager
+client_pool = ClientPool(
+    max_pool_connections=int(os.environ.get('AWS_OPTIMIZER_MAX_POOL_CONNECTIONS', 50)),
+    tcp_keepalive=os.environ.get('AWS_OPTIMIZER_TCP_KEEPALIVE', '1') != '0',
+    idle_timeout=int(os.environ.get('AWS_OPTIMIZER_CLIENT_IDLE_TIMEOUT', 900))
+)
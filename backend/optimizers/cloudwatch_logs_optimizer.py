@@ -7,23 +7,24 @@ class CloudWatchLogsOptimizer(BaseOptimizer):
     def analyze(self):
         """Find inactive CloudWatch log groups"""
         try:
-            logs = self._get_client('logs')
-            
-            response = logs.describe_log_groups()
-            
-            for log_group in response.get('logGroups', []):
+            for log_group in self.inventory.resources('log_groups'):
                 lg_name = log_group['logGroupName']
                 creation_time = log_group.get('creationTime', 0)
                 creation_dt = datetime.fromtimestamp(creation_time / 1000)
                 last_event_time = log_group.get('lastEventTimestamp', 0)
                 
-                days_since_activity = (datetime.now() - datetime.fromtimestamp(last_event_time / 1000)).days if last_event_time else 999
+                last_event = datetime.fromtimestamp(last_event_time / 1000) if last_event_time else None
+                days_since_activity = (datetime.now() - last_event).days if last_event else 999
+                
+                if self._carry_forward(lg_name, (
+                    creation_time, last_event_time, log_group.get('storedBytes'), log_group.get('retentionInDays'),
+                    days_since_activity > 30
+                ), age_since=last_event):
+                    continue
                 
                 # Only flag log groups with no activity for > 30 days
                 if days_since_activity > 30:
                     size = log_group.get('storedBytes', 0)
-                    # Estimate $0.50 per GB-month for CloudWatch Logs
-                    monthly_cost = (size / (1024**3)) * 0.50
                     
                     self.add_finding(
                         resource_id=lg_name,
@@ -35,8 +36,7 @@ class CloudWatchLogsOptimizer(BaseOptimizer):
                             'stored_bytes': size,
                             'stored_gb': round(size / (1024**3), 2),
                             'retention_days': log_group.get('retentionInDays', 'Never Expire')
-                        },
-                        estimated_savings=monthly_cost
+                        }
                     )
             
             return self.findings
@@ -47,23 +47,10 @@ class CloudWatchLogsOptimizer(BaseOptimizer):
         """Delete CloudWatch log groups"""
         try:
             logs = self._get_client('logs')
-            results = []
-            
-            for log_group_name in resource_ids:
-                try:
-                    logs.delete_log_group(logGroupName=log_group_name)
-                    results.append({
-                        'resource_id': log_group_name,
-                        'status': 'success',
-                        'message': f'Deleted log group {log_group_name}'
-                    })
-                except Exception as e:
-                    results.append({
-                        'resource_id': log_group_name,
-                        'status': 'failed',
-                        'error': str(e)
-                    })
-            
-            return results
+            return self._execute_concurrent(
+                resource_ids,
+                lambda log_group_name: logs.delete_log_group(logGroupName=log_group_name),
+                'Deleted log group {}'
+            )
         except Exception as e:
             return {'error': str(e)}
@@ -7,30 +7,31 @@ class EBSOptimizer(BaseOptimizer):
     def analyze(self):
         """Find unattached EBS volumes"""
         try:
-            ec2 = self._get_client('ec2')
-            response = ec2.describe_volumes(
-                Filters=[{'Name': 'status', 'Values': ['available']}]
-            )
-            
-            for volume in response.get('Volumes', []):
-                size = volume['Size']
+            for volume in self.inventory.resources('volumes'):
                 create_time = volume['CreateTime']
-                days_old = (datetime.now(create_time.tzinfo) - create_time).days
+                if self._carry_forward(volume['VolumeId'], (
+                    volume['State'], volume['Size'], volume.get('VolumeType'), volume.get('AvailabilityZone')
+                ), age_since=create_time):
+                    continue
                 
-                # Estimate $0.10 per GB-month
-                monthly_cost = size * 0.10
+                # Only unattached volumes
+                if volume['State'] != 'available':
+                    continue
+                
+                size = volume['Size']
+                days_old = (datetime.now(create_time.tzinfo) - create_time).days
                 
                 self.add_finding(
                     resource_id=volume['VolumeId'],
                     resource_type='EBS Volume',
                     details={
                         'size_gb': size,
+                        'volume_type': volume.get('VolumeType', ''),
                         'created': create_time.isoformat(),
                         'days_old': days_old,
                         'availability_zone': volume['AvailabilityZone'],
                         'state': volume['State']
-                    },
-                    estimated_savings=monthly_cost
+                    }
                 )
             
             return self.findings
@@ -41,26 +42,10 @@ class EBSOptimizer(BaseOptimizer):
         """Delete EBS volumes"""
         try:
             ec2 = self._get_client('ec2')
-            results = []
-            
-            for volume_id in resource_ids:
-                try:
-                    ec2.delete_volume(
-                        VolumeId=volume_id,
-                        DryRun=self.dry_run
-                    )
-                    results.append({
-                        'resource_id': volume_id,
-                        'status': 'success',
-                        'message': f'Deleted EBS volume {volume_id}'
-                    })
-                except Exception as e:
-                    results.append({
-                        'resource_id': volume_id,
-                        'status': 'failed',
-                        'error': str(e)
-                    })
-            
-            return results
+            return self._execute_concurrent(
+                resource_ids,
+                lambda volume_id: ec2.delete_volume(VolumeId=volume_id, DryRun=self.dry_run),
+                'Deleted EBS volume {}'
+            )
         except Exception as e:
             return {'error': str(e)}
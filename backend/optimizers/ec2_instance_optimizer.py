@@ -1,41 +1,36 @@
 from .base_optimizer import BaseOptimizer
 from datetime import datetime, timedelta
 
+TERMINATE_BATCH_SIZE = 1000  # TerminateInstances limit
+
 class EC2InstanceOptimizer(BaseOptimizer):
     """Terminate stopped EC2 instances"""
     
     def analyze(self):
         """Find stopped instances"""
         try:
-            ec2 = self._get_client('ec2')
-            response = ec2.describe_instances(
-                Filters=[{'Name': 'instance-state-name', 'Values': ['stopped']}]
-            )
-            
-            for reservation in response.get('Reservations', []):
-                for instance in reservation.get('Instances', []):
-                    state_transition_reason = instance.get('StateTransitionReason', '')
-                    state_change_time = instance.get('StateTransitionTime', datetime.now())
-                    
-                    days_stopped = (datetime.now(state_change_time.tzinfo) - state_change_time).days
-                    
-                    # Estimate based on instance type (average $0.05/hour for t2.micro)
-                    monthly_cost = 0.05 * 24 * 30
-                    
-                    if days_stopped > 7:  # Only flag if stopped for > 7 days
-                        self.add_finding(
-                            resource_id=instance['InstanceId'],
-                            resource_type='EC2 Instance',
-                            details={
-                                'instance_type': instance.get('InstanceType', 'Unknown'),
-                                'state': instance['State']['Name'],
-                                'stopped_time': state_change_time.isoformat(),
-                                'days_stopped': days_stopped,
-                                'tags': {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])},
-                                'launch_time': instance.get('LaunchTime', '').isoformat() if instance.get('LaunchTime') else ''
-                            },
-                            estimated_savings=monthly_cost
-                        )
+            for instance in self.inventory.resources('instances'):
+                if instance['State']['Name'] != 'stopped':
+                    continue
+                
+                state_transition_reason = instance.get('StateTransitionReason', '')
+                state_change_time = instance.get('StateTransitionTime', datetime.now())
+                
+                days_stopped = (datetime.now(state_change_time.tzinfo) - state_change_time).days
+                
+                if days_stopped > 7:  # Only flag if stopped for > 7 days
+                    self.add_finding(
+                        resource_id=instance['InstanceId'],
+                        resource_type='EC2 Instance',
+                        details={
+                            'instance_type': instance.get('InstanceType', 'Unknown'),
+                            'state': instance['State']['Name'],
+                            'stopped_time': state_change_time.isoformat(),
+                            'days_stopped': days_stopped,
+                            'tags': {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])},
+                            'launch_time': instance.get('LaunchTime', '').isoformat() if instance.get('LaunchTime') else ''
+                        }
+                    )
             
             return self.findings
         except Exception as e:
@@ -45,26 +40,13 @@ class EC2InstanceOptimizer(BaseOptimizer):
         """Terminate EC2 instances"""
         try:
             ec2 = self._get_client('ec2')
-            results = []
-            
-            for instance_id in resource_ids:
-                try:
-                    ec2.terminate_instances(
-                        InstanceIds=[instance_id],
-                        DryRun=self.dry_run
-                    )
-                    results.append({
-                        'resource_id': instance_id,
-                        'status': 'success',
-                        'message': f'Terminated instance {instance_id}'
-                    })
-                except Exception as e:
-                    results.append({
-                        'resource_id': instance_id,
-                        'status': 'failed',
-                        'error': str(e)
-                    })
-            
-            return results
+            # TerminateInstances accepts many IDs per call
+            return self._execute_batched(
+                resource_ids,
+                lambda instance_ids: ec2.terminate_instances(InstanceIds=instance_ids, DryRun=self.dry_run),
+                TERMINATE_BATCH_SIZE,
+                'Terminated instance {}',
+                fallback=lambda instance_id: ec2.terminate_instances(InstanceIds=[instance_id], DryRun=self.dry_run)
+            )
         except Exception as e:
             return {'error': str(e)}
@@ -7,30 +7,24 @@ class EC2SnapshotOptimizer(BaseOptimizer):
     def analyze(self):
         """Find snapshots not associated with AMIs"""
         try:
-            ec2 = self._get_client('ec2')
-            
-            # Get all snapshots owned by account
-            response = ec2.describe_snapshots(OwnerIds=['self'])
+            # Snapshots backing an AMI are in use
+            used_snapshot_ids = self.inventory.ami_by_snapshot()
             
-            # Get all AMIs to check which snapshots are in use
-            amis_response = ec2.describe_images(Owners=['self'])
-            used_snapshot_ids = set()
-            for ami in amis_response.get('Images', []):
-                for mapping in ami.get('BlockDeviceMappings', []):
-                    if 'Ebs' in mapping:
-                        used_snapshot_ids.add(mapping['Ebs'].get('SnapshotId'))
-            
-            for snapshot in response.get('Snapshots', []):
+            for snapshot in self.inventory.resources('snapshots'):
                 snapshot_id = snapshot['SnapshotId']
+                start_time = snapshot['StartTime']
+                days_old = (datetime.now(start_time.tzinfo) - start_time).days
+                
+                in_use = snapshot_id in used_snapshot_ids
+                if self._carry_forward(snapshot_id, (
+                    snapshot['State'], snapshot['VolumeSize'], start_time, snapshot.get('StorageTier'),
+                    snapshot.get('Description'), in_use, days_old > 30
+                ), age_since=start_time):
+                    continue
                 
                 # Only flag snapshots not used by AMIs
-                if snapshot_id not in used_snapshot_ids:
-                    start_time = snapshot['StartTime']
-                    days_old = (datetime.now(start_time.tzinfo) - start_time).days
-                    
-                    # Estimate $0.05 per GB-month
+                if not in_use:
                     size = snapshot['VolumeSize']
-                    monthly_cost = size * 0.05
                     
                     # Prioritize old snapshots over 30 days
                     if days_old > 30:
@@ -42,9 +36,9 @@ class EC2SnapshotOptimizer(BaseOptimizer):
                                 'created': start_time.isoformat(),
                                 'days_old': days_old,
                                 'description': snapshot.get('Description', ''),
-                                'state': snapshot['State']
-                            },
-                            estimated_savings=monthly_cost
+                                'state': snapshot['State'],
+                                'storage_tier': snapshot.get('StorageTier', 'standard')
+                            }
                         )
             
             return self.findings
@@ -55,26 +49,10 @@ class EC2SnapshotOptimizer(BaseOptimizer):
         """Delete EC2 snapshots"""
         try:
             ec2 = self._get_client('ec2')
-            results = []
-            
-            for snapshot_id in resource_ids:
-                try:
-                    ec2.delete_snapshot(
-                        SnapshotId=snapshot_id,
-                        DryRun=self.dry_run
-                    )
-                    results.append({
-                        'resource_id': snapshot_id,
-                        'status': 'success',
-                        'message': f'Deleted snapshot {snapshot_id}'
-                    })
-                except Exception as e:
-                    results.append({
-                        'resource_id': snapshot_id,
-                        'status': 'failed',
-                        'error': str(e)
-                    })
-            
-            return results
+            return self._execute_concurrent(
+                resource_ids,
+                lambda snapshot_id: ec2.delete_snapshot(SnapshotId=snapshot_id, DryRun=self.dry_run),
+                'Deleted snapshot {}'
+            )
         except Exception as e:
             return {'error': str(e)}
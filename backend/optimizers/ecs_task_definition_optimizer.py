@@ -1,65 +1,123 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from .base_optimizer import BaseOptimizer
 
+DELETE_BATCH_SIZE = 10  # Task definitions per DeleteTaskDefinitions call
+DESCRIBE_CACHE_SIZE = 10000
+
+# A task definition revision never changes once registered, so describes are cached by ARN
+_described = {}
+_described_lock = threading.Lock()
+
+def parse_task_definition_arn(task_def_arn):
+    """Split arn:aws:ecs:<region>:<account>:task-definition/<family>:<revision> into (family, revision)"""
+    family, _, revision = task_def_arn.rsplit('/', 1)[-1].rpartition(':')
+    return family, int(revision) if revision.isdigit() else revision
+
 class ECSTaskDefinitionOptimizer(BaseOptimizer):
     """Delete unused ECS task definitions"""
     
+    # Fast mode reads family and revision from the ARN; detail mode also describes each one
+    describe_details = os.environ.get('AWS_OPTIMIZER_ECS_DESCRIBE', '0') == '1'
+    
+    def _describe(self, task_def_arn):
+        """Describe a task definition, reusing earlier results"""
+        with _described_lock:
+            if task_def_arn in _described:
+                return _described[task_def_arn]
+        
+        td = self._get_client('ecs').describe_task_definition(taskDefinition=task_def_arn)['taskDefinition']
+        with _described_lock:
+            if len(_described) >= DESCRIBE_CACHE_SIZE:
+                del _described[next(iter(_described))]
+            _described[task_def_arn] = td
+        return td
+    
+    def _add_task_definition(self, task_def_arn, td=None):
+        family, revision = parse_task_definition_arn(task_def_arn)
+        details = {
+            'family': family,
+            'revision': revision,
+            'status': 'INACTIVE'
+        }
+        if td is not None:
+            details.update({
+                'cpu': td.get('cpu', ''),
+                'memory': td.get('memory', ''),
+                'registered_at': td.get('registeredAt', '').isoformat() if td.get('registeredAt') else '',
+                'container_count': len(td.get('containerDefinitions', []))
+            })
+        
+        # Inactive task definitions don't incur cost but should be cleaned up
+        self.add_finding(
+            resource_id=task_def_arn,
+            resource_type='ECS Task Definition',
+            details=details,
+            estimated_savings=0  # No direct cost for inactive definitions
+        )
+    
     def analyze(self):
         """Find inactive ECS task definitions"""
         try:
-            ecs = self._get_client('ecs')
+            # Revisions are immutable, so in incremental scans only new ARNs are evaluated (and described)
+            task_def_arns = [
+                task_def_arn for task_def_arn in self.inventory.resources('inactive_task_definitions')
+                if not self._carry_forward(task_def_arn, (self.describe_details,))
+            ]
             
-            # List all task definitions
-            task_defs_response = ecs.list_task_definitions(status='INACTIVE')
+            if not self.describe_details:
+                for task_def_arn in task_def_arns:
+                    self._add_task_definition(task_def_arn)
+                return self.findings
             
-            for task_def_arn in task_defs_response.get('taskDefinitionArns', []):
-                # Get task definition details
+            def describe(task_def_arn):
                 try:
-                    task_def = ecs.describe_task_definition(taskDefinition=task_def_arn)
-                    td = task_def['taskDefinition']
-                    
-                    # Inactive task definitions don't incur cost but should be cleaned up
-                    self.add_finding(
-                        resource_id=task_def_arn,
-                        resource_type='ECS Task Definition',
-                        details={
-                            'family': td.get('family', ''),
-                            'revision': td.get('revision', ''),
-                            'status': td.get('status', ''),
-                            'cpu': td.get('cpu', ''),
-                            'memory': td.get('memory', ''),
-                            'registered_at': td.get('registeredAt', '').isoformat() if td.get('registeredAt') else '',
-                            'container_count': len(td.get('containerDefinitions', []))
-                        },
-                        estimated_savings=0  # No direct cost for inactive definitions
-                    )
-                except Exception:
-                    pass
+                    self._check_cancelled()
+                    return task_def_arn, self._describe(task_def_arn), None
+                except Exception as e:
+                    return task_def_arn, None, e
+            
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                for task_def_arn, td, error in pool.map(describe, task_def_arns):
+                    self._check_cancelled()
+                    if error is not None:
+                        self.add_error(task_def_arn, str(error))
+                    else:
+                        self._add_task_definition(task_def_arn, td)
             
             return self.findings
         except Exception as e:
             return {'error': str(e)}
     
     def optimize(self, resource_ids):
-        """Deregister ECS task definitions"""
+        """Delete ECS task definitions"""
         try:
+            # DeleteTaskDefinitions has no DryRun parameter and deletes permanently
+            if self.dry_run:
+                return self._dry_run_results(resource_ids, 'Would delete task definition {}')
+            
             ecs = self._get_client('ecs')
-            results = []
             
-            for task_def_arn in resource_ids:
-                try:
-                    ecs.deregister_task_definition(taskDefinition=task_def_arn)
-                    results.append({
-                        'resource_id': task_def_arn,
-                        'status': 'success',
-                        'message': f'Deregistered task definition'
-                    })
-                except Exception as e:
-                    results.append({
-                        'resource_id': task_def_arn,
-                        'status': 'failed',
-                        'error': str(e)
-                    })
+            def delete(task_def_arns):
+                # Only INACTIVE revisions can be deleted; failures are reported per ARN
+                response = ecs.delete_task_definitions(taskDefinitions=task_def_arns)
+                return {
+                    failure['arn']: failure.get('reason', 'Delete failed')
+                    for failure in response.get('failures', [])
+                }
+            
+            def delete_one(task_def_arn):
+                failures = delete([task_def_arn])
+                if failures:
+                    raise RuntimeError(failures.get(task_def_arn, 'Delete failed'))
             
-            return results
+            return self._execute_batched(
+                resource_ids,
+                delete,
+                DELETE_BATCH_SIZE,
+                'Deleted task definition {}',
+                fallback=delete_one
+            )
         except Exception as e:
             return {'error': str(e)}
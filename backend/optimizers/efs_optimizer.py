@@ -1,40 +1,98 @@
+import os
+from datetime import datetime, timedelta, timezone
 from .base_optimizer import BaseOptimizer
 
+METRIC_QUERIES_PER_CALL = 500  # GetMetricData limit
+
 class EFSOptimizer(BaseOptimizer):
     """Delete unused Elastic File Systems"""
     
+    # Days without metered I/O before a mounted file system counts as idle (0 disables the check)
+    idle_days = int(os.environ.get('AWS_OPTIMIZER_EFS_IDLE_DAYS', 0))
+    
+    def _metered_io(self, fs_ids):
+        """Total MeteredIOBytes per file system over the idle window, batched through GetMetricData"""
+        cloudwatch = self._get_client('cloudwatch')
+        end = datetime.now(timezone.utc)
+        start = end - timedelta(days=self.idle_days)
+        totals = {}
+        
+        for offset in range(0, len(fs_ids), METRIC_QUERIES_PER_CALL):
+            batch = fs_ids[offset:offset + METRIC_QUERIES_PER_CALL]
+            queries = [
+                {
+                    'Id': f'fs{i}',
+                    'MetricStat': {
+                        'Metric': {
+                            'Namespace': 'AWS/EFS',
+                            'MetricName': 'MeteredIOBytes',
+                            'Dimensions': [{'Name': 'FileSystemId', 'Value': fs_id}]
+                        },
+                        'Period': 86400,
+                        'Stat': 'Sum'
+                    },
+                    'ReturnData': True
+                }
+                for i, fs_id in enumerate(batch)
+            ]
+            for result in self._paginate(
+                cloudwatch, 'get_metric_data', 'MetricDataResults',
+                MetricDataQueries=queries, StartTime=start, EndTime=end
+            ):
+                fs_id = batch[int(result['Id'][2:])]
+                totals[fs_id] = totals.get(fs_id, 0) + sum(result.get('Values', []))
+        return totals
+    
+    def _add_file_system(self, fs, mount_target_count, metered_io=None):
+        fs_id = fs['FileSystemId']
+        size_in_bytes = fs.get('SizeInBytes', {})
+        size = size_in_bytes.get('Value', 0)
+        size_ia = size_in_bytes.get('ValueInIA', 0)
+        size_archive = size_in_bytes.get('ValueInArchive', 0)
+        
+        details = {
+            'filesystem_id': fs_id,
+            'name': fs.get('Name', ''),
+            'size_bytes': size,
+            'size_standard_bytes': size_in_bytes.get('ValueInStandard', size - size_ia - size_archive),
+            'size_ia_bytes': size_ia,
+            'size_archive_bytes': size_archive,
+            'performance_mode': fs.get('PerformanceMode', ''),
+            'throughput_mode': fs.get('ThroughputMode', ''),
+            'mount_targets': mount_target_count
+        }
+        if metered_io is not None:
+            # Mount targets must be removed before an idle file system can be deleted
+            details.update({'idle_days': self.idle_days, 'metered_io_bytes': metered_io})
+        
+        self.add_finding(
+            resource_id=fs_id,
+            resource_type='EFS',
+            details=details
+        )
+    
     def analyze(self):
-        """Find EFS with no mount targets"""
+        """Find EFS with no mount targets (and, optionally, mounted but idle EFS)"""
         try:
-            efs = self._get_client('efs')
-            
-            response = efs.describe_file_systems()
-            
-            for fs in response.get('FileSystems', []):
-                fs_id = fs['FileSystemId']
-                
-                # Get mount targets
-                mounts_response = efs.describe_mount_targets(FileSystemId=fs_id)
-                mount_targets = mounts_response.get('MountTargets', [])
+            mounted = []
+            for fs in self.inventory.resources('file_systems'):
+                # DescribeFileSystems already counts mount targets
+                if 'NumberOfMountTargets' in fs:
+                    mount_target_count = fs['NumberOfMountTargets']
+                else:
+                    mount_target_count = len(self.inventory.mount_targets(fs['FileSystemId']))
                 
-                if not mount_targets:
-                    size = fs.get('SizeInBytes', {}).get('Value', 0)
-                    # Estimate $0.30 per GB-month for Standard
-                    monthly_cost = (size / (1024**3)) * 0.30
-                    
-                    self.add_finding(
-                        resource_id=fs_id,
-                        resource_type='EFS',
-                        details={
-                            'filesystem_id': fs_id,
-                            'name': fs.get('Name', ''),
-                            'size_bytes': size,
-                            'performance_mode': fs.get('PerformanceMode', ''),
-                            'throughput_mode': fs.get('ThroughputMode', ''),
-                            'mount_targets': len(mount_targets)
-                        },
-                        estimated_savings=monthly_cost
-                    )
+                if not mount_target_count:
+                    self._add_file_system(fs, 0)
+                elif self.idle_days:
+                    mounted.append((fs, mount_target_count))
+            
+            if mounted:
+                metered_io = self._metered_io([fs['FileSystemId'] for fs, _ in mounted])
+                for fs, mount_target_count in mounted:
+                    io_bytes = metered_io.get(fs['FileSystemId'], 0)
+                    if not io_bytes:
+                        self._add_file_system(fs, mount_target_count, io_bytes)
             
             return self.findings
         except Exception as e:
@@ -44,23 +102,10 @@ class EFSOptimizer(BaseOptimizer):
         """Delete EFS"""
         try:
             efs = self._get_client('efs')
-            results = []
-            
-            for fs_id in resource_ids:
-                try:
-                    efs.delete_file_system(FileSystemId=fs_id)
-                    results.append({
-                        'resource_id': fs_id,
-                        'status': 'success',
-                        'message': f'Deleted EFS {fs_id}'
-                    })
-                except Exception as e:
-                    results.append({
-                        'resource_id': fs_id,
-                        'status': 'failed',
-                        'error': str(e)
-                    })
-            
-            return results
+            return self._execute_concurrent(
+                resource_ids,
+                lambda fs_id: efs.delete_file_system(FileSystemId=fs_id),
+                'Deleted EFS {}'
+            )
         except Exception as e:
             return {'error': str(e)}
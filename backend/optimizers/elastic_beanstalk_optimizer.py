@@ -7,20 +7,13 @@ class ElasticBeanstalkOptimizer(BaseOptimizer):
     def analyze(self):
         """Find terminated Elastic Beanstalk environments"""
         try:
-            eb = self._get_client('elasticbeanstalk')
-            
-            response = eb.describe_environments()
-            
-            for env in response.get('Environments', []):
+            for env in self.inventory.resources('environments'):
                 env_id = env['EnvironmentId']
                 env_name = env['EnvironmentName']
                 status = env['Status']
                 
                 # Flag environments that are in terminated or terminating state
                 if status in ['Terminated', 'Terminating']:
-                    # Estimate based on typical environment cost ~$20/month
-                    monthly_cost = 20.0
-                    
                     self.add_finding(
                         resource_id=env_id,
                         resource_type='Elastic Beanstalk Environment',
@@ -31,8 +24,7 @@ class ElasticBeanstalkOptimizer(BaseOptimizer):
                             'platform': env.get('PlatformArn', ''),
                             'date_created': env.get('DateCreated', '').isoformat() if env.get('DateCreated') else '',
                             'date_updated': env.get('DateUpdated', '').isoformat() if env.get('DateUpdated') else ''
-                        },
-                        estimated_savings=monthly_cost
+                        }
                     )
             
             return self.findings
@@ -43,31 +35,22 @@ class ElasticBeanstalkOptimizer(BaseOptimizer):
         """Terminate Elastic Beanstalk environments"""
         try:
             eb = self._get_client('elasticbeanstalk')
-            results = []
             
-            for env_id in resource_ids:
-                try:
-                    # Get environment info to get name
-                    response = eb.describe_environments(EnvironmentIds=[env_id])
-                    if response['Environments']:
-                        env_name = response['Environments'][0]['EnvironmentName']
-                        
-                        eb.terminate_environment(
-                            EnvironmentId=env_id,
-                            ForceTerminate=True
-                        )
-                        results.append({
-                            'resource_id': env_id,
-                            'status': 'success',
-                            'message': f'Terminated environment {env_name}'
-                        })
-                except Exception as e:
-                    results.append({
-                        'resource_id': env_id,
-                        'status': 'failed',
-                        'error': str(e)
-                    })
+            # Environments seen by analyze() are known to exist; the rest are checked in one call
+            env_names, lookup_errors = self._resolve(
+                resource_ids,
+                lambda details: details.get('environment_name'),
+                lambda env_ids: {
+                    env['EnvironmentId']: env['EnvironmentName']
+                    for env in eb.describe_environments(EnvironmentIds=env_ids)['Environments']
+                }
+            )
+            
+            def terminate(env_id):
+                if env_id not in env_names:
+                    raise ValueError(lookup_errors.get(env_id, f'Environment {env_id} not found'))
+                eb.terminate_environment(EnvironmentId=env_id, ForceTerminate=True)
             
-            return results
+            return self._execute_concurrent(resource_ids, terminate, 'Terminated environment {}')
         except Exception as e:
             return {'error': str(e)}
@@ -6,15 +6,9 @@ class ElasticIPOptimizer(BaseOptimizer):
     def analyze(self):
         """Find unattached Elastic IPs"""
         try:
-            ec2 = self._get_client('ec2')
-            response = ec2.describe_addresses()
-            
-            for address in response.get('Addresses', []):
+            for address in self.inventory.resources('addresses'):
                 # Only flag Elastic IPs that are not associated
                 if 'InstanceId' not in address or not address['InstanceId']:
-                    # Estimate $0.005 per hour = ~$3.65/month for unused EIP
-                    monthly_cost = 0.005 * 24 * 30
-                    
                     self.add_finding(
                         resource_id=address['PublicIp'],
                         resource_type='Elastic IP',
@@ -24,8 +18,7 @@ class ElasticIPOptimizer(BaseOptimizer):
                             'domain': address.get('Domain', ''),
                             'associated': 'InstanceId' in address and bool(address.get('InstanceId')),
                             'allocation_time': address.get('AllocatedTime', '').isoformat() if address.get('AllocatedTime') else ''
-                        },
-                        estimated_savings=monthly_cost
+                        }
                     )
             
             return self.findings
@@ -36,31 +29,22 @@ class ElasticIPOptimizer(BaseOptimizer):
         """Release Elastic IPs"""
         try:
             ec2 = self._get_client('ec2')
-            results = []
             
-            for public_ip in resource_ids:
-                try:
-                    # Get allocation ID
-                    response = ec2.describe_addresses(PublicIps=[public_ip])
-                    if response['Addresses']:
-                        allocation_id = response['Addresses'][0].get('AllocationId')
-                        
-                        ec2.release_address(
-                            AllocationId=allocation_id,
-                            DryRun=self.dry_run
-                        )
-                        results.append({
-                            'resource_id': public_ip,
-                            'status': 'success',
-                            'message': f'Released Elastic IP {public_ip}'
-                        })
-                except Exception as e:
-                    results.append({
-                        'resource_id': public_ip,
-                        'status': 'failed',
-                        'error': str(e)
-                    })
+            # Allocation IDs come from the findings, else one DescribeAddresses for all unknown IPs
+            allocation_ids, lookup_errors = self._resolve(
+                resource_ids,
+                lambda details: details.get('allocation_id'),
+                lambda public_ips: {
+                    address['PublicIp']: address.get('AllocationId')
+                    for address in ec2.describe_addresses(PublicIps=public_ips)['Addresses']
+                }
+            )
+            
+            def release(public_ip):
+                if not allocation_ids.get(public_ip):
+                    raise ValueError(lookup_errors.get(public_ip, f'Elastic IP {public_ip} not found'))
+                ec2.release_address(AllocationId=allocation_ids[public_ip], DryRun=self.dry_run)
             
-            return results
+            return self._execute_concurrent(resource_ids, release, 'Released Elastic IP {}')
         except Exception as e:
             return {'error': str(e)}
@@ -0,0 +1,126 @@
+import math
+import sys
+from datetime import datetime
+
+TAGS = ('region', 'technique', 'account_id')  # Set on findings merged from multi-region/account scans
+AGE_KEYS = ('days_old', 'days_stopped', 'days_since_activity')  # Detail fields holding a resource's age in days
+
+class Finding:
+    """One finding; slots instead of a per-finding dict, with a timestamp shared by its whole scan"""
+
+    __slots__ = ('resource_id', 'resource_type', 'details', 'estimated_savings', 'timestamp') + TAGS
+
+    def __init__(self, resource_id, resource_type, details, estimated_savings, timestamp,
+                 region=None, technique=None, account_id=None):
+        self.resource_id = resource_id
+        self.resource_type = sys.intern(resource_type)
+        self.details = details
+        self.estimated_savings = estimated_savings
+        self.timestamp = timestamp
+        self.region = region
+        self.technique = technique
+        self.account_id = account_id
+
+    # Mapping-style access keeps code written against the old finding dicts working
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is None and key in TAGS:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        """Serialize with the same keys the list-of-dicts format had"""
+        finding = {
+            'resource_id': self.resource_id,
+            'resource_type': self.resource_type,
+            'details': self.details,
+            'estimated_savings': self.estimated_savings,
+            'timestamp': self.timestamp
+        }
+        for tag in TAGS:
+            value = getattr(self, tag)
+            if value is not None:
+                finding[tag] = value
+        return finding
+
+
+class FindingsStore:
+    """Compact, append-only container of Finding records"""
+
+    def __init__(self, records=None, timestamp=None):
+        self.timestamp = timestamp or datetime.now().isoformat()  # One timestamp per scan
+        self._records = list(records) if records is not None else []
+
+    def add(self, resource_id, resource_type, details, estimated_savings=0, **tags):
+        """Create a record stamped with the store's scan timestamp and append it"""
+        finding = Finding(resource_id, resource_type, details, estimated_savings, self.timestamp, **tags)
+        self._records.append(finding)
+        return finding
+
+    def append(self, finding):
+        self._records.append(finding)
+
+    def extend(self, findings):
+        self._records.extend(findings)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __getitem__(self, index):
+        return self._records[index]
+
+    def __repr__(self):
+        return f'<FindingsStore {len(self._records)} findings @ {self.timestamp}>'
+
+    def copy(self):
+        return FindingsStore(self._records, self.timestamp)
+
+    def filter(self, resource_type=None, min_savings=None, predicate=None, **tags):
+        """Return a new store with the records matching every given condition"""
+        resource_type = sys.intern(resource_type) if resource_type else None
+        records = self._records
+        if resource_type is not None:
+            # Interned types compare by identity first, so this is a pointer check per record
+            records = [f for f in records if f.resource_type == resource_type]
+        if min_savings is not None:
+            records = [f for f in records if f.estimated_savings >= min_savings]
+        for tag, value in tags.items():
+            if tag not in TAGS:
+                raise ValueError(f'Unknown tag: {tag}')
+            records = [f for f in records if getattr(f, tag) == value]
+        if predicate is not None:
+            records = [f for f in records if predicate(f)]
+        return FindingsStore(records, self.timestamp)
+
+    def total_savings(self):
+        """Sum of estimated monthly savings"""
+        return math.fsum(f.estimated_savings for f in self._records)
+
+    def to_list(self):
+        return [f.to_dict() for f in self._records]
+
+
+def json_default(value):
+    """json.dumps default= hook that serializes findings straight from their records"""
+    if isinstance(value, Finding):
+        return value.to_dict()
+    if isinstance(value, FindingsStore):
+        return value.to_list()
+    return str(value)
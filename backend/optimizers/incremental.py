@@ -0,0 +1,32 @@
+import hashlib
+
+def fingerprint(values):
+    """Short stable digest of the listing fields a resource's verdict depends on"""
+    return hashlib.blake2b(repr(values).encode(), digest_size=8).hexdigest()
+
+class ScanState:
+    """Per-resource fingerprints and verdicts of a technique's previous scan, for incremental scans
+
+    previous maps resource_id -> (fingerprint, (resource_type, details) or None when the
+    resource was not flagged). The scan fills current the same way for the next run.
+    """
+
+    def __init__(self, previous=None):
+        self.previous = previous or {}
+        self.current = {}
+        self.reused = 0
+
+    def record(self, resource_id, value):
+        self.current[resource_id] = (value, None)
+
+    def record_finding(self, resource_id, resource_type, details):
+        if resource_id in self.current:
+            self.current[resource_id] = (self.current[resource_id][0], (resource_type, details))
+
+    def stats(self):
+        """How much of the scan was carried forward"""
+        return {
+            'evaluated': len(self.current) - self.reused,
+            'reused': self.reused,
+            'removed': len(self.previous.keys() - self.current.keys())
+        }
@@ -0,0 +1,164 @@
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from .client_pool import client_pool
+
+class ScanCancelled(Exception):
+    """Raised inside a scan once its cancel event is set"""
+
+    def __init__(self, message='Scan cancelled'):
+        super().__init__(message)
+
+
+def paginate(client, operation, result_key, cancel_event=None, **kwargs):
+    """Yield resources page by page from a list/describe call"""
+    if client.can_paginate(operation):
+        pages = client.get_paginator(operation).paginate(**kwargs)
+    else:
+        pages = [getattr(client, operation)(**kwargs)]
+
+    for page in pages:
+        if cancel_event is not None and cancel_event.is_set():
+            raise ScanCancelled()
+        for item in page.get(result_key, []):
+            yield item
+
+
+# kind -> (service, operation, result key, call parameters)
+RESOURCE_KINDS = {
+    'instances': ('ec2', 'describe_instances', 'Reservations', {}),
+    'volumes': ('ec2', 'describe_volumes', 'Volumes', {}),
+    'snapshots': ('ec2', 'describe_snapshots', 'Snapshots', {'OwnerIds': ['self']}),
+    'images': ('ec2', 'describe_images', 'Images', {'Owners': ['self']}),
+    'addresses': ('ec2', 'describe_addresses', 'Addresses', {}),
+    'network_interfaces': ('ec2', 'describe_network_interfaces', 'NetworkInterfaces', {}),
+    'security_groups': ('ec2', 'describe_security_groups', 'SecurityGroups', {}),
+    'nat_gateways': ('ec2', 'describe_nat_gateways', 'NatGateways', {}),
+    'vpc_endpoints': ('ec2', 'describe_vpc_endpoints', 'VpcEndpoints', {}),
+    'load_balancers': ('elbv2', 'describe_load_balancers', 'LoadBalancers', {}),
+    'target_groups': ('elbv2', 'describe_target_groups', 'TargetGroups', {}),
+    'classic_load_balancers': ('elb', 'describe_load_balancers', 'LoadBalancerDescriptions', {}),
+    'db_snapshots': ('rds', 'describe_db_snapshots', 'DBSnapshots', {}),
+    'file_systems': ('efs', 'describe_file_systems', 'FileSystems', {}),
+    'log_groups': ('logs', 'describe_log_groups', 'logGroups', {}),
+    'buckets': ('s3', 'list_buckets', 'Buckets', {}),
+    'environments': ('elasticbeanstalk', 'describe_environments', 'Environments', {}),
+    'inactive_task_definitions': ('ecs', 'list_task_definitions', 'taskDefinitionArns', {'status': 'INACTIVE'}),
+}
+
+# Potentially huge kinds read by a single optimizer are streamed instead of held in memory
+STREAMED_KINDS = {'snapshots', 'db_snapshots', 'log_groups', 'inactive_task_definitions'}
+
+class ResourceInventory:
+    """Per-(account, region, scan) resource graph shared by all optimizers"""
+
+    def __init__(self, access_key, secret_key, region='us-east-1', session_token=None, cancel_event=None):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.session_token = session_token
+        self.cancel_event = cancel_event  # Stops paging once set
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._cache = {}
+
+    def client(self, service):
+        """Get the pooled client for this inventory's account and region"""
+        return client_pool.get_client(
+            service, self.region, self.access_key, self.secret_key, self.session_token
+        )
+
+    def _memoize(self, key, build):
+        """Build a value once per inventory; concurrent callers wait for the first build"""
+        if key in self._cache:
+            return self._cache[key]
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key not in self._cache:
+                self._cache[key] = build()
+            return self._cache[key]
+
+    def _fetch(self, kind):
+        service, operation, result_key, params = RESOURCE_KINDS[kind]
+        items = paginate(self.client(service), operation, result_key, self.cancel_event, **params)
+        if kind == 'instances':
+            items = (instance for reservation in items for instance in reservation.get('Instances', []))
+        return items
+
+    def resources(self, kind):
+        """Return every resource of a kind (streamed kinds are yielded without caching)"""
+        if kind in STREAMED_KINDS:
+            return self._fetch(kind)
+        return self._memoize(kind, lambda: list(self._fetch(kind)))
+
+    # Relationship indexes, each built once on first use
+
+    def instances_by_ami(self):
+        """AMI ID -> IDs of non-terminated instances launched from it"""
+        def build():
+            index = defaultdict(list)
+            for instance in self.resources('instances'):
+                if instance['State']['Name'] != 'terminated':
+                    index[instance.get('ImageId')].append(instance['InstanceId'])
+            return dict(index)
+        return self._memoize('instances_by_ami', build)
+
+    def ami_by_snapshot(self):
+        """Snapshot ID -> ID of the AMI whose block device mappings reference it"""
+        def build():
+            index = {}
+            for ami in self.resources('images'):
+                for mapping in ami.get('BlockDeviceMappings', []):
+                    if 'Ebs' in mapping and mapping['Ebs'].get('SnapshotId'):
+                        index[mapping['Ebs']['SnapshotId']] = ami['ImageId']
+            return index
+        return self._memoize('ami_by_snapshot', build)
+
+    def enis_by_security_group(self):
+        """Security group ID -> IDs of network interfaces using it"""
+        def build():
+            index = defaultdict(list)
+            for eni in self.resources('network_interfaces'):
+                for group in eni.get('Groups', []):
+                    index[group['GroupId']].append(eni['NetworkInterfaceId'])
+            return dict(index)
+        return self._memoize('enis_by_security_group', build)
+
+    def target_groups_by_load_balancer(self):
+        """Load balancer ARN -> target groups attached to it"""
+        def build():
+            index = defaultdict(list)
+            for tg in self.resources('target_groups'):
+                for lb_arn in tg.get('LoadBalancerArns', []):
+                    index[lb_arn].append(tg)
+            return dict(index)
+        return self._memoize('target_groups_by_load_balancer', build)
+
+    def targets(self, target_group_arn):
+        """Registered targets (with health) of a target group"""
+        return self._memoize(
+            ('targets', target_group_arn),
+            lambda: self.client('elbv2').describe_target_health(
+                TargetGroupArn=target_group_arn
+            ).get('TargetHealthDescriptions', [])
+        )
+
+    def prefetch_targets(self, target_group_arns, max_workers=10):
+        """Load target health for many target groups concurrently"""
+        pending = [arn for arn in set(target_group_arns) if ('targets', arn) not in self._cache]
+        if not pending:
+            return
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+            # list() surfaces the first error, if any
+            list(pool.map(self.targets, pending))
+
+    def mount_targets(self, file_system_id):
+        """Mount targets of an EFS file system"""
+        return self._memoize(
+            ('mount_targets', file_system_id),
+            lambda: list(paginate(
+                self.client('efs'), 'describe_mount_targets', 'MountTargets', self.cancel_event,
+                FileSystemId=file_system_id
+            ))
+        )
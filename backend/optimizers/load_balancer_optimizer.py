@@ -1,33 +1,37 @@
 from .base_optimizer import BaseOptimizer
 
+DESCRIBE_BATCH_SIZE = 20  # Names per DescribeLoadBalancers call
+
 class LoadBalancerOptimizer(BaseOptimizer):
     """Remove unused load balancers"""
     
     def analyze(self):
         """Find load balancers with no active targets"""
         try:
-            elb = self._get_client('elbv2')
+            # All target groups are listed once and mapped to their load balancers
+            target_groups_by_lb = self.inventory.target_groups_by_load_balancer()
+            load_balancers = self.inventory.resources('load_balancers')
             
-            # Get all load balancers
-            response = elb.describe_load_balancers()
+            # Health of every attached target group is checked concurrently
+            self.inventory.prefetch_targets(
+                [
+                    tg['TargetGroupArn']
+                    for lb in load_balancers
+                    for tg in target_groups_by_lb.get(lb['LoadBalancerArn'], [])
+                ],
+                max_workers=self.max_workers
+            )
             
-            for lb in response.get('LoadBalancers', []):
+            for lb in load_balancers:
                 lb_arn = lb['LoadBalancerArn']
                 lb_name = lb['LoadBalancerName']
                 lb_type = lb['Type']
                 
-                # Get target groups
-                tg_response = elb.describe_target_groups(LoadBalancerArn=lb_arn)
-                
-                has_active_targets = False
-                for tg in tg_response.get('TargetGroups', []):
-                    health_response = elb.describe_target_health(TargetGroupArn=tg['TargetGroupArn'])
-                    if health_response.get('TargetHealthDescriptions'):
-                        has_active_targets = True
-                        break
+                target_groups = target_groups_by_lb.get(lb_arn, [])
                 
-                # Estimate cost: ALB ~$22.86/month, NLB ~$32.40/month
-                monthly_cost = 32.40 if lb_type == 'network' else 22.86
+                has_active_targets = any(
+                    self.inventory.targets(tg['TargetGroupArn']) for tg in target_groups
+                )
                 
                 if not has_active_targets:
                     self.add_finding(
@@ -40,9 +44,27 @@ class LoadBalancerOptimizer(BaseOptimizer):
                             'scheme': lb.get('Scheme', ''),
                             'vpc_id': lb.get('VpcId', ''),
                             'created_time': lb.get('CreatedTime', '').isoformat() if lb.get('CreatedTime') else '',
-                            'target_groups': len(tg_response.get('TargetGroups', []))
-                        },
-                        estimated_savings=monthly_cost
+                            'target_groups': len(target_groups)
+                        }
+                    )
+            
+            # Classic ELBs list their registered instances inline
+            for lb in self.inventory.resources('classic_load_balancers'):
+                if not lb.get('Instances'):
+                    lb_name = lb['LoadBalancerName']
+                    
+                    self.add_finding(
+                        resource_id=lb_name,
+                        resource_type='Classic Load Balancer',
+                        details={
+                            'name': lb_name,
+                            'type': 'classic',
+                            'dns_name': lb.get('DNSName', ''),
+                            'scheme': lb.get('Scheme', ''),
+                            'vpc_id': lb.get('VPCId', ''),
+                            'created_time': lb.get('CreatedTime', '').isoformat() if lb.get('CreatedTime') else '',
+                            'instances': 0
+                        }
                     )
             
             return self.findings
@@ -53,28 +75,49 @@ class LoadBalancerOptimizer(BaseOptimizer):
         """Delete load balancers"""
         try:
             elb = self._get_client('elbv2')
-            results = []
             
-            # Get all load balancers to find ARNs
-            response = elb.describe_load_balancers()
-            lb_map = {lb['LoadBalancerName']: lb['LoadBalancerArn'] for lb in response.get('LoadBalancers', [])}
+            # Classic load balancers are addressed by name only, so they skip the ARN lookup
+            classic_names = {
+                lb_name for lb_name in resource_ids
+                if self.known_details.get(lb_name, {}).get('type') == 'classic'
+            }
+            
+            # ARNs come from the findings; unknown names are looked up DESCRIBE_BATCH_SIZE at a time
+            lb_map, lookup_errors = self._resolve(
+                [lb_name for lb_name in resource_ids if lb_name not in classic_names],
+                lambda details: details.get('arn'),
+                lambda names: {
+                    lb['LoadBalancerName']: lb['LoadBalancerArn']
+                    for lb in elb.describe_load_balancers(Names=names)['LoadBalancers']
+                },
+                batch_size=DESCRIBE_BATCH_SIZE
+            )
+            unknown = [lb_name for lb_name in resource_ids if lb_name not in lb_map and lb_name not in classic_names]
+            classic_elb = self._get_client('elb') if classic_names or unknown else None
+            if unknown:
+                found, _ = self._resolve(
+                    unknown,
+                    lambda details: None,
+                    lambda names: {
+                        lb['LoadBalancerName']: lb['LoadBalancerName']
+                        for lb in classic_elb.describe_load_balancers(LoadBalancerNames=names)['LoadBalancerDescriptions']
+                    },
+                    batch_size=DESCRIBE_BATCH_SIZE
+                )
+                classic_names.update(found)
             
-            for lb_name in resource_ids:
-                try:
-                    if lb_name in lb_map:
+            def delete(lb_name):
+                if lb_name in lb_map:
+                    if not self.dry_run:
                         elb.delete_load_balancer(LoadBalancerArn=lb_map[lb_name])
-                        results.append({
-                            'resource_id': lb_name,
-                            'status': 'success',
-                            'message': f'Deleted load balancer {lb_name}'
-                        })
-                except Exception as e:
-                    results.append({
-                        'resource_id': lb_name,
-                        'status': 'failed',
-                        'error': str(e)
-                    })
+                elif lb_name in classic_names:
+                    if not self.dry_run:
+                        classic_elb.delete_load_balancer(LoadBalancerName=lb_name)
+                else:
+                    raise ValueError(lookup_errors.get(lb_name, f'Load balancer {lb_name} not found'))
             
-            return results
+            # Neither DeleteLoadBalancer API has a DryRun parameter; dry runs only resolve the names
+            message = 'Would delete load balancer {}' if self.dry_run else 'Deleted load balancer {}'
+            return self._execute_concurrent(resource_ids, delete, message)
         except Exception as e:
             return {'error': str(e)}
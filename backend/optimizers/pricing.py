@@ -0,0 +1,142 @@
+import json
+import os
+from pathlib import Path
+
+DEFAULT_PRICE_LIST = Path(__file__).with_name('price_list.json')
+ANY = '*'  # Region/variant wildcard in the price list
+GB = 1024 ** 3
+
+# resource type -> components of its monthly cost:
+# (product, details key holding the variant, variant when the key is absent, details key holding the quantity, scale)
+# A quantity key of None means one unit (e.g. one instance-month)
+PRICING_RULES = {
+    'EC2 Instance': [('ec2-instance', 'instance_type', ANY, None, 1)],
+    'EBS Volume': [('ebs-volume', 'volume_type', ANY, 'size_gb', 1)],
+    'EC2 Snapshot': [('ebs-snapshot', 'storage_tier', 'standard', 'size_gb', 1)],
+    'AMI': [('ebs-snapshot', None, 'standard', 'size_gb', 1)],
+    'Elastic IP': [('elastic-ip', None, ANY, None, 1)],
+    'Load Balancer': [('load-balancer', 'type', ANY, None, 1)],
+    'Classic Load Balancer': [('load-balancer', None, 'classic', None, 1)],
+    'NAT Gateway': [('nat-gateway', None, ANY, None, 1)],
+    'RDS Snapshot': [('rds-snapshot', None, ANY, 'size_gb', 1)],
+    'EFS': [
+        ('efs-storage', None, 'standard', 'size_standard_bytes', 1 / GB),
+        ('efs-storage', None, 'ia', 'size_ia_bytes', 1 / GB),
+        ('efs-storage', None, 'archive', 'size_archive_bytes', 1 / GB),
+    ],
+    'CloudWatch Log Group': [('cloudwatch-logs', None, ANY, 'stored_bytes', 1 / GB)],
+    'VPC Endpoint': [('vpc-endpoint', 'type', ANY, 'subnet_count', 1)],
+    'Elastic Beanstalk Environment': [('elastic-beanstalk', None, ANY, None, 1)],
+}
+
+class PriceTable:
+    """One loaded price list: monthly prices keyed by (region, product, variant)
+
+    Never modified after loading; a reload builds a new table and swaps it in whole, so
+    a lookup always sees prices from a single file.
+    """
+
+    def __init__(self, path, currency, hours_per_month, monthly):
+        self.path = path
+        self.currency = currency
+        self.hours_per_month = hours_per_month
+        self.monthly = monthly
+
+    @classmethod
+    def load(cls, path):
+        """Read a price list file, converting hourly prices to monthly ones"""
+        with open(path) as f:
+            data = json.load(f)
+
+        hours_per_month = data.get('hours_per_month', 720)
+        monthly = {}
+        for product, spec in data['products'].items():
+            factor = hours_per_month if spec.get('unit') == 'hour' else 1
+            for region, table in spec['prices'].items():
+                for variant, price in table.items():
+                    monthly[(region, product, variant)] = price * factor
+        return cls(path, data.get('currency', 'USD'), hours_per_month, monthly)
+
+
+class PriceList:
+    """Offline price list with fallback from regional to global and default variant prices"""
+
+    def __init__(self, path=DEFAULT_PRICE_LIST):
+        self.path = path
+        self.load(path)
+
+    def load(self, path=None):
+        """(Re)load the price list file; lookups in flight finish against the previous one"""
+        path = path or self.path
+        self._table = PriceTable.load(path)
+        self.path = path
+
+    @property
+    def currency(self):
+        return self._table.currency
+
+    @property
+    def hours_per_month(self):
+        return self._table.hours_per_month
+
+    def monthly_price(self, product, variant=None, region=None):
+        """Monthly price of one unit, falling back to the region's default and then the global list"""
+        variant = variant or ANY
+        region = region or ANY
+        prices = self._table.monthly
+        for key in ((region, product, variant), (region, product, ANY), (ANY, product, variant), (ANY, product, ANY)):
+            price = prices.get(key)
+            if price is not None:
+                return price
+        return 0.0
+
+    def estimate(self, resource_type, details, region=None):
+        """Monthly cost of one resource from its finding details"""
+        total = 0.0
+        for product, variant_key, default_variant, quantity_key, scale in PRICING_RULES.get(resource_type, []):
+            variant = details.get(variant_key) if variant_key else None
+            quantity = (details.get(quantity_key) or 0) if quantity_key else 1
+            total += self.monthly_price(product, variant or default_variant, region) * quantity * scale
+        return total
+
+    def reprice(self, findings, region=None):
+        """Recompute estimated_savings for a batch of findings in place; returns the new total
+
+        Findings tagged with a region (multi-region scans) are priced for that region. The
+        batch is priced in one pass; each distinct (product, variant, region) is looked up once.
+        """
+        default_region = region or ANY
+        prices = {}
+        total = 0.0
+        for index, finding in enumerate(findings):
+            value = 0.0
+            components = PRICING_RULES.get(finding.get('resource_type'))
+            if components:
+                details = finding.get('details') or {}
+                finding_region = finding.get('region') or default_region
+                try:
+                    for product, variant_key, default_variant, quantity_key, scale in components:
+                        key = (product, (details.get(variant_key) if variant_key else None) or default_variant, finding_region)
+                        price = prices.get(key)
+                        if price is None:
+                            price = prices[key] = self.monthly_price(*key)
+                        value += price * (details.get(quantity_key) or 0) * scale if quantity_key else price * scale
+                except TypeError:
+                    # Non-numeric quantities or unhashable types/regions in a request body
+                    raise ValueError(f'findings[{index}] has malformed pricing details') from None
+            finding['estimated_savings'] = value
+            total += value
+        return total
+
+    def stats(self):
+        """Describe the loaded price list"""
+        table = self._table
+        return {
+            'source': str(table.path),
+            'currency': table.currency,
+            'entries': len(table.monthly),
+            'products': sorted({product for _, product, _ in table.monthly}),
+            'regions': sorted({region for region, _, _ in table.monthly} - {ANY})
+        }
+
+price_list = PriceList(os.environ.get('AWS_OPTIMIZER_PRICE_LIST') or DEFAULT_PRICE_LIST)
@@ -0,0 +1,216 @@
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from botocore.exceptions import ConnectionError, HTTPClientError
+from .client_pool import client_pool
+
+THROTTLING_ERROR_CODES = {
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'RequestThrottledException',
+    'RequestLimitExceeded',
+    'TooManyRequestsException',
+    'ProvisionedThroughputExceededException',
+    'BandwidthLimitExceeded',
+    'SlowDown',
+    'EC2ThrottledException',
+    'PriorRequestNotComplete',
+}
+TRANSIENT_STATUS_CODES = {500, 502, 503, 504}
+
+# Starting requests/second per service, roughly matching default API quotas
+SERVICE_RATES = {
+    'ec2': 20.0,
+    'elbv2': 10.0,
+    'elb': 10.0,
+    'logs': 5.0,
+    'rds': 10.0,
+    'efs': 10.0,
+    'ecs': 10.0,
+    's3': 50.0,
+    'elasticbeanstalk': 5.0,
+    'cloudwatch': 10.0,
+    'sts': 10.0,
+}
+DEFAULT_RATE = 10.0
+
+class AdaptiveTokenBucket:
+    """Token bucket whose refill rate adapts to throttling (additive increase, multiplicative decrease)"""
+
+    def __init__(self, rate=DEFAULT_RATE, min_rate=0.5, max_rate=None, increase=1.0, decrease=0.5):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate or rate * 4
+        self.increase = increase  # Requests/second gained per second of unthrottled traffic
+        self.decrease = decrease  # Rate multiplier applied on each throttle
+        self._tokens = rate
+        self._last_refill = time.monotonic()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.throttles = 0
+        self.retries = 0
+        self.wait_seconds = 0.0
+
+    def _refill(self, now):
+        self._tokens = min(self.rate, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self):
+        """Block until a token is available"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self.requests += 1
+                    self.wait_seconds += waited
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def on_throttle(self):
+        with self._lock:
+            self.throttles += 1
+            self._tokens = min(self._tokens, 0)
+            # A burst of concurrent throttles counts as one congestion signal
+            now = time.monotonic()
+            if now - self._last_decrease >= 1.0:
+                self._last_decrease = now
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'rate': round(self.rate, 3),
+                'requests': self.requests,
+                'throttles': self.throttles,
+                'retries': self.retries,
+                'wait_seconds': round(self.wait_seconds, 3)
+            }
+
+
+class RateLimiterRegistry:
+    """Shared token buckets per (account, region, service) plus a throttling-aware retry policy
+
+    Buckets are keyed by account ID when the credentials were registered with one (assumed
+    roles), otherwise by access key. Buckets left unused for idle_timeout are dropped.
+    """
+
+    def __init__(self, max_attempts=8, base_backoff=0.2, max_backoff=20.0, idle_timeout=900, sweep_interval=60):
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._accounts = {}  # access key -> (account ID, expiration) for session credentials
+        self._last_sweep = time.monotonic()
+
+    def register_account(self, access_key, account_id, expiration=None):
+        """Share an account's buckets across its session credentials
+
+        Assumed-role credentials get a new access key on every refresh; keying by account
+        keeps the rate learned so far instead of starting a fresh bucket. The mapping is
+        dropped once the credentials expire.
+        """
+        with self._lock:
+            self._accounts[access_key] = (account_id, expiration)
+
+    def bucket(self, account, region, service):
+        now = time.monotonic()
+        key = (account, region, service)
+        with self._lock:
+            self._maybe_sweep(now)
+            if key not in self._buckets:
+                self._buckets[key] = AdaptiveTokenBucket(SERVICE_RATES.get(service, DEFAULT_RATE))
+            return self._buckets[key]
+
+    def _maybe_sweep(self, now):
+        """Drop idle buckets and expired account mappings; caller holds the lock"""
+        if now - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = now
+
+        cutoff = now - self.idle_timeout
+        for key in [key for key, bucket in self._buckets.items() if bucket._last_refill < cutoff]:
+            del self._buckets[key]
+
+        wall_now = datetime.now(timezone.utc)
+        for access_key in [k for k, (_, expiration) in self._accounts.items() if expiration and expiration <= wall_now]:
+            del self._accounts[access_key]
+
+    def backoff(self, attempts):
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempts))
+
+    def instrument_client(self, client, access_key, region, service):
+        """Route every call of a pooled client through its bucket and this retry policy"""
+        with self._lock:
+            account = self._accounts.get(access_key, (access_key,))[0]
+        bucket = self.bucket(account, region, service)
+        event_name = client.meta.service_model.service_id.hyphenize()
+
+        # Replace botocore's own retry handler so retries also consume tokens
+        client.meta.events.unregister(f'needs-retry.{event_name}', unique_id=f'retry-config-{event_name}')
+
+        def before_call(**kwargs):
+            bucket.acquire()
+
+        def needs_retry(response, attempts, caught_exception, **kwargs):
+            if attempts >= self.max_attempts:
+                return None
+            if caught_exception is not None:
+                throttled = False
+                retryable = isinstance(caught_exception, (ConnectionError, HTTPClientError))
+            elif response is not None:
+                http_response, parsed = response
+                code = parsed.get('Error', {}).get('Code')
+                throttled = code in THROTTLING_ERROR_CODES or http_response.status_code == 429
+                retryable = throttled or http_response.status_code in TRANSIENT_STATUS_CODES
+            else:
+                return None
+            if not retryable:
+                return None
+
+            if throttled:
+                bucket.on_throttle()
+            with bucket._lock:
+                bucket.retries += 1
+            time.sleep(self.backoff(attempts))
+            bucket.acquire()
+            return 0
+
+        def after_call(http_response, parsed, **kwargs):
+            if http_response.status_code < 300:
+                bucket.on_success()
+
+        client.meta.events.register('before-call', before_call)
+        client.meta.events.register(f'needs-retry.{event_name}', needs_retry)
+        client.meta.events.register('after-call', after_call)
+
+    def metrics(self):
+        """Per-bucket rate and counters, keyed "service/region/account" with the account masked"""
+        with self._lock:
+            buckets = list(self._buckets.items())
+        return {
+            f'{service}/{region}/...{(account or "")[-4:]}': bucket.metrics()
+            for (account, region, service), bucket in buckets
+        }
+
+
+rate_limiters = RateLimiterRegistry(
+    max_attempts=int(os.environ.get('AWS_OPTIMIZER_MAX_ATTEMPTS', 8)),
+    idle_timeout=int(os.environ.get('AWS_OPTIMIZER_CLIENT_IDLE_TIMEOUT', 900))
+)
+client_pool.register_client_hook(rate_limiters.instrument_client)
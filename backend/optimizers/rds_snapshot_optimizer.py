@@ -7,20 +7,20 @@ class RDSSnapshotOptimizer(BaseOptimizer):
     def analyze(self):
         """Find old RDS snapshots"""
         try:
-            rds = self._get_client('rds')
-            
-            response = rds.describe_db_snapshots()
-            
-            for snapshot in response.get('DBSnapshots', []):
+            for snapshot in self.inventory.resources('db_snapshots'):
                 snapshot_id = snapshot['DBSnapshotIdentifier']
                 create_time = snapshot['SnapshotCreateTime']
                 days_old = (datetime.now(create_time.tzinfo) - create_time).days
                 
+                if self._carry_forward(snapshot_id, (
+                    create_time, snapshot.get('AllocatedStorage'), snapshot.get('Status'),
+                    snapshot.get('DBInstanceIdentifier'), snapshot.get('Engine'), days_old > 30
+                ), age_since=create_time):
+                    continue
+                
                 # Only flag old snapshots (> 30 days)
                 if days_old > 30:
                     size = snapshot.get('AllocatedStorage', 0)
-                    # Estimate $0.095 per GB-month for RDS snapshots
-                    monthly_cost = size * 0.095
                     
                     self.add_finding(
                         resource_id=snapshot_id,
@@ -33,8 +33,7 @@ class RDSSnapshotOptimizer(BaseOptimizer):
                             'size_gb': size,
                             'status': snapshot.get('Status', ''),
                             'engine': snapshot.get('Engine', '')
-                        },
-                        estimated_savings=monthly_cost
+                        }
                     )
             
             return self.findings
@@ -45,23 +44,10 @@ class RDSSnapshotOptimizer(BaseOptimizer):
         """Delete RDS snapshots"""
         try:
             rds = self._get_client('rds')
-            results = []
-            
-            for snapshot_id in resource_ids:
-                try:
-                    rds.delete_db_snapshot(DBSnapshotIdentifier=snapshot_id)
-                    results.append({
-                        'resource_id': snapshot_id,
-                        'status': 'success',
-                        'message': f'Deleted RDS snapshot {snapshot_id}'
-                    })
-                except Exception as e:
-                    results.append({
-                        'resource_id': snapshot_id,
-                        'status': 'failed',
-                        'error': str(e)
-                    })
-            
-            return results
+            return self._execute_concurrent(
+                resource_ids,
+                lambda snapshot_id: rds.delete_db_snapshot(DBSnapshotIdentifier=snapshot_id),
+                'Deleted RDS snapshot {}'
+            )
         except Exception as e:
             return {'error': str(e)}
@@ -1,37 +1,134 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from .base_optimizer import BaseOptimizer
 
+class BucketRegionCache:
+    """LRU cache of bucket regions keyed by (access key, bucket name)
+
+    A bucket's region is fixed, but a deleted bucket's name can be re-created in
+    another region, so entries expire after ttl seconds.
+    """
+
+    def __init__(self, ttl=3600, max_entries=100000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (region, expires_at)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, region):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (region, time.monotonic() + self.ttl)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Shared across scans, so repeated scans skip GetBucketLocation
+bucket_regions = BucketRegionCache()
+
 class S3BucketOptimizer(BaseOptimizer):
     """Delete empty/unused S3 buckets"""
     
+    probe_workers = 32  # Buckets probed concurrently
+    
+    def _bucket_region(self, bucket):
+        """Resolve (and cache) the region a bucket lives in"""
+        bucket_name = bucket['Name']
+        key = (self.access_key, bucket_name)
+        region = bucket_regions.get(key)
+        if region is not None:
+            return region
+        
+        # Newer ListBuckets responses include the region inline
+        region = bucket.get('BucketRegion')
+        if not region:
+            location = self._get_client('s3').get_bucket_location(Bucket=bucket_name)
+            constraint = location.get('LocationConstraint')
+            region = {None: 'us-east-1', '': 'us-east-1', 'EU': 'eu-west-1'}.get(constraint, constraint)
+        
+        bucket_regions.put(key, region)
+        return region
+    
+    def _probe(self, bucket):
+        """Check a bucket's contents with a client for its own region"""
+        region = self._bucket_region(bucket)
+        s3 = self._get_client('s3', region)
+        bucket_name = bucket['Name']
+        
+        objects_response = s3.list_objects_v2(Bucket=bucket_name, MaxKeys=1)
+        if objects_response.get('KeyCount', len(objects_response.get('Contents', []))):
+            return region, None
+        
+        # No current objects; noncurrent versions and unfinished uploads still cost money
+        versions_response = s3.list_object_versions(Bucket=bucket_name, MaxKeys=1000)
+        uploads_response = s3.list_multipart_uploads(Bucket=bucket_name, MaxUploads=1000)
+        return region, {
+            'noncurrent_versions': len(versions_response.get('Versions', [])),
+            'delete_markers': len(versions_response.get('DeleteMarkers', [])),
+            'versions_truncated': versions_response.get('IsTruncated', False),
+            'incomplete_uploads': len(uploads_response.get('Uploads', [])),
+            'uploads_truncated': uploads_response.get('IsTruncated', False)
+        }
+    
     def analyze(self):
         """Find empty S3 buckets"""
         try:
-            s3 = self._get_client('s3')
-            
-            response = s3.list_buckets()
+            buckets = self.inventory.resources('buckets')
+            if not buckets:
+                return self.findings
             
-            for bucket in response.get('Buckets', []):
-                bucket_name = bucket['Name']
-                
-                # Check if bucket is empty
+            def probe(bucket):
                 try:
-                    objects_response = s3.list_objects_v2(Bucket=bucket_name, MaxKeys=1)
-                    has_objects = 'Contents' in objects_response
+                    self._check_cancelled()
+                    return bucket, self._probe(bucket), None
+                except Exception as e:
+                    return bucket, None, e
+            
+            with ThreadPoolExecutor(max_workers=min(self.probe_workers, len(buckets))) as pool:
+                for bucket, result, error in pool.map(probe, buckets):
+                    self._check_cancelled()
+                    bucket_name = bucket['Name']
+                    if error is not None:
+                        # Never drop a bucket silently
+                        self.add_error(bucket_name, str(error))
+                        continue
                     
-                    if not has_objects:
-                        self.add_finding(
-                            resource_id=bucket_name,
-                            resource_type='S3 Bucket',
-                            details={
-                                'bucket_name': bucket_name,
-                                'created': bucket.get('CreationDate', '').isoformat() if bucket.get('CreationDate') else '',
-                                'object_count': 0,
-                                'is_empty': True
-                            },
-                            estimated_savings=0  # Minimal cost for empty bucket
-                        )
-                except Exception:
-                    pass
+                    region, leftovers = result
+                    if leftovers is None:
+                        continue
+                    
+                    is_empty = not (
+                        leftovers['noncurrent_versions'] or leftovers['delete_markers'] or leftovers['incomplete_uploads']
+                    )
+                    self.add_finding(
+                        resource_id=bucket_name,
+                        resource_type='S3 Bucket',
+                        details={
+                            'bucket_name': bucket_name,
+                            'bucket_region': region,
+                            'created': bucket.get('CreationDate', '').isoformat() if bucket.get('CreationDate') else '',
+                            'object_count': 0,
+                            'is_empty': is_empty,
+                            **leftovers
+                        },
+                        estimated_savings=0  # Minimal cost for empty bucket
+                    )
             
             return self.findings
         except Exception as e:
@@ -40,24 +137,10 @@ class S3BucketOptimizer(BaseOptimizer):
     def optimize(self, resource_ids):
         """Delete S3 buckets"""
         try:
-            s3 = self._get_client('s3')
-            results = []
-            
-            for bucket_name in resource_ids:
-                try:
-                    s3.delete_bucket(Bucket=bucket_name)
-                    results.append({
-                        'resource_id': bucket_name,
-                        'status': 'success',
-                        'message': f'Deleted bucket {bucket_name}'
-                    })
-                except Exception as e:
-                    results.append({
-                        'resource_id': bucket_name,
-                        'status': 'failed',
-                        'error': str(e)
-                    })
+            def delete(bucket_name):
+                region = self._bucket_region({'Name': bucket_name})
+                self._get_client('s3', region).delete_bucket(Bucket=bucket_name)
             
-            return results
+            return self._execute_concurrent(resource_ids, delete, 'Deleted bucket {}')
         except Exception as e:
             return {'error': str(e)}
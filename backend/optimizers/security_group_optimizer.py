@@ -6,21 +6,10 @@ class SecurityGroupOptimizer(BaseOptimizer):
     def analyze(self):
         """Find security groups not attached to any resources"""
         try:
-            ec2 = self._get_client('ec2')
-            
-            # Get all security groups
-            response = ec2.describe_security_groups()
-            
-            # Get all instances to see which security groups are in use
-            instances_response = ec2.describe_instances()
-            used_sg_ids = set()
-            for reservation in instances_response.get('Reservations', []):
-                for instance in reservation.get('Instances', []):
-                    if instance['State']['Name'] != 'terminated':
-                        for sg in instance.get('SecurityGroups', []):
-                            used_sg_ids.add(sg['GroupId'])
+            # Any network interface (instances, load balancers, RDS, Lambda, ...) puts a group in use
+            used_sg_ids = self.inventory.enis_by_security_group()
             
-            for sg in response.get('SecurityGroups', []):
+            for sg in self.inventory.resources('security_groups'):
                 sg_id = sg['GroupId']
                 sg_name = sg['GroupName']
                 
@@ -52,23 +41,10 @@ class SecurityGroupOptimizer(BaseOptimizer):
         """Delete security groups"""
         try:
             ec2 = self._get_client('ec2')
-            results = []
-            
-            for sg_id in resource_ids:
-                try:
-                    ec2.delete_security_group(GroupId=sg_id, DryRun=self.dry_run)
-                    results.append({
-                        'resource_id': sg_id,
-                        'status': 'success',
-                        'message': f'Deleted security group {sg_id}'
-                    })
-                except Exception as e:
-                    results.append({
-                        'resource_id': sg_id,
-                        'status': 'failed',
-                        'error': str(e)
-                    })
-            
-            return results
+            return self._execute_concurrent(
+                resource_ids,
+                lambda sg_id: ec2.delete_security_group(GroupId=sg_id, DryRun=self.dry_run),
+                'Deleted security group {}'
+            )
         except Exception as e:
             return {'error': str(e)}
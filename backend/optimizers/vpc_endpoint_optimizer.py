@@ -1,16 +1,14 @@
 from .base_optimizer import BaseOptimizer
 
+DELETE_BATCH_SIZE = 25  # Endpoints per DeleteVpcEndpoints call
+
 class VPCEndpointOptimizer(BaseOptimizer):
     """Delete unused VPC endpoints"""
     
     def analyze(self):
         """Find unused VPC endpoints"""
         try:
-            ec2 = self._get_client('ec2')
-            
-            response = ec2.describe_vpc_endpoints()
-            
-            for endpoint in response.get('VpcEndpoints', []):
+            for endpoint in self.inventory.resources('vpc_endpoints'):
                 endpoint_id = endpoint['VpcEndpointId']
                 state = endpoint['State']
                 service_name = endpoint.get('ServiceName', '')
@@ -18,9 +16,6 @@ class VPCEndpointOptimizer(BaseOptimizer):
                 # Flag endpoints that are not in 'available' state
                 # or have been unused for a long time
                 if state in ['Failed', 'Expired', 'Deleted']:
-                    # Estimate $0.01-0.05 per hour depending on type
-                    monthly_cost = 0.02 * 24 * 30  # ~$14.40/month
-                    
                     self.add_finding(
                         resource_id=endpoint_id,
                         resource_type='VPC Endpoint',
@@ -30,9 +25,9 @@ class VPCEndpointOptimizer(BaseOptimizer):
                             'state': state,
                             'vpc_id': endpoint.get('VpcId', ''),
                             'type': endpoint.get('VpcEndpointType', ''),
+                            'subnet_count': len(endpoint.get('SubnetIds', [])),
                             'creation_timestamp': endpoint.get('CreationTimestamp', '').isoformat() if endpoint.get('CreationTimestamp') else ''
-                        },
-                        estimated_savings=monthly_cost
+                        }
                     )
             
             return self.findings
@@ -43,23 +38,26 @@ class VPCEndpointOptimizer(BaseOptimizer):
         """Delete VPC endpoints"""
         try:
             ec2 = self._get_client('ec2')
-            results = []
             
-            for endpoint_id in resource_ids:
-                try:
-                    ec2.delete_vpc_endpoints(VpcEndpointIds=[endpoint_id])
-                    results.append({
-                        'resource_id': endpoint_id,
-                        'status': 'success',
-                        'message': f'Deleted VPC endpoint {endpoint_id}'
-                    })
-                except Exception as e:
-                    results.append({
-                        'resource_id': endpoint_id,
-                        'status': 'failed',
-                        'error': str(e)
-                    })
+            def delete(endpoint_ids):
+                # Per-endpoint failures are reported in the response rather than raised
+                response = ec2.delete_vpc_endpoints(VpcEndpointIds=endpoint_ids)
+                return {
+                    item['ResourceId']: item.get('Error', {}).get('Message', 'Delete failed')
+                    for item in response.get('Unsuccessful', [])
+                }
+            
+            def delete_one(endpoint_id):
+                failures = delete([endpoint_id])
+                if failures:
+                    raise RuntimeError(failures.get(endpoint_id, 'Delete failed'))
             
-            return results
+            return self._execute_batched(
+                resource_ids,
+                delete,
+                DELETE_BATCH_SIZE,
+                'Deleted VPC endpoint {}',
+                fallback=delete_one
+            )
         except Exception as e:
             return {'error': str(e)}
@@ -0,0 +1,39 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Run from anywhere, and keep the credential store and findings database out of the real home
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+_home = tempfile.mkdtemp(prefix='aws-optimizer-tests-')
+os.environ['HOME'] = _home
+os.environ.setdefault('AWS_OPTIMIZER_DB_PATH', os.path.join(_home, 'findings.db'))
+
+import pytest
+from app.findings_db import FindingsDatabase
+
+
+@pytest.fixture
+def db(tmp_path):
+    return FindingsDatabase(tmp_path / 'findings.db')
+
+
+@pytest.fixture
+def pool_hooks(monkeypatch):
+    """Let a test register client pool hooks (stand-ins, cassettes) without leaking them into other tests"""
+    from optimizers.client_pool import client_pool
+    monkeypatch.setattr(client_pool, '_client_hooks', list(client_pool._client_hooks))
+    client_pool.clear()
+    yield client_pool
+    client_pool.clear()
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """Flask test client whose saved credentials are a dummy key pair"""
+    from app import create_app
+    from app import routes
+    monkeypatch.setattr(routes.cred_manager, 'load_credentials', lambda: {
+        'access_key': 'AKIATEST', 'secret_key': 'secret', 'region': 'us-east-1'
+    })
+    return create_app().test_client()
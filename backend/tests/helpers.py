@@ -0,0 +1,25 @@
+"""Builders for the findings and reports the scanner hands to the database"""
+
+def make_finding(resource_id, savings=1.0, resource_type='EBS Volume', **details):
+    return {
+        'resource_id': resource_id,
+        'resource_type': resource_type,
+        'estimated_savings': savings,
+        'details': details,
+        'timestamp': '2026-01-01T00:00:00'
+    }
+
+
+def make_report(technique, region, findings, error=None, account_id=None):
+    report = {
+        'technique': technique,
+        'region': region,
+        'findings': findings,
+        'count': len(findings),
+        'total_monthly_savings': sum(f['estimated_savings'] for f in findings)
+    }
+    if error:
+        report['error'] = error
+    if account_id:
+        report['account_id'] = account_id
+    return report
@@ -0,0 +1,80 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import pytest
+from botocore.awsrequest import AWSResponse
+from app.accounts import AssumeRoleCredentialCache, role_arn_for
+from optimizers.rate_limiter import rate_limiters
+
+ROLE = role_arn_for('123456789012')
+
+
+@pytest.fixture
+def sts(pool_hooks):
+    """Answers AssumeRole with credentials valid for sts.lifetime; sts.fail makes it deny access"""
+    sts = SimpleNamespace(calls=[], fail=False, lifetime=timedelta(hours=1))
+
+    def hook(client, access_key, region, service):
+        def respond(model, params, **kwargs):
+            if model.name != 'AssumeRole':
+                return None
+            sts.calls.append(params['body'])
+            if sts.fail:
+                return AWSResponse('https://sts.amazonaws.com/', 403, {}, None), {
+                    'Error': {'Code': 'AccessDenied', 'Message': 'Not authorized'},
+                    'ResponseMetadata': {'HTTPStatusCode': 403}
+                }
+            n = len(sts.calls)
+            return AWSResponse('https://sts.amazonaws.com/', 200, {}, None), {
+                'Credentials': {
+                    'AccessKeyId': f'ASIA{n:016d}',
+                    'SecretAccessKey': 'secret',
+                    'SessionToken': 'token',
+                    'Expiration': datetime.now(timezone.utc) + sts.lifetime
+                }
+            }
+        client.meta.events.register('before-call', respond)
+
+    pool_hooks.register_client_hook(hook)
+    return sts
+
+
+def test_credentials_are_reused_until_close_to_expiry(sts):
+    cache = AssumeRoleCredentialCache(refresh_margin=300)
+    first = cache.get(ROLE, 'AKIATEST', 'secret')
+    assert cache.get(ROLE, 'AKIATEST', 'secret') is first
+    assert len(sts.calls) == 1
+    assert rate_limiters._accounts[first['access_key']][0] == '123456789012'
+
+    sts.lifetime = timedelta(minutes=2)  # Inside the refresh margin as soon as it is issued
+    cache.invalidate('AKIATEST')
+    refreshed = cache.get(ROLE, 'AKIATEST', 'secret')
+    assert cache.get(ROLE, 'AKIATEST', 'secret') is not refreshed
+    assert len(sts.calls) == 3
+
+
+def test_concurrent_callers_share_one_assume_role(sts):
+    cache = AssumeRoleCredentialCache()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(ROLE, 'AKIATEST', 'secret'))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(sts.calls) == 1
+    assert len({id(creds) for creds in results}) == 1
+
+
+def test_failures_are_cached_for_failure_ttl(sts):
+    sts.fail = True
+    cache = AssumeRoleCredentialCache(failure_ttl=60)
+    for _ in range(3):
+        with pytest.raises(PermissionError):
+            cache.get(ROLE, 'AKIATEST', 'secret', external_id='ext')
+    assert len(sts.calls) == 1
+    assert sts.calls[0]['ExternalId'] == 'ext'
+
+    sts.fail = False
+    cache.invalidate()
+    assert cache.get(ROLE, 'AKIATEST', 'secret', external_id='ext')['access_key'].startswith('ASIA')
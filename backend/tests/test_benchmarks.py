@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+import pytest
+from botocore.exceptions import ClientError
+from benchmarks.run import run_isolated
+from benchmarks.stand_in import AWSStandIn
+from benchmarks.synthetic import SyntheticAccount
+
+
+@pytest.fixture
+def stand_in(pool_hooks):
+    pool_hooks._client_hooks[:] = []
+    AWSStandIn(SyntheticAccount(1000)).install(pool_hooks)
+    return lambda service: pool_hooks.get_client(service, 'us-east-1', 'AKIATEST', 'secret')
+
+
+def test_stand_in_applies_id_filters(stand_in):
+    elbv2 = stand_in('elbv2')
+    load_balancers = elbv2.describe_load_balancers(Names=['bench-lb-1', 'bench-lb-2'])['LoadBalancers']
+    assert [lb['LoadBalancerName'] for lb in load_balancers] == ['bench-lb-1', 'bench-lb-2']
+    arn = load_balancers[0]['LoadBalancerArn']
+    assert [lb['LoadBalancerName'] for lb in elbv2.describe_load_balancers(LoadBalancerArns=[arn])['LoadBalancers']] == ['bench-lb-1']
+
+    addresses = stand_in('ec2').describe_addresses(PublicIps=['52.0.0.3'])['Addresses']
+    assert [a['AllocationId'] for a in addresses] == [f'eipalloc-{3:017x}']
+
+    environments = stand_in('elasticbeanstalk').describe_environments(EnvironmentIds=[f'e-{1:010x}', 'e-missing'])
+    assert [env['EnvironmentName'] for env in environments['Environments']] == ['bench-env-1']
+
+
+def test_stand_in_rejects_unknown_ids_like_aws(stand_in):
+    with pytest.raises(ClientError) as raised:
+        stand_in('elbv2').describe_load_balancers(Names=['bench-lb-1', 'bench-clb-1'])
+    assert raised.value.response['Error']['Code'] == 'LoadBalancerNotFound'
+
+    with pytest.raises(ClientError) as raised:
+        stand_in('ec2').describe_volumes(VolumeIds=['vol-0000000000000dead'])
+    assert raised.value.response['Error']['Code'] == 'InvalidVolume.NotFound'
+
+
+def test_failed_worker_reports_its_error_as_a_string():
+    args = SimpleNamespace(
+        latency_ms=0, jitter_ms=0, seed=0, region='us-east-1', cassette=None, rate_limited=False,
+        ecs_describe=False, efs_idle_days=0, timeout=60
+    )
+    row = run_isolated('no_such_optimizer', 1000, args)
+    assert isinstance(row['error'], str)
+    assert 'no_such_optimizer' in row['error']
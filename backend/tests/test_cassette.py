@@ -0,0 +1,101 @@
+import gzip
+from datetime import datetime, timezone
+import pytest
+from botocore.awsrequest import AWSResponse
+from botocore.exceptions import ClientError
+from optimizers.cassette import RECORD, REPLAY, Cassette, CassetteMiss, install
+from optimizers.ebs_optimizer import EBSOptimizer
+from optimizers.load_balancer_optimizer import LoadBalancerOptimizer
+from optimizers.s3_bucket_optimizer import S3BucketOptimizer
+from benchmarks.stand_in import AWSStandIn
+from benchmarks.synthetic import SyntheticAccount
+
+OPTIMIZERS = (EBSOptimizer, LoadBalancerOptimizer, S3BucketOptimizer)
+
+
+def fake_sts(client, access_key, region, service):
+    def respond(model, **kwargs):
+        if model.name != 'AssumeRole':
+            return None
+        return AWSResponse('https://sts.amazonaws.com/', 200, {}, None), {
+            'Credentials': {
+                'AccessKeyId': 'ASIATEMPORARY',
+                'SecretAccessKey': 'TOPSECRET',
+                'SessionToken': 'TOKEN',
+                'Expiration': datetime(2030, 1, 1, tzinfo=timezone.utc)
+            },
+            'AssumedRoleUser': {'Arn': 'arn:aws:sts::123456789012:assumed-role/r/s', 'AssumedRoleId': 'AROA:s'}
+        }
+    client.meta.events.register('before-call', respond)
+
+
+def scan():
+    return {
+        optimizer.__name__: sorted((f['resource_id'], f['estimated_savings'])
+                                   for f in optimizer('AKIATEST', 'secret', 'us-east-1').analyze())
+        for optimizer in OPTIMIZERS
+    }
+
+
+def test_assume_role_credentials_never_reach_the_file(tmp_path, pool_hooks):
+    path = tmp_path / 'sts.ndjson.gz'
+    cassette = install(str(path), RECORD, pool_hooks)
+    pool_hooks.register_client_hook(fake_sts)
+    sts = pool_hooks.get_client('sts', 'us-east-1', 'AKIATEST', 'secret')
+    sts.assume_role(RoleArn='arn:aws:iam::123456789012:role/r', RoleSessionName='scan')
+    cassette.close()
+
+    recorded = gzip.open(path, 'rt').read()
+    assert 'ASIATEMPORARY' in recorded
+    assert 'TOPSECRET' not in recorded
+    assert 'TOKEN' not in recorded
+
+    replayed = Cassette(str(path), REPLAY)
+    pool_hooks.clear()
+    pool_hooks._client_hooks[:] = [replayed.instrument_client]
+    response = pool_hooks.get_client('sts', 'us-east-1', 'AKIAOTHER', 'other').assume_role(
+        RoleArn='arn:aws:iam::123456789012:role/r', RoleSessionName='scan'
+    )
+    assert response['Credentials']['SecretAccessKey'] == 'REDACTED'
+    assert response['Credentials']['Expiration'] == datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+
+def test_record_then_replay_serves_every_call(tmp_path, pool_hooks):
+    path = str(tmp_path / 'scan.ndjson.gz')
+    recorder = install(path, RECORD, pool_hooks)
+    AWSStandIn(SyntheticAccount(1000)).install(pool_hooks)
+    recorded = scan()
+    recorder.close()
+
+    hooks = pool_hooks._client_hooks
+    del hooks[-2:]  # Drop the recorder and the stand-in: nothing answers but the cassette
+    replayer = install(path, REPLAY, pool_hooks)
+    assert scan() == recorded
+    assert replayer.misses == 0
+    assert sum(replayer.calls.values()) == sum(recorder.calls.values())
+    assert all(recorded.values())
+
+
+def test_replay_raises_recorded_errors_and_reports_misses(tmp_path, pool_hooks):
+    path = str(tmp_path / 'errors.ndjson.gz')
+    recorder = install(path, RECORD, pool_hooks)
+
+    def not_found(client, access_key, region, service):
+        client.meta.events.register('before-call', lambda **kwargs: (
+            AWSResponse('https://ec2.amazonaws.com/', 400, {}, None),
+            {'Error': {'Code': 'InvalidVolume.NotFound', 'Message': 'gone'}}
+        ))
+    pool_hooks.register_client_hook(not_found)
+    with pytest.raises(ClientError):
+        pool_hooks.get_client('ec2', 'us-east-1', 'AKIATEST', 'secret').describe_volumes(VolumeIds=['vol-1'])
+    recorder.close()
+
+    del pool_hooks._client_hooks[-2:]
+    replayer = install(path, REPLAY, pool_hooks)
+    ec2 = pool_hooks.get_client('ec2', 'us-east-1', 'AKIATEST', 'secret')
+    with pytest.raises(ClientError) as error:
+        ec2.describe_volumes(VolumeIds=['vol-1'])
+    assert error.value.response['Error']['Code'] == 'InvalidVolume.NotFound'
+    with pytest.raises(CassetteMiss):
+        ec2.describe_volumes(VolumeIds=['vol-2'])
+    assert replayer.misses == 1
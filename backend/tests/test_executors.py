@@ -0,0 +1,123 @@
+import threading
+import pytest
+from botocore.exceptions import ClientError
+from optimizers.base_optimizer import BaseOptimizer
+
+
+class Optimizer(BaseOptimizer):
+    def analyze(self):
+        return self.findings
+
+    def optimize(self, resource_ids):
+        return []
+
+
+def client_error(code):
+    return ClientError({'Error': {'Code': code, 'Message': f'{code} happened'}}, 'DeleteThings')
+
+
+@pytest.fixture
+def optimizer():
+    return Optimizer('AKIATEST', 'secret')
+
+
+def by_id(results):
+    return {r['resource_id']: (r['status'], r.get('error')) for r in results}
+
+
+def test_batches_are_sized_and_partial_failures_map_to_their_ids(optimizer):
+    batches = []
+
+    def delete(batch):
+        batches.append(list(batch))
+        return {'id-3': 'In use'} if 'id-3' in batch else {}
+
+    results = optimizer._execute_batched([f'id-{i}' for i in range(7)], delete, 3, 'Deleted {}')
+
+    assert batches == [['id-0', 'id-1', 'id-2'], ['id-3', 'id-4', 'id-5'], ['id-6']]
+    assert [r['resource_id'] for r in results] == [f'id-{i}' for i in range(7)]
+    assert by_id(results)['id-3'] == ('failed', 'In use')
+    assert results[0]['message'] == 'Deleted id-0'
+    assert sum(r['status'] == 'success' for r in results) == 6
+
+
+def test_failed_batch_falls_back_to_single_calls(optimizer):
+    singles = []
+
+    def delete(batch):
+        raise client_error('InvalidParameterValue')
+
+    def delete_one(resource_id):
+        singles.append(resource_id)
+        if resource_id == 'id-1':
+            raise client_error('NotFound')
+
+    results = optimizer._execute_batched(['id-0', 'id-1', 'id-2'], delete, 10, 'Deleted {}', fallback=delete_one)
+
+    assert sorted(singles) == ['id-0', 'id-1', 'id-2']
+    assert [status for status, _ in by_id(results).values()] == ['success', 'failed', 'success']
+    assert 'NotFound' in by_id(results)['id-1'][1]
+
+
+@pytest.mark.parametrize('code', ['AccessDenied', 'UnauthorizedOperation', 'DryRunOperation'])
+def test_batch_wide_errors_skip_the_fallback(optimizer, code):
+    singles = []
+
+    def delete(batch):
+        raise client_error(code)
+
+    results = optimizer._execute_batched(['id-0', 'id-1'], delete, 10, 'Deleted {}', fallback=singles.append)
+
+    assert singles == []
+    assert all(status == 'failed' and code in error for status, error in by_id(results).values())
+
+
+def test_single_id_batches_do_not_fall_back(optimizer):
+    singles = []
+
+    def delete(batch):
+        raise RuntimeError('boom')
+
+    results = optimizer._execute_batched(['id-0'], delete, 1, 'Deleted {}', fallback=singles.append)
+    assert singles == [] and by_id(results) == {'id-0': ('failed', 'boom')}
+
+
+def test_cancelled_batches_are_not_sent(optimizer):
+    optimizer.cancel_event = threading.Event()
+    batches = []
+
+    def delete(batch):
+        batches.append(batch)
+        optimizer.cancel_event.set()
+
+    results = optimizer._execute_batched(['id-0', 'id-1', 'id-2'], delete, 2, 'Deleted {}')
+
+    assert batches == [['id-0', 'id-1']]
+    assert by_id(results) == {
+        'id-0': ('success', None), 'id-1': ('success', None),
+        'id-2': ('failed', 'Scan cancelled')
+    }
+
+
+def test_concurrent_calls_report_each_id_in_order(optimizer):
+    def delete(resource_id):
+        if resource_id.endswith('3'):
+            raise client_error('DependencyViolation')
+
+    ids = [f'id-{i}' for i in range(25)]
+    results = optimizer._execute_concurrent(ids, delete, 'Deleted {}')
+
+    assert [r['resource_id'] for r in results] == ids
+    assert [r['resource_id'] for r in results if r['status'] == 'failed'] == ['id-3', 'id-13', 'id-23']
+    assert optimizer._execute_concurrent([], delete, 'Deleted {}') == []
+
+
+def test_concurrent_calls_stop_once_cancelled(optimizer):
+    optimizer.cancel_event = threading.Event()
+    optimizer.cancel_event.set()
+    calls = []
+
+    results = optimizer._execute_concurrent(['id-0', 'id-1'], calls.append, 'Deleted {}')
+
+    assert calls == []
+    assert by_id(results) == {'id-0': ('failed', 'Scan cancelled'), 'id-1': ('failed', 'Scan cancelled')}
@@ -0,0 +1,38 @@
+import json
+from app import findings_cache as cache_module
+from app.findings_cache import FindingsCache
+from optimizers.findings import FindingsStore, json_default
+
+
+def result(count):
+    findings = FindingsStore()
+    for i in range(count):
+        findings.add(f'vol-{i:06d}', 'EBS Volume', {'size_gb': i % 500, 'volume_type': 'gp2' if i % 3 else 'io1'}, i * 0.1)
+    return {'technique': 'ebs', 'findings': findings, 'count': count, 'total_monthly_savings': findings.total_savings()}
+
+
+def test_size_estimate_is_close_and_serializes_only_a_sample(monkeypatch):
+    value = result(20000)
+    actual = len(json.dumps(value, default=json_default))
+
+    serialized = []
+    real_dumps = json.dumps
+    monkeypatch.setattr(cache_module.json, 'dumps', lambda obj, **kw: serialized.append(obj) or real_dumps(obj, **kw))
+    estimate = FindingsCache()._estimate_size(value)
+
+    assert abs(estimate - actual) / actual < 0.05
+    assert max(len(obj) for obj in serialized if isinstance(obj, list)) <= cache_module.SIZE_SAMPLE
+
+
+def test_put_evicts_least_recently_used_to_stay_within_budget():
+    size = FindingsCache()._estimate_size(result(100))
+    cache = FindingsCache(max_bytes=size * 2 + size // 2)
+    assert cache.put('AKIA1', 'us-east-1', 'a', result(100))
+    assert cache.put('AKIA1', 'us-east-1', 'b', result(100))
+    cache.get('AKIA1', 'us-east-1', 'a')
+    assert cache.put('AKIA1', 'us-east-1', 'c', result(100))
+
+    assert cache.get('AKIA1', 'us-east-1', 'b') is None
+    assert cache.get('AKIA1', 'us-east-1', 'a')['count'] == 100
+    assert not cache.put('AKIA1', 'us-east-1', 'huge', result(1000))
+    assert cache.stats()['bytes'] <= cache.max_bytes
@@ -0,0 +1,122 @@
+import pytest
+from helpers import make_finding, make_report
+
+
+def test_save_and_query_current_findings(db):
+    scan_id = db.save_scan('AKIA1', [
+        make_report('ebs', 'us-east-1', [make_finding('vol-1', 5.0, days_old=10), make_finding('vol-2', 2.0)]),
+        make_report('ebs', 'eu-west-1', [make_finding('vol-3', 9.0)])
+    ])
+
+    page = db.query('AKIA1')
+    assert [f['resource_id'] for f in page['findings']] == ['vol-3', 'vol-1', 'vol-2']
+    assert page['findings'][1]['scan_id'] == scan_id
+    assert page['findings'][1]['age_days'] == 10
+    assert page['next_cursor'] is None
+
+    assert [f['resource_id'] for f in db.query('AKIA1', region='us-east-1', min_savings=3)['findings']] == ['vol-1']
+    assert db.query('AKIA2')['findings'] == []
+    assert db.summary('AKIA1') == {'ebs': {'count': 3, 'total_monthly_savings': 16.0}}
+
+
+def test_keyset_pagination_visits_every_finding_once(db):
+    db.save_scan('AKIA1', [make_report('ebs', 'us-east-1', [make_finding(f'vol-{i}', i % 7) for i in range(25)])])
+
+    seen, cursor = [], None
+    while True:
+        page = db.query('AKIA1', limit=10, cursor=cursor, sort='estimated_savings', order='asc')
+        seen.extend(f['resource_id'] for f in page['findings'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(f'vol-{i}' for i in range(25))
+    assert len(seen) == len(set(seen))
+
+
+def test_newer_scan_replaces_only_scopes_it_covered(db):
+    db.save_scan('AKIA1', [
+        make_report('ebs', 'us-east-1', [make_finding('vol-old')]),
+        make_report('ebs', 'eu-west-1', [make_finding('vol-eu')])
+    ])
+    db.save_scan('AKIA1', [
+        make_report('ebs', 'us-east-1', [make_finding('vol-new')]),
+        make_report('ebs', 'eu-west-1', [], error='AccessDenied')
+    ])
+
+    current = {f['resource_id'] for f in db.query('AKIA1')['findings']}
+    assert current == {'vol-new', 'vol-eu'}
+
+
+def test_query_rejects_unknown_sort_and_bad_cursor(db):
+    with pytest.raises(ValueError):
+        db.query('AKIA1', sort='details')
+    with pytest.raises(ValueError):
+        db.query('AKIA1', cursor='not-a-cursor')
+
+
+def test_diff_round_trip(db):
+    first = db.save_scan('AKIA1', [make_report('ebs', 'us-east-1', [
+        make_finding('vol-kept', 1.0, days_old=3),
+        make_finding('vol-gone', 4.0),
+        make_finding('vol-resized', 2.0)
+    ])])
+    second = db.save_scan('AKIA1', [make_report('ebs', 'us-east-1', [
+        make_finding('vol-kept', 1.0, days_old=4),  # Only older: not a change
+        make_finding('vol-resized', 5.0),
+        make_finding('vol-added', 7.0)
+    ])])
+
+    diff = db.diff('AKIA1')
+    assert (diff['from_scan'], diff['to_scan']) == (first, second)
+    assert [c['resource_id'] for c in diff['added']] == ['vol-added']
+    assert [c['resource_id'] for c in diff['removed']] == ['vol-gone']
+    assert [c['resource_id'] for c in diff['changed']] == ['vol-resized']
+    assert diff['changed'][0]['savings_delta'] == 3.0
+    assert diff['summary']['net_monthly_savings_delta'] == 6.0
+
+    trend = db.trends('AKIA1', days=1)
+    assert trend[-1]['count'] == 3
+    assert (trend[-1]['added'], trend[-1]['removed']) == (1, 1)
+
+
+def test_diff_needs_two_scans(db):
+    with pytest.raises(ValueError):
+        db.diff('AKIA1')
+    db.save_scan('AKIA1', [make_report('ebs', 'us-east-1', [])])
+    with pytest.raises(ValueError):
+        db.diff('AKIA1')
+    with pytest.raises(LookupError):
+        db.diff('AKIA1', from_scan=1, to_scan=99)
+    with pytest.raises(LookupError):
+        db.diff('AKIA1', to_scan=99)
+
+
+def test_diff_defaults_to_previous_scan_of_the_same_scopes(db):
+    full = db.save_scan('AKIA1', [
+        make_report('ebs', 'us-east-1', [make_finding('vol-1')]),
+        make_report('eip', 'us-east-1', [make_finding('eipalloc-1', resource_type='Elastic IP')])
+    ])
+    db.save_scan('AKIA1', [make_report('eip', 'eu-west-1', [])])
+    partial = db.save_scan('AKIA1', [make_report('ebs', 'us-east-1', [make_finding('vol-1'), make_finding('vol-2')])])
+    latest = db.save_scan('AKIA1', [
+        make_report('ebs', 'us-east-1', []),
+        make_report('eip', 'us-east-1', [])
+    ])
+
+    diff = db.diff('AKIA1')
+    assert (diff['from_scan'], diff['to_scan']) == (full, latest)
+    assert sorted(c['resource_id'] for c in diff['removed']) == ['eipalloc-1', 'vol-1']
+
+    assert db.diff('AKIA1', to_scan=partial)['from_scan'] == full
+    with pytest.raises(ValueError):
+        db.diff('AKIA1', to_scan=full)
+
+
+def test_diff_route_without_a_comparable_scan_is_400(api, db, monkeypatch):
+    from app import routes
+    monkeypatch.setattr(routes, 'findings_db', db)
+    db.save_scan('AKIATEST', [make_report('ebs', 'us-east-1', [])])
+    db.save_scan('AKIATEST', [make_report('ebs', 'eu-west-1', [])])
+
+    assert api.get('/api/scans/diff').status_code == 400
+    assert api.get('/api/scans/diff?to=99').status_code == 404
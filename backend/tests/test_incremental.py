@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta, timezone
+from optimizers.ebs_optimizer import EBSOptimizer
+from optimizers.incremental import ScanState
+
+
+class Inventory:
+    def __init__(self, volumes):
+        self.volumes = volumes
+
+    def resources(self, kind):
+        return self.volumes
+
+
+def volume(volume_id, state='available', size=100, days_old=10):
+    return {
+        'VolumeId': volume_id,
+        'State': state,
+        'Size': size,
+        'VolumeType': 'gp3',
+        'AvailabilityZone': 'us-east-1a',
+        'CreateTime': datetime.now(timezone.utc) - timedelta(days=days_old)
+    }
+
+
+def scan(volumes, state):
+    optimizer = EBSOptimizer('AKIATEST', 'secret', inventory=Inventory(volumes))
+    optimizer.scan_state = state
+    return {f['resource_id']: f['details'] for f in optimizer.analyze()}
+
+
+def test_unchanged_resources_are_carried_forward_and_changed_ones_re_evaluated():
+    first = ScanState()
+    findings = scan([volume('vol-same'), volume('vol-attached', state='in-use'), volume('vol-resized')], first)
+    assert set(findings) == {'vol-same', 'vol-resized'}
+
+    previous = dict(first.current)
+    fingerprint, (resource_type, details) = previous['vol-same']
+    previous['vol-same'] = (fingerprint, (resource_type, dict(details, days_old=3, marker='carried')))
+
+    second = ScanState(previous)
+    findings = scan([volume('vol-same'), volume('vol-attached'), volume('vol-resized', size=500)], second)
+
+    assert set(findings) == {'vol-same', 'vol-attached', 'vol-resized'}
+    assert findings['vol-same']['marker'] == 'carried'  # Reused verdict, not re-evaluated
+    assert findings['vol-same']['days_old'] == 10  # Age brought up to date
+    assert findings['vol-resized']['size_gb'] == 500
+    assert second.stats() == {'evaluated': 2, 'reused': 1, 'removed': 0}
+
+
+def test_resources_gone_since_the_previous_scan_are_counted_as_removed():
+    first = ScanState()
+    scan([volume('vol-1'), volume('vol-2')], first)
+    second = ScanState(first.current)
+    assert set(scan([volume('vol-1')], second)) == {'vol-1'}
+    assert second.stats() == {'evaluated': 0, 'reused': 1, 'removed': 1}
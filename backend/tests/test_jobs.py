@@ -0,0 +1,58 @@
+import time
+import pytest
+from app import jobs
+from app.findings_cache import FindingsCache
+from app.jobs import CANCELLED, FINISHED_STATES, SUCCEEDED, JobManager
+from optimizers.base_optimizer import BaseOptimizer
+
+
+class FiveVolumes(BaseOptimizer):
+    def analyze(self):
+        for i in range(5):
+            self.add_finding(f'vol-{i}', 'EBS Volume', {'size_gb': 1}, 1.0)
+        return self.findings
+
+    def optimize(self, resource_ids):
+        return []
+
+
+class CancelledMidway(FiveVolumes):
+    def analyze(self):
+        try:
+            self.add_finding('vol-partial', 'EBS Volume', {'size_gb': 1}, 1.0)
+            self.cancel_event.set()  # As if POST /jobs/<id>/cancel arrived now
+            return super().analyze()
+        except Exception as e:
+            return {'error': str(e)}
+
+
+@pytest.fixture
+def manager(db, monkeypatch):
+    monkeypatch.setattr(jobs, 'findings_db', db)
+    monkeypatch.setattr(jobs, 'findings_cache', FindingsCache())
+    return JobManager(workers=1, max_workers_per_job=1)
+
+
+def wait(job):
+    deadline = time.monotonic() + 10
+    while job.status not in FINISHED_STATES and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_finished_job_is_saved_and_cached(manager, db):
+    job = wait(manager.submit({'ebs': FiveVolumes}, ['ebs'], 'AKIATEST', 'secret'))
+
+    assert job.status == SUCCEEDED
+    assert job.result['scan_id'] == db.scans('AKIATEST')[0]['id']
+    assert jobs.findings_cache.get('AKIATEST', 'us-east-1', 'ebs')['count'] == 5
+
+
+def test_cancelled_job_keeps_partial_findings_but_is_not_saved(manager, db):
+    job = wait(manager.submit({'ebs': FiveVolumes, 'partial': CancelledMidway}, ['ebs', 'partial'], 'AKIATEST', 'secret'))
+
+    assert job.status == CANCELLED
+    assert len(job.snapshot()) == 6
+    assert job.result['scan_id'] is None
+    assert db.scans('AKIATEST') == []
+    assert jobs.findings_cache.get('AKIATEST', 'us-east-1', 'ebs') is None
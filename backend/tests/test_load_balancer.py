@@ -0,0 +1,34 @@
+from botocore.awsrequest import AWSResponse
+from optimizers.load_balancer_optimizer import LoadBalancerOptimizer
+
+ALB_ARN = 'arn:aws:elasticloadbalancing:us-east-1:123456789012:loadbalancer/app/alb-1/1'
+
+
+def test_optimize_keeps_classic_names_out_of_the_elbv2_lookup(pool_hooks):
+    calls = []
+
+    def fake_elb(client, access_key, region, service):
+        def respond(model, params, **kwargs):
+            calls.append((service, model.name, params['body']))
+            if model.name == 'DescribeLoadBalancers':
+                response = {'LoadBalancers': [{'LoadBalancerName': 'alb-1', 'LoadBalancerArn': ALB_ARN}]}
+            else:
+                response = {}
+            return AWSResponse(f'https://{service}.amazonaws.com/', 200, {}, None), response
+        client.meta.events.register('before-call', respond)
+
+    pool_hooks.register_client_hook(fake_elb)
+    optimizer = LoadBalancerOptimizer('AKIATEST', 'secret', 'us-east-1')
+    optimizer.dry_run = False
+    optimizer.remember_findings([
+        {'resource_id': 'clb-1', 'details': {'name': 'clb-1', 'type': 'classic'}},
+        {'resource_id': 'alb-1', 'details': {'name': 'alb-1', 'type': 'application'}}
+    ])
+
+    results = optimizer.optimize(['clb-1', 'alb-1'])
+
+    assert [r['status'] for r in results] == ['success', 'success']
+    describes = [body for service, operation, body in calls if operation == 'DescribeLoadBalancers']
+    assert [(body['Names.member.1'], 'Names.member.2' in body) for body in describes] == [('alb-1', False)]
+    deletes = {(service, operation) for service, operation, _ in calls if operation == 'DeleteLoadBalancer'}
+    assert deletes == {('elbv2', 'DeleteLoadBalancer'), ('elb', 'DeleteLoadBalancer')}
@@ -0,0 +1,47 @@
+import pytest
+from benchmarks.stand_in import AWSStandIn
+from benchmarks.synthetic import SyntheticAccount
+
+TASK_DEFINITION = 'arn:aws:ecs:us-east-1:123456789012:task-definition/bench-family-1:1'
+
+
+@pytest.fixture
+def stand_in(pool_hooks):
+    pool_hooks._client_hooks[:] = []
+    source = AWSStandIn(SyntheticAccount(1000))
+    source.install(pool_hooks)
+    return source
+
+
+def test_ecs_dry_run_deletes_nothing(api, stand_in):
+    response = api.post('/api/optimize/ecs-task-definitions', json={'resource_ids': [TASK_DEFINITION], 'dry_run': True})
+
+    assert response.status_code == 200
+    assert response.get_json()['results'][0]['message'] == f'Would delete task definition {TASK_DEFINITION}'
+    assert stand_in.calls['ecs.delete_task_definitions'] == 0
+
+
+def test_ecs_optimize_deletes_when_not_a_dry_run(api, stand_in):
+    response = api.post('/api/optimize/ecs-task-definitions', json={'resource_ids': [TASK_DEFINITION], 'dry_run': False})
+
+    assert response.get_json()['summary']['success'] == 1
+    assert stand_in.calls['ecs.delete_task_definitions'] == 1
+
+
+def test_load_balancer_dry_run_deletes_nothing(api, stand_in):
+    response = api.post('/api/optimize/load-balancers', json={
+        'resource_ids': ['bench-lb-1', 'bench-clb-1', 'missing-lb'], 'dry_run': True
+    })
+
+    results = response.get_json()['results']
+    assert [r['status'] for r in results] == ['success', 'success', 'failed']
+    assert results[1]['message'] == 'Would delete load balancer bench-clb-1'
+    assert stand_in.calls['elbv2.delete_load_balancer'] == 0
+    assert stand_in.calls['elb.delete_load_balancer'] == 0
+
+
+def test_load_balancer_optimize_deletes_both_kinds(api, stand_in):
+    api.post('/api/optimize/load-balancers', json={'resource_ids': ['bench-lb-1', 'bench-clb-1'], 'dry_run': False})
+
+    assert stand_in.calls['elbv2.delete_load_balancer'] == 1
+    assert stand_in.calls['elb.delete_load_balancer'] == 1
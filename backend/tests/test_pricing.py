@@ -0,0 +1,81 @@
+import json
+import pytest
+from helpers import make_finding
+from optimizers.pricing import price_list
+
+
+def _findings():
+    return [
+        make_finding('vol-1', volume_type='gp2', size_gb=100),
+        make_finding('vol-2', volume_type='io1', size_gb=40),
+        {**make_finding('snap-1', resource_type='EC2 Snapshot', size_gb=25, storage_tier='archive'), 'region': 'eu-west-1'},
+        make_finding('i-1', resource_type='EC2 Instance', instance_type='m5.large'),
+        make_finding('x-1', resource_type='Unknown Resource')
+    ]
+
+
+def test_reprice_matches_per_finding_estimates():
+    findings = _findings()
+    total = price_list.reprice(findings, 'us-east-1')
+
+    expected = [
+        price_list.estimate(f['resource_type'], f['details'], f.get('region') or 'us-east-1')
+        for f in _findings()
+    ]
+    assert [f['estimated_savings'] for f in findings] == pytest.approx(expected)
+    assert total == pytest.approx(sum(expected))
+    assert findings[-1]['estimated_savings'] == 0.0
+
+
+def test_reprice_rejects_non_numeric_quantities():
+    with pytest.raises(ValueError):
+        price_list.reprice([make_finding('vol-1', size_gb='lots')])
+
+
+def test_reprice_route(api):
+    response = api.post('/api/pricing/reprice', json={'findings': _findings(), 'region': 'us-east-1'})
+    assert response.status_code == 200
+    assert response.get_json()['total_monthly_savings'] > 0
+
+
+@pytest.mark.parametrize('body', [
+    None,
+    [],
+    {'findings': 'vol-1'},
+    {'findings': [], 'region': 5},
+    {'findings': ['vol-1']},
+    {'findings': [{'details': {'size_gb': 1}}]},
+    {'findings': [{'resource_type': 'EBS Volume', 'details': [1]}]},
+    {'findings': [{'resource_type': 'EBS Volume', 'details': {'size_gb': 'lots'}}]},
+    {'findings': [{'resource_type': 'EBS Volume', 'details': {'volume_type': ['gp2']}}]}
+])
+def test_reprice_route_rejects_malformed_bodies(api, body):
+    response = api.post('/api/pricing/reprice', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_arbitrary_variants_fall_back_without_growing_the_price_list():
+    entries = price_list.stats()['entries']
+    findings = [make_finding(f'vol-{i}', volume_type=f'made-up-{i}', size_gb=10) for i in range(1000)]
+    price_list.reprice(findings, 'nowhere-1')
+
+    assert findings[0]['estimated_savings'] == price_list.monthly_price('ebs-volume') * 10
+    assert price_list.stats()['entries'] == entries
+    assert not hasattr(price_list, '_memo')
+
+
+def test_reload_swaps_the_whole_table(tmp_path):
+    from optimizers.pricing import PriceList
+    path = tmp_path / 'prices.json'
+    path.write_text(json.dumps({'products': {'ebs-volume': {'prices': {'*': {'*': 0.1}}}}}))
+    prices = PriceList(path)
+    before = prices._table
+
+    path.write_text(json.dumps({'products': {'ebs-volume': {'prices': {'*': {'*': 0.2}, 'eu-west-1': {'gp3': 0.3}}}}}))
+    prices.load()
+
+    assert before.monthly == {('*', 'ebs-volume', '*'): 0.1}  # Untouched for lookups still using it
+    assert prices.monthly_price('ebs-volume', 'gp3', 'eu-west-1') == 0.3
+    assert prices.monthly_price('ebs-volume', 'gp3', 'us-east-1') == 0.2
+    assert prices.stats()['regions'] == ['eu-west-1']
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from botocore.awsrequest import AWSResponse
+from optimizers import rate_limiter
+from optimizers.rate_limiter import RateLimiterRegistry
+
+
+class _Body:
+    def __init__(self, content):
+        self.content = content
+
+    def stream(self, **kwargs):
+        yield self.content
+
+
+def throttle_first(count):
+    """Client hook answering logs calls at the HTTP layer: 429 for the first count, then success"""
+    seen = []
+
+    def hook(client, access_key, region, service):
+        def send(request, **kwargs):
+            seen.append(request)
+            if len(seen) <= count:
+                return AWSResponse(request.url, 429, {}, _Body(b'{"__type": "ThrottlingException", "message": "Rate exceeded"}'))
+            return AWSResponse(request.url, 200, {}, _Body(b'{"logGroups": []}'))
+        client.meta.events.register('before-send', send)
+    return hook, seen
+
+
+@pytest.fixture
+def registry(pool_hooks, monkeypatch):
+    monkeypatch.setitem(rate_limiter.SERVICE_RATES, 'logs', 100.0)
+    registry = RateLimiterRegistry(base_backoff=0.01)
+    pool_hooks._client_hooks[:] = [registry.instrument_client]
+    return registry
+
+
+def test_throttling_backs_off_and_recovers(registry, pool_hooks):
+    hook, seen = throttle_first(2)
+    pool_hooks.register_client_hook(hook)
+    logs = pool_hooks.get_client('logs', 'us-east-1', 'AKIATEST', 'secret')
+
+    assert logs.describe_log_groups()['logGroups'] == []
+    assert len(seen) == 3
+    bucket = registry.bucket('AKIATEST', 'us-east-1', 'logs')
+    assert (bucket.throttles, bucket.retries) == (2, 2)
+    throttled_rate = bucket.rate
+    assert 50.0 <= throttled_rate < 51.0  # Both throttles of the burst count as one halving
+
+    for _ in range(20):
+        logs.describe_log_groups()
+    assert bucket.rate > throttled_rate
+    assert bucket.throttles == 2
+
+
+def test_session_credentials_share_their_account_buckets(registry, pool_hooks):
+    hook, _ = throttle_first(0)
+    pool_hooks.register_client_hook(hook)
+    expiration = datetime.now(timezone.utc) + timedelta(hours=1)
+    for access_key in ('ASIAFIRST', 'ASIAREFRESHED'):
+        registry.register_account(access_key, '123456789012', expiration)
+        pool_hooks.get_client('logs', 'us-east-1', access_key, 'secret', 'token').describe_log_groups()
+
+    assert list(registry._buckets) == [('123456789012', 'us-east-1', 'logs')]
+    assert registry.bucket('123456789012', 'us-east-1', 'logs').requests == 2
+
+
+def test_idle_buckets_and_expired_accounts_are_dropped():
+    registry = RateLimiterRegistry(idle_timeout=0, sweep_interval=0)
+    registry.register_account('ASIAOLD', '123456789012', datetime.now(timezone.utc) - timedelta(seconds=1))
+    registry.register_account('ASIANEW', '123456789012', datetime.now(timezone.utc) + timedelta(hours=1))
+    registry.bucket('AKIAIDLE', 'us-east-1', 'ec2')
+    registry.bucket('AKIABUSY', 'us-east-1', 'ec2')
+
+    assert list(registry._buckets) == [('AKIABUSY', 'us-east-1', 'ec2')]
+    assert list(registry._accounts) == ['ASIANEW']
@@ -0,0 +1,33 @@
+from optimizers import s3_bucket_optimizer
+from optimizers.s3_bucket_optimizer import BucketRegionCache, S3BucketOptimizer
+
+
+def test_bucket_region_cache_is_bounded_and_expires():
+    cache = BucketRegionCache(max_entries=2)
+    cache.put(('AKIA1', 'a'), 'us-east-1')
+    cache.put(('AKIA1', 'b'), 'eu-west-1')
+    assert cache.get(('AKIA1', 'a')) == 'us-east-1'  # Now most recently used
+    cache.put(('AKIA1', 'c'), 'us-west-2')
+    assert cache.get(('AKIA1', 'b')) is None
+    assert len(cache) == 2
+
+    expired = BucketRegionCache(ttl=-1)
+    expired.put(('AKIA1', 'a'), 'us-east-1')
+    assert expired.get(('AKIA1', 'a')) is None
+    assert len(expired) == 0
+
+
+def test_bucket_region_is_looked_up_once_while_cached(monkeypatch):
+    monkeypatch.setattr(s3_bucket_optimizer, 'bucket_regions', BucketRegionCache())
+    lookups = []
+
+    class Client:
+        def get_bucket_location(self, Bucket):
+            lookups.append(Bucket)
+            return {'LocationConstraint': 'EU'}
+
+    optimizer = S3BucketOptimizer('AKIATEST', 'secret')
+    monkeypatch.setattr(optimizer, '_get_client', lambda service, region=None: Client())
+    assert optimizer._bucket_region({'Name': 'logs'}) == 'eu-west-1'
+    assert optimizer._bucket_region({'Name': 'logs'}) == 'eu-west-1'
+    assert lookups == ['logs']
@@ -0,0 +1,38 @@
+import json
+import random
+from app.scan_diff import ADDED, CHANGED, REMOVED, merge_diff
+
+
+def row(resource_id, savings=1.0, **details):
+    return {'resource_id': resource_id, 'resource_type': 'EBS Volume', 'estimated_savings': savings,
+            'details': json.dumps(details)}
+
+
+def diff(before, after):
+    return [(kind, (old or new)['resource_id']) for kind, old, new in merge_diff(before, after, lambda r: r['resource_id'])]
+
+
+def test_merge_diff_classifies_every_resource_once():
+    before = [row('a'), row('b', days_old=1), row('c', 2.0), row('e', size_gb=10)]
+    after = [row('b', days_old=9), row('c', 3.0), row('d'), row('e', size_gb=20), row('f')]
+
+    assert diff(before, after) == [
+        (REMOVED, 'a'), (CHANGED, 'c'), (ADDED, 'd'), (CHANGED, 'e'), (ADDED, 'f')
+    ]
+    assert diff([], after) == [(ADDED, r['resource_id']) for r in after]
+    assert diff(before, []) == [(REMOVED, r['resource_id']) for r in before]
+
+
+def test_merge_diff_matches_a_set_comparison():
+    generator = random.Random(7)
+    ids = [f'vol-{i:05d}' for i in range(2000)]
+    before = {i: generator.choice([1.0, 2.0]) for i in ids if generator.random() < 0.7}
+    after = {i: generator.choice([1.0, 2.0]) for i in ids if generator.random() < 0.7}
+
+    result = diff((row(i, s) for i, s in sorted(before.items())), (row(i, s) for i, s in sorted(after.items())))
+
+    assert sorted(i for kind, i in result if kind == ADDED) == sorted(after.keys() - before.keys())
+    assert sorted(i for kind, i in result if kind == REMOVED) == sorted(before.keys() - after.keys())
+    assert sorted(i for kind, i in result if kind == CHANGED) == sorted(
+        i for i in before.keys() & after.keys() if before[i] != after[i]
+    )
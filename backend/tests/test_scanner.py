@@ -0,0 +1,70 @@
+import threading
+import time
+import pytest
+from app.scanner import _error_report, _fan_out, analyze_all
+from optimizers.base_optimizer import BaseOptimizer
+
+
+def task(technique, region, delay=0.0, seen=None):
+    """A fan-out task that sleeps like a hung AWS call, ignoring its cancel event meanwhile"""
+    def run(cancel_event):
+        if seen is not None:
+            seen.append(cancel_event)
+        time.sleep(delay)
+        return _error_report(technique, region, None)
+    return technique, None, region, run
+
+
+class Sleeper(BaseOptimizer):
+    def analyze(self):
+        time.sleep(0.3)
+        return self.findings
+
+    def optimize(self, resource_ids):
+        return []
+
+
+def test_analyze_all_runs_every_technique_at_once_unless_capped():
+    optimizers = {f't{i}': Sleeper for i in range(12)}
+
+    report = analyze_all(optimizers, 'AKIATEST', 'secret')
+    assert len(report['techniques']) == 12
+    assert report['duration_seconds'] < 0.55  # One round of the slowest technique
+
+    assert analyze_all(optimizers, 'AKIATEST', 'secret', max_workers=4)['duration_seconds'] >= 0.9
+
+
+def test_slow_region_does_not_starve_healthy_one():
+    tasks = [task(f't{i}', 'eu-west-3', delay=3) for i in range(15)]
+    tasks += [task(f't{i}', 'us-east-1', delay=0.01) for i in range(15)]
+    report = _fan_out(tasks, max_workers=4, timeout=1)
+
+    assert report['duration_seconds'] < 2
+    assert not [key for key in report['errors'] if key.endswith('@us-east-1')]
+    assert {key for key in report['errors']} == {f't{i}@eu-west-3' for i in range(15)}
+    assert len([r for r in report['reports'] if r['region'] == 'us-east-1' and not r['error']]) == 15
+
+
+def test_unfinished_tasks_are_cancelled():
+    seen = []
+    scan_cancelled = threading.Event()
+    report = _fan_out([task('t', 'us-east-1', delay=2, seen=seen)], max_workers=1, timeout=0.2,
+                      cancel_event=scan_cancelled)
+    assert report['errors'] == {'t@us-east-1': 'Timed out after 0.2s'}
+    assert seen[0].is_set()
+    assert scan_cancelled.is_set()
+
+
+def test_task_errors_are_reported_per_scope():
+    def boom(cancel_event):
+        raise RuntimeError('AccessDenied')
+    report = _fan_out([('ebs', '111111111111', 'us-east-1', boom)], max_workers=2, timeout=5)
+    assert report['errors'] == {'ebs@111111111111@us-east-1': 'AccessDenied'}
+    assert report['reports'][0]['account_id'] == '111111111111'
+
+
+@pytest.mark.parametrize('regions', ['us-east-1', [1, 2], ['us-east-1', ''], {'region': 'us-east-1'}])
+def test_analyze_all_rejects_malformed_regions(api, regions):
+    response = api.post('/api/analyze-all', json={'regions': regions})
+    assert response.status_code == 400
+    assert 'regions' in response.get_json()['error']